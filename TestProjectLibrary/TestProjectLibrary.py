@@ -14,22 +14,172 @@
 # limitations under the License.
 
 from TestProjectLibrary import definitions
+from TestProjectLibrary.actions import build_action_chain, parse_actions
+from TestProjectLibrary.context import CONTEXT_KEYWORDS, BrowserContext
+from TestProjectLibrary.elementcache import CACHEABLE_KEYWORDS, ElementCache
+from TestProjectLibrary.forms import FIELD_KINDS, FIELD_TEXT, FILL_FORM_SCRIPT
+from TestProjectLibrary.locators import QUERY_ELEMENTS_SCRIPT, LocatorOptimizer, normalize_strategy, to_query
+from TestProjectLibrary.messages import MessagePolicy
+from TestProjectLibrary.metrics import KeywordMetrics, NULL_TIMER
+from TestProjectLibrary.pagecache import PAGE_CONTENT_SCRIPT, SCOPE_FRAME, SCOPE_PAGE, PageCache
+from TestProjectLibrary.pool import SessionPool
+from TestProjectLibrary.recorder import BACKEND_RECORDER, StepRecorder, create_recording_driver, parse_backend
+from TestProjectLibrary.reporting import ReportingPipeline, capture_screenshot, report_step, sends_reports
+from TestProjectLibrary.spans import SpanListener, SpanStreamer, create_exporter
+from TestProjectLibrary.sessionstate import (
+    CAPTURE_STORAGE_SCRIPT,
+    RESTORE_STATE_SCRIPT,
+    SessionStateStore,
+    origin,
+    split_cookies,
+)
+from TestProjectLibrary.scripts import ASYNC_CALL_SCRIPT, CALL_SCRIPT, ScriptRegistry, is_missing
+from TestProjectLibrary.screenshots import (
+    PAGE_FINGERPRINT_SCRIPT,
+    ScreenshotPipeline,
+    ScreenshotPolicy,
+    reserve_path,
+    timestamped_name,
+)
+from TestProjectLibrary.tables import TABLE_DATA_SCRIPT, TableSnapshot
+from TestProjectLibrary.waits import EVENT_WAIT_SCRIPT, VERIFY_TIMEOUT, WAIT_ENGINES, WAIT_EVENT, WAIT_POLLING
+from TestProjectLibrary.waithistory import WaitHistory, wait_key
 
-from src.testproject.sdk.drivers import webdriver
-from selenium.webdriver import DesiredCapabilities, ChromeOptions, FirefoxOptions, IeOptions
-from SeleniumLibrary import SeleniumLibrary
 from robot.api.deco import keyword
 from robot.api import logger
-from SeleniumLibrary.keywords.webdrivertools import WebDriverCreator
-from selenium.webdriver.edge.options import Options
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
 
 import os
+import json
+import time
 import inspect
 import warnings
-import datetime
-from typing import Optional
+import functools
+from typing import Dict, NamedTuple, Optional
+
+
+class DriverContext(NamedTuple):
+    """Reporting state of a driver registered in the SeleniumLibrary
+
+    Attributes:
+        reporter: The reporter (or reporting pipeline) of the driver
+        is_generic (bool): True if the driver is a generic driver
+        sdk (bool): True if the driver was created by the TestProject SDK, which allows one driver per process
+    """
+
+    reporter: object
+    is_generic: bool
+    sdk: bool = False
+
+
+class KeywordSpec(NamedTuple):
+    """Dispatch information of a keyword that is delegated to the SeleniumLibrary
+
+    Attributes:
+        name (str): Python name of the wrapping keyword method
+        selenium_name (str): Name of the keyword inside the SeleniumLibrary
+        report_name (str): Human readable name used in report step descriptions
+        takes_locator (bool): True if the first keyword argument is an element locator
+        category (str): One of 'get', 'assert', 'wait' or 'action'
+        changes_page (bool): True if the keyword may navigate or switch the window or frame, see `_changes_page`
+    """
+
+    name: str
+    selenium_name: str
+    report_name: str
+    takes_locator: bool
+    category: str
+    changes_page: bool
+
+
+def _categorize(name: str) -> str:
+    if name.startswith(("get_", "log_")):
+        return "get"
+    if "_should_" in name:
+        return "assert"
+    if name.startswith("wait_"):
+        return "wait"
+    return "action"
+
+
+# Keywords after which data read from the page (e.g. table snapshots) may be outdated
+PAGE_CHANGING_KEYWORDS = {
+    "go_to",
+    "go_back",
+    "reload_page",
+    "submit_form",
+    "double_click_element",
+    "press_key",
+    "press_keys",
+    "perform_actions",
+    "restore_session_state",
+    "restore_or_create_session_state",
+    "execute_javascript",
+    "execute_async_javascript",
+    "execute_registered_script",
+    "select_frame",
+    "unselect_frame",
+    "select_window",
+    "switch_window",
+    "close_window",
+    "switch_browser",
+    "close_all_browsers",
+}
+
+
+def _changes_page(name: str) -> bool:
+    return name.startswith("click_") or name in PAGE_CHANGING_KEYWORDS
+
+
+def selenium_keyword(name=None, **kwargs):
+    """Declares a keyword that delegates to the SeleniumLibrary through `base`
+
+    Used like the Robot Framework `keyword` decorator, with or without arguments. The keyword is
+    registered in the dispatch table of the library by `_register_keywords`, and runs the
+    SeleniumLibrary keyword of the same name, or of `name` if it is given.
+    """
+    if callable(name):
+        return selenium_keyword()(name)
+
+    def decorator(func):
+        func = keyword(name, **kwargs)(func)
+        func.selenium_keyword = True
+        return func
+
+    return decorator
+
+
+def _register_keywords(cls):
+    """Builds the keyword dispatch table of the library at class definition time
+
+    Every keyword declared with `selenium_keyword` is wrapped so that the wrapper, rather
+    than a stack lookup, tells `base` which keyword is being executed.
+
+    Args:
+        cls: The library class to register the keywords of
+
+    Returns:
+        The same class, with its keywords wrapped and `KEYWORDS` populated
+    """
+    cls.KEYWORDS = {}
+    for name, func in list(vars(cls).items()):
+        if not getattr(func, "selenium_keyword", False):
+            continue
+        params = list(inspect.signature(func).parameters)[1:]
+        spec = KeywordSpec(
+            name=name,
+            selenium_name=func.robot_name or name,
+            report_name=cls.convert(name),
+            takes_locator=bool(params) and params[0] in ("locator", "xpath"),
+            category=_categorize(name),
+            changes_page=_changes_page(name),
+        )
+        cls.KEYWORDS[name] = spec
+        setattr(cls, name, cls._dispatch(func, spec))
+    return cls
 
 
+@_register_keywords
 class TestProjectLibrary:
     # CONSTANTS #
     ACCEPT = "ACCEPT"
@@ -38,14 +188,45 @@ class TestProjectLibrary:
     CHROME_NAMES = ["googlechrome", "chrome", "gc"]
     FIREFOX_NAMES = ["firefox", "ff"]
     IE_NAMES = ["internetexplorer", "ie"]
+    BROWSER_NAMES = dict(
+        [(name, "chrome") for name in CHROME_NAMES]
+        + [(name, "firefox") for name in FIREFOX_NAMES]
+        + [(name, "ie") for name in IE_NAMES]
+        + [("edge", "edge"), ("safari", "safari"), ("generic", "generic")]
+    )
+    KEYWORDS: Dict[str, KeywordSpec] = {}
     # CONSTANTS END #
 
     def __init__(self):
-        self.ROBOT_LIBRARY_LISTENER = self
-        self.__default_screenshot_name = f'TestProject-{datetime.date.today().strftime("%Y_%m_%d_%H_%M_%S")}.png'
+        # Keyword events are only sent to listeners of version 2, so spans are streamed by a listener next to the library
+        self.__span_listener = SpanListener()
+        self.ROBOT_LIBRARY_LISTENER = [self, self.__span_listener]
         self.__reporter = None
-        self.__library = SeleniumLibrary()
+        self.__test_reporters = []
+        self.__selenium_library = None
         self.__is_generic = False
+        self.__contexts: Dict[int, DriverContext] = {}
+        self.__capabilities_cache = {}
+        self.__custom_strategies = set()
+        self.__active_keyword = None
+        self.__screenshot_policy = ScreenshotPolicy()
+        self.__screenshot_pipeline = None
+        self.__message_policy = MessagePolicy()
+        self.__metrics = None
+        self.__timer = NULL_TIMER
+        self.__session_pool = None
+        self.__table_snapshots = {}
+        self.__page_cache = PageCache()
+        self.__element_cache = None
+        self.__browser_context = None
+        self.__session_states = SessionStateStore()
+        self.__scripts = ScriptRegistry()
+        self.__installed_scripts = set()
+        self.__locator_optimizer = None
+        self.__wait_engine = WAIT_POLLING
+        self.__wait_history = None
+        self.__pending_wait = None
+        self.__page_url = None
         os.environ["RFW_SUPPRESS_WARNINGS"] = "true"
 
     # TESTPROJECT #
@@ -60,9 +241,16 @@ class TestProjectLibrary:
         desired_capabilities=None,
         disabled_reports: Optional[bool] = False,
         dev_token: Optional[str] = os.getenv("TP_DEV_TOKEN"),
+        screenshot_policy: Optional[str] = ScreenshotPolicy.ALWAYS,
+        async_reports: Optional[bool] = False,
+        alias: Optional[str] = "testproject_driver",
+        backend: Optional[str] = "agent",
     ):
         logger.console(f"Initializing TestProject Library for Robot v{definitions.get_lib_version()}...")
 
+        # The SDK and Selenium are only imported once a driver is needed, to keep the library import cheap
+        from selenium.webdriver import ChromeOptions, FirefoxOptions, IeOptions
+
         # # Make sure development token is set
         # if not dev_token:
         #     BuiltIn().fatal_error(
@@ -73,15 +261,21 @@ class TestProjectLibrary:
         #         "******************************************************************************"
         #     )
 
-        driver = None
+        self.__screenshot_policy = ScreenshotPolicy.parse(screenshot_policy)
+        backend, output = parse_backend(backend)
+        self._flush_reports()
+        self._invalidate_page_state()
+        if self.__element_cache is not None:
+            self.__element_cache.clear()
+        if backend != BACKEND_RECORDER:
+            self._check_no_sdk_driver(alias)
+        browser = self._resolve_browser(browser)
         # Check if instance of Options to pass to the driver.
         if not isinstance(desired_capabilities, (ChromeOptions, FirefoxOptions, IeOptions)):
-            desired_capabilities = self._build_capabilities(
-                WebDriverCreator(os.getcwd())._parse_capabilities(capabilities=desired_capabilities, browser=browser), browser
-            )
+            desired_capabilities = self._cached_capabilities(browser, desired_capabilities)
         # If headless, override and start a clean headless session.
         if "headless" in browser:
-            type = browser.split("headless", 1)[1]
+            type = self._resolve_browser(browser.split("headless", 1)[1])
             if type == "chrome":
                 desired_capabilities = ChromeOptions()
             elif type == "firefox":
@@ -90,7 +284,68 @@ class TestProjectLibrary:
                 raise ValueError("Headless is supported for FireFox and Chrome only")
             desired_capabilities.add_argument("--headless")
             browser = type
-        if browser in self.FIREFOX_NAMES:
+        self.__is_generic = browser == "generic"
+
+        def create_driver():
+            if backend == BACKEND_RECORDER:  # Reports and browser commands never leave the process
+                return create_recording_driver(StepRecorder(output))
+            return self._create_driver(browser, desired_capabilities, dev_token, project_name, job_name, disabled_reports)
+
+        if self.__session_pool is not None and not self.__is_generic:
+            key = (
+                browser,
+                self._capabilities_key(desired_capabilities),
+                project_name,
+                job_name,
+                dev_token,
+                disabled_reports,
+                backend,
+            )
+            driver = self.__session_pool.acquire(key, create_driver)
+        else:
+            driver = create_driver()
+
+        # Set browser only if the driver is not generic
+        if not self.__is_generic:
+            driver.report().disable_command_reports(True)
+            driver.report().step(
+                message="Set timeout",
+                description=f"Time out was set to {timeout} millisecond",
+                passed=True
+            )
+            try:
+                driver.get(url)
+                driver.report().step(
+                    message=f"Navigated to {url}",
+                    description=f"Successfully navigated to {url}",
+                    passed=True
+                )
+            except Exception:
+                driver.report().step(message=f"Failed to open {url}", description=f"Failed to open {url}", passed=True)
+                raise
+            index = self.__library.register_driver(driver=driver, alias=alias)
+        else:
+            driver.report().step(
+                message="Generic Driver",
+                description="New session created",
+                passed=True,
+                screenshot=False
+            )
+
+        self._close_unused_pipeline()
+        self.__reporter = driver.report()
+        self.__reporter.exclude_test_names(["run_cli", "main"])
+        if async_reports:
+            self.__reporter = ReportingPipeline(self.__reporter)
+        if not self.__is_generic:
+            self.__contexts[index] = DriverContext(self.__reporter, self.__is_generic, backend != BACKEND_RECORDER)
+            if self.__browser_context is not None:
+                self.__browser_context.reset(driver.current_window_handle)
+
+    def _create_driver(self, browser, desired_capabilities, dev_token, project_name, job_name, disabled_reports):
+        from src.testproject.sdk.drivers import webdriver
+
+        if browser == "firefox":
             driver = webdriver.Firefox(
                 firefox_options=desired_capabilities,
                 token=dev_token,
@@ -98,7 +353,7 @@ class TestProjectLibrary:
                 job_name=job_name,
                 disable_reports=disabled_reports,
             )
-        elif browser in self.CHROME_NAMES:
+        elif browser == "chrome":
             driver = webdriver.Chrome(
                 chrome_options=desired_capabilities,
                 token=dev_token,
@@ -106,7 +361,7 @@ class TestProjectLibrary:
                 job_name=job_name,
                 disable_reports=disabled_reports,
             )
-        elif browser in self.IE_NAMES:
+        elif browser == "ie":
             driver = webdriver.Ie(
                 ie_options=desired_capabilities,
                 token=dev_token,
@@ -137,235 +392,503 @@ class TestProjectLibrary:
                 job_name=job_name,
                 disable_reports=disabled_reports
             )
-            self.__is_generic = True
         else:
             raise ValueError("Unsupported Browser, please look at the official TestProject library documentation")
 
-        # Set browser only if the driver is not generic
-        if not self.__is_generic:
-            driver.report().disable_command_reports(True)
-            driver.report().step(
-                message="Set timeout",
-                description=f"Time out was set to {timeout} millisecond",
-                passed=True
-            )
-            try:
-                driver.get(url)
-                driver.report().step(
-                    message=f"Navigated to {url}",
-                    description=f"Successfully navigated to {url}",
-                    passed=True
-                )
-            except Exception:
-                driver.report().step(message=f"Failed to open {url}", description=f"Failed to open {url}", passed=True)
-                raise
-            self.__library.register_driver(driver=driver, alias="testproject_driver")
-        else:
-            driver.report().step(
-                message="Generic Driver",
-                description="New session created",
-                passed=True,
-                screenshot=False
-            )
+        return driver
 
-        self.__reporter = driver.report()
-        self.__reporter.exclude_test_names(["run_cli", "main"])
+    @staticmethod
+    def _capabilities_key(desired_capabilities):
+        if hasattr(desired_capabilities, "to_capabilities"):
+            desired_capabilities = desired_capabilities.to_capabilities()
+        return json.dumps(desired_capabilities, sort_keys=True, default=str)
+
+    @keyword
+    def enable_session_pool(self, max_age: Optional[float] = None, max_uses: Optional[int] = None):
+        """Reuses the browser session between tests instead of creating a new session on every `Init Testproject Driver`
+
+        `Close All Browsers` resets the session and keeps it for the next `Init Testproject Driver` call with
+        the same browser, capabilities, project and job name. Sessions older than `max_age` seconds or handed out
+        `max_uses` times are closed instead. The TestProject SDK allows a single driver per process, so the pool keeps
+        one session: an `Init Testproject Driver` call with other settings closes it before creating a new one.
+        """
+        self._close_session_pool()
+        self.__session_pool = SessionPool(max_age=max_age, max_uses=max_uses, max_sessions=1)
+
+    @keyword
+    def set_screenshot_policy(self, policy):
+        """Sets which report steps are sent with a screenshot and returns the previous policy
+
+        Supported policies are `always`, `never`, `failures`, `every:N`, `categories:A,B`
+        (with categories `action`, `get`, `assert` and `wait`) and `page_change`.
+        Failed steps always have a screenshot unless the policy is `never`.
+        """
+        previous = str(self.__screenshot_policy)
+        self.__screenshot_policy = ScreenshotPolicy.parse(policy)
+        return previous
+
+    @keyword
+    def set_message_policy(self, max_length: int = 4000, side_file_length: Optional[int] = 100000, directory=None):
+        """Sets the maximum size of report step messages and descriptions
+
+        Longer texts are cut after `max_length` characters and end with their full length and a hash. The text of a
+        returned value longer than `side_file_length` characters (e.g. of `Get Source` or `Get WebElements`) is written
+        to a file named after its hash in `directory`, by default `report-values` in the output directory, and the
+        message refers to that file. Returned values are only formatted when the step is actually reported.
+        """
+        self.__message_policy = MessagePolicy(max_length, side_file_length, directory)
+
+    @keyword
+    def enable_screenshot_pipeline(
+        self,
+        image_format="png",
+        max_width: Optional[int] = None,
+        quality: int = 80,
+        deduplicate: bool = True,
+        workers: int = 2,
+        perceptual: bool = False,
+    ):
+        """Processes screenshots on `workers` background threads instead of the Robot Framework thread
+
+        Applies to `Capture Page Screenshot`, `Capture Element Screenshot` and the screenshots of report steps: the
+        keyword only captures the screenshot, while encoding, downscaling to `max_width` pixels and writing it happen
+        in the background. Files are written as `image_format` (`png`, `jpeg` or `webp`, with the given `quality`),
+        report screenshots stay PNG. With `deduplicate`, a report screenshot identical to the one of the previous step
+        is not sent again (except for failed steps), and a file identical to a recent one is a hard link to it. With
+        `perceptual`, report screenshots that only look like the previous one are left out as well, which saves more
+        but may leave out small changes of the page.
+
+        Converting, downscaling and `perceptual` need Pillow (`pip install Pillow`). Screenshot files exist as soon as
+        the keyword returns and get their content shortly after. Report steps are sent on the Robot Framework thread
+        unless the driver was initialized with `async_reports=True`, so without it a keyword still waits for the
+        screenshot of its step to be processed, and only the processing runs on the workers.
+        """
+        if self.__screenshot_pipeline is not None:
+            self.__screenshot_pipeline.close()
+        self.__screenshot_pipeline = ScreenshotPipeline(
+            image_format, max_width, quality, deduplicate, workers, perceptual=perceptual
+        )
+
+    @keyword
+    def get_screenshot_stats(self):
+        """Returns the numbers of screenshots saved, linked, sent and left out as duplicates, and their sizes in bytes,
+        or None if the screenshot pipeline is not enabled"""
+        return dict(self.__screenshot_pipeline.stats) if self.__screenshot_pipeline else None
+
+    @keyword
+    def enable_element_cache(self, max_entries: int = 256):
+        """Reuses the elements found for locators instead of finding them again on every keyword
+
+        Elements are cached per locator, window and frame for the keywords that act on or read a single element, such
+        as `Click Element`, `Input Text` or `Get Text`. Navigation evicts the cache, and so do window switches unless
+        `Enable Context Tracking` knows the window that was switched to. An element that turned out to be stale is
+        found again and the keyword retried once.
+        """
+        self.__element_cache = ElementCache(max_entries)
+
+    @keyword
+    def enable_locator_optimization(self, warn: bool = False):
+        """Rewrites locators using simple XPaths into equivalent CSS locators, which browsers evaluate faster
+
+        Only XPaths that match exactly the same elements as the CSS selector are rewritten, such as
+        `//input[@id='name']` or `//div[@class='list']/button`. With `warn`, a warning is logged once for every
+        other XPath locator.
+        """
+        self.__locator_optimizer = LocatorOptimizer(warn)
+
+    @keyword
+    def enable_context_tracking(self):
+        """Tracks the current window and frame to skip window and frame switches that would not change them
+
+        `Unselect Frame` followed by `Select Frame` of the frame the browser was in, as resource files often do around
+        every step, then costs no WebDriver command: `Unselect Frame` is only applied before the next keyword that
+        needs it. `Switch Window` and `Select Window` to the current window (by handle, or `MAIN` when the main window
+        is selected) are skipped too. A keyword that fails because its frame was replaced selects the frames again
+        and is retried once. `Get Browser Context` returns the tracked window and frames.
+        """
+        self.__browser_context = BrowserContext()
+        try:
+            self.__browser_context.reset(self.__library.driver.current_window_handle, None)
+        except Exception:
+            pass  # No browser is open yet, the context is tracked from the next `Init Testproject Driver`
+
+    @keyword
+    def get_browser_context(self):
+        """Returns the tracked `window` handle, the handle of the `main_window`, the selected `frames` (the locators
+        they were selected with) and whether the browser is `switched` to them, or None if tracking is not enabled
+
+        Unknown values are None, e.g. the window after switching to it by title.
+        """
+        return self.__browser_context.as_dict() if self.__browser_context else None
+
+    @keyword
+    def get_element_cache_stats(self):
+        """Returns the hits, misses, stale retries and size of the element cache, or None if it is not enabled"""
+        return self.__element_cache.stats() if self.__element_cache else None
+
+    @keyword
+    def set_wait_engine(self, engine):
+        """Sets how the `Wait Until` keywords wait and returns the previous engine
+
+        With `polling` (the default) the SeleniumLibrary checks the condition every 200 milliseconds.
+        With `event` the condition is watched inside the page, which returns as soon as the DOM or the URL changes
+        to meet it, and the SeleniumLibrary then verifies it once. Waits fall back to polling for the rest of their
+        timeout when the page navigates away or scripts can't run, and for locators the browser can't resolve.
+        """
+        engine = str(engine).strip().lower()
+        if engine not in WAIT_ENGINES:
+            raise ValueError(f"Unsupported wait engine '{engine}', expected one of {', '.join(WAIT_ENGINES)}")
+        previous, self.__wait_engine = self.__wait_engine, engine
+        return previous
+
+    @keyword
+    def enable_adaptive_waits(
+        self,
+        path="wait_history.txt",
+        percentile: float = 99,
+        margin: float = 2.0,
+        min_samples: int = 5,
+        min_timeout: float = 1.0,
+    ):
+        """Shortens the timeouts of the `Wait Until` keywords to what their past waits needed
+
+        The duration of every wait is stored in the history file at `path`, per keyword, locator (or text) and URL
+        pattern of the page. Once `min_samples` durations were recorded, the timeout of the wait is the given
+        `percentile` of them times `margin`, but at least `min_timeout` seconds and never more than the timeout the
+        keyword was called with. Waits that don't finish within that time fail fast instead of after the full timeout.
+        A failed wait is stored with the timeout it was called with, and uses that timeout for the rest of the run.
+        The file is shared by all test runs and can be written by parallel pabot workers at the same time.
+        """
+        self._flush_wait_history()
+        self.__wait_history = WaitHistory(
+            path, pct=percentile, margin=margin, min_samples=min_samples, min_timeout=min_timeout
+        )
+
+    @keyword
+    def enable_span_export(
+        self,
+        output="spans.jsonl",
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        batch_size: int = 256,
+        trace_id: Optional[str] = None,
+    ):
+        """Streams the suites, tests and keywords that run from now on as spans, for dashboards and tracing tools
+
+        Every span has its kind, name, start and end times, duration, status, the keyword arguments and, for keywords
+        of this library, the locator. The spans are exported in batches of `batch_size` from a background thread:
+        appended as JSON lines to the file at `output`, which is rotated after `max_bytes` with `backups` rotated
+        files kept, or sent with OTLP/HTTP if `output` is the URL of an OpenTelemetry collector, e.g.
+        `http://localhost:4318`. Parallel workers can share a `trace_id` (32 hexadecimal digits).
+        """
+        self.__span_listener.start(
+            SpanStreamer(create_exporter(output, max_bytes, backups), batch_size=batch_size), trace_id=trace_id
+        )
+
+    @keyword
+    def enable_keyword_metrics(self, output=None):
+        """Records the duration of every phase of the library keywords
+
+        A percentile summary per keyword is logged as a table at the end of the execution and,
+        if `output` is given, written to that path as JSON.
+        """
+        self.__metrics = KeywordMetrics(output)
+
+    @keyword
+    def get_keyword_metrics(self):
+        """Returns the percentile summary of the recorded keyword timings, or None if metrics are disabled"""
+        return self.__metrics.summary() if self.__metrics else None
+
+    @keyword
+    def get_recorded_reports(self):
+        """Returns the steps and tests recorded by the `recorder` backend of the current driver
+
+        Every record is a dictionary with its `kind` (`step` or `test`), the arguments it was reported with and the
+        seconds `elapsed` since the driver was created. Only the latest 10000 records are kept in memory, all of them
+        are written to the output file of the backend. Returns None if the driver does not use the `recorder` backend.
+        """
+        recorder = self._recorder()
+        return list(recorder.records) if recorder else None
+
+    @keyword
+    def get_recorder_summary(self):
+        """Returns the number of recorded steps, failed steps and tests, and the WebDriver commands executed per name,
+        or None if the current driver does not use the `recorder` backend
+        """
+        recorder = self._recorder()
+        return recorder.summary() if recorder else None
 
     def _build_capabilities(self, caps, browser_name):
-        options = None
+        from selenium.webdriver import DesiredCapabilities, ChromeOptions, FirefoxOptions, IeOptions
+        from selenium.webdriver.edge.options import Options
+
+        browser_options = {
+            "firefox": (FirefoxOptions, DesiredCapabilities.FIREFOX),
+            "chrome": (ChromeOptions, DesiredCapabilities.CHROME),
+            "ie": (IeOptions, DesiredCapabilities.INTERNETEXPLORER),
+            "edge": (Options, DesiredCapabilities.EDGE),
+            "safari": (None, DesiredCapabilities.SAFARI),
+        }
+        value = None
         if caps:
             _, value = caps.popitem()
             try:
-                browser = value["browserName"]
+                browser_name = value["browserName"]
             except Exception as e:
                 logger.console("No browser name capability was set")
                 raise e
-            if browser in self.FIREFOX_NAMES:
-                options = FirefoxOptions()
-            elif browser in self.CHROME_NAMES:
-                options = ChromeOptions()
-            elif browser in self.IE_NAMES:
-                options = IeOptions()
-            elif browser == "edge":
-                options = Options()
-            elif browser == "safari":
-                options = DesiredCapabilities.SAFARI.copy()
-            for k, v in value.items():
-                options.set_capability(k, v)
-        else:
-            if browser_name in self.FIREFOX_NAMES:
-                caps = DesiredCapabilities.FIREFOX.copy()
-                options = FirefoxOptions()
-            elif browser_name in self.CHROME_NAMES:
-                caps = DesiredCapabilities.CHROME.copy()
-                options = ChromeOptions()
-            elif browser_name in self.IE_NAMES:
-                caps = DesiredCapabilities.INTERNETEXPLORER.copy()
-                options = IeOptions()
-            elif browser_name == "edge":
-                caps = DesiredCapabilities.EDGE.copy()
-                options = Options()
-            elif browser_name == "safari":
-                options = DesiredCapabilities.SAFARI.copy()
-            for k, v in caps.items():
-                options.set_capability(k, v)
+        browser = self._resolve_browser(browser_name)
+        if browser not in browser_options:
+            return None
+        options_type, defaults = browser_options[browser]
+        if options_type is None:
+            options = defaults.copy()
+            options.update(value or {})
+            return options
+        options = options_type()
+        for k, v in (defaults if value is None else value).items():
+            options.set_capability(k, v)
         return options
 
+    def _cached_capabilities(self, browser, desired_capabilities):
+        if desired_capabilities is None or isinstance(desired_capabilities, str):
+            key = (browser, desired_capabilities)
+        else:
+            key = (browser, json.dumps(desired_capabilities, sort_keys=True, default=str))
+        if key not in self.__capabilities_cache:
+            from SeleniumLibrary.keywords.webdrivertools import WebDriverCreator
+
+            self.__capabilities_cache[key] = self._build_capabilities(
+                WebDriverCreator(os.getcwd())._parse_capabilities(capabilities=desired_capabilities, browser=browser), browser
+            )
+        return self._copy_options(self.__capabilities_cache[key])
+
+    @staticmethod
+    def _copy_options(options):
+        # Options objects are mutable, so every driver gets its own copy of the cached one.
+        # Copying their attributes one level deep is enough and much cheaper than a deepcopy.
+        if options is None:
+            return None
+        if isinstance(options, dict):
+            return dict(options)
+        clone = object.__new__(type(options))
+        clone.__dict__ = {
+            name: value.copy() if isinstance(value, (dict, list)) else value for name, value in vars(options).items()
+        }
+        return clone
+
+    @classmethod
+    def _resolve_browser(cls, name):
+        name = str(name).lower().replace(" ", "")
+        return cls.BROWSER_NAMES.get(name, name)
+
     # TESTPROJECT END #
 
     # SELECT/UNSELECT #
 
-    @keyword
+    @selenium_keyword
     def select_from_list_by_value(self, xpath, *values):
         self.base(xpath, f'Values selected: "{values}"', f' Values:"{xpath}", List: "{values}"', *values)
 
-    @keyword
+    @selenium_keyword
     def select_all_from_list(self, locator):
         self.base(locator, f'Selected all values from "{locator}"', f'"{locator}"')
 
-    @keyword
+    @selenium_keyword
     def select_from_list_by_label(self, locator, *labels):
         self.base(locator, f'Selected labels "{labels}"', f'Labels:"{locator}", List: "{labels}"', *labels)
 
-    @keyword
+    @selenium_keyword
     def unselect_all_from_list(self, locator):
         self.base(locator, f'Unselected all from "{locator}"', f'"{locator}"')
 
-    @keyword
+    @selenium_keyword
     def unselect_from_list_by_index(self, locator, *indexes):
         self.base(locator, f'Unselected "{indexes}" from "{locator}"', f"Indexes: {indexes}, List: {locator}", *indexes)
 
-    @keyword
+    @selenium_keyword
     def unselect_from_list_by_value(self, locator, *values):
         self.base(locator, f'Unselected "{values}" from "{locator}"', f"Values: {values}, List: {locator}", *values)
 
-    @keyword
+    @selenium_keyword
     def unselect_from_list_by_label(self, locator, *labels):
         self.base(locator, f'Unselected "{labels}" from "{locator}"', f"Labels: {labels}, List: {locator}", *labels)
 
-    @keyword
+    @selenium_keyword
     def get_selected_list_label(self, locator):
         return self.base(locator, "label", f"List: {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_selected_list_labels(self, locator):
         return self.base(locator, "labels", f"List: {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_selected_list_value(self, locator):
         return self.base(locator, "value", f"List: {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_selected_list_values(self, locator):
         return self.base(locator, "values", f"List: {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_list_items(self, locator, values=False):
         return self.base(locator, "list items", f"List: {locator}", values)
 
-    @keyword
+    @selenium_keyword
     def list_selection_should_be(self, locator, *expected):
         self.base(locator, f'Selection is "{expected}"', f"List: {locator}", *expected)
 
-    @keyword
+    @selenium_keyword
     def list_should_have_no_selections(self, locator):
         self.base(locator, f'List "{locator}" has no selections', f"List: {locator}")
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_list(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, "List is not in page", f"List: {locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_list(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, "List is in page", f"List: {locator}", message, loglevel)
 
     # SELECT/UNSELECT END #
 
     # SCREENSHOTS #
-    @keyword
+    @selenium_keyword
     def capture_page_screenshot(self, filename=None):
-        if not filename:  # Generate default file name with time stamp
-            filename = self.__default_screenshot_name
-        return self.base("", "Screenshot captured file", f" {filename}", filename)
+        if not filename:  # Generate a unique file name with a time stamp
+            filename = timestamped_name()
+        return self.base(
+            "",
+            "Screenshot captured file",
+            f" {filename}",
+            filename,
+            action=self._capture_page_screenshot if self.__screenshot_pipeline else None,
+        )
 
-    @keyword
+    @selenium_keyword
     def set_screenshot_directory(self, path):
         self.base("", "previous set directory", f" {path}", path)
 
-    @keyword
+    @selenium_keyword
     def capture_element_screenshot(self, locator, filename=None):
         if not filename:
-            filename = self.__default_screenshot_name
-        return self.base(locator, "element screenshot file", f"{filename}", filename)
+            filename = timestamped_name()
+        return self.base(
+            locator,
+            "element screenshot file",
+            f"{filename}",
+            filename,
+            action=self._capture_element_screenshot if self.__screenshot_pipeline else None,
+        )
+
+    def _capture_page_screenshot(self, filename):
+        if str(filename).upper() == "EMBED":
+            return self.__library.run_keyword("capture_page_screenshot", [filename], {})
+        return self._save_screenshot(filename, self.__library.driver.get_screenshot_as_base64(), 800)
+
+    def _capture_element_screenshot(self, locator, filename):
+        if str(filename).upper() == "EMBED":
+            return self.__library.run_keyword("capture_element_screenshot", [locator, filename], {})
+        element = self.__library.find_element(self._optimize_locator(locator))
+        return self._save_screenshot(filename, element.screenshot_as_base64, 400)
+
+    def _save_screenshot(self, filename, screenshot, width):
+        from robot.utils import get_link_path
+
+        pipeline = self.__screenshot_pipeline
+        log_dir = self._log_dir()
+        directory = self.__library.screenshot_root_directory
+        path = reserve_path(
+            log_dir if directory in (None, "EMBED") else directory,
+            filename,
+            pipeline.extension if pipeline.image_format != "png" else None,
+        )
+        pipeline.save(screenshot, path)
+        # Embedded like by the SeleniumLibrary, on a row of its own
+        src = get_link_path(path, log_dir)
+        logger.info(f'</td></tr><tr><td colspan="3"><a href="{src}"><img src="{src}" width="{width}px"></a>', html=True)
+        return path
+
+    @staticmethod
+    def _log_dir():
+        try:
+            log_file = BuiltIn().get_variable_value("${LOG FILE}")
+            if log_file == "NONE":
+                return BuiltIn().get_variable_value("${OUTPUTDIR}")
+            return os.path.dirname(log_file)
+        except RobotNotRunningError:
+            return os.getcwd()
 
     # SCREENSHOTS END #
 
     # ELEMENTS #
-    @keyword(name="Get WebElement")
+    @selenium_keyword(name="Get WebElement")
     def get_webelement(self, locator):
         return self.base(locator, "first web element by the given locator", f" {locator}")
 
-    @keyword(name="Get WebElements")
+    @selenium_keyword(name="Get WebElements")
     def get_webelements(self, locator):
         return self.base(locator, "list of web elements by the given locator", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def element_should_contain(self, locator, expected, message=None, ignore_case=False):
         self.base(locator, f'Element contains "{expected}"', f" {locator}", expected, message, ignore_case)
 
-    @keyword
+    @selenium_keyword
     def element_should_not_contain(self, locator, expected, message=None, ignore_case=False):
         self.base(locator, f'Element does not contain "{expected}"', f" {locator}", expected, message, ignore_case)
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_element(self, locator, message=None, loglevel="TRACE", limit=None):
         return self.base(locator, f'Page contains "{locator}"', f" {locator}", message, loglevel, limit)
 
-    @keyword
-    def page_should_contain(self, text, loglevel="TRACE"):
-        self.base("", f'Page contains "{text}"', f" {text}", text, loglevel)
+    @selenium_keyword
+    def page_should_contain(self, text, loglevel="TRACE", cache: bool = True):
+        action = self._page_should_contain if cache else None
+        self.base("", f'Page contains "{text}"', f" {text}", text, loglevel, action=action)
 
-    @keyword
+    @selenium_keyword
     def locator_should_match_x_times(self, locator, x, message=None, loglevel="TRACE"):
         self.base(locator, f'"{locator}" matched "{x}"', f"Locator: {locator}, X: {x}", x, message, loglevel)
 
-    @keyword
-    def page_should_not_contain(self, text, loglevel="TRACE"):
-        self.base("", f'Page did not contain "{text}"', f" {text}", text, loglevel)
+    @selenium_keyword
+    def page_should_not_contain(self, text, loglevel="TRACE", cache: bool = True):
+        action = self._page_should_not_contain if cache else None
+        self.base("", f'Page did not contain "{text}"', f" {text}", text, loglevel, action=action)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_element(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f'Page did not contain "{locator}"', f" {locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def assign_id_to_element(self, locator, id):
         self.base(locator, f'ID was assigned to "{id}"', f" {locator}", id)
 
-    @keyword
+    @selenium_keyword
     def element_should_be_disabled(self, locator):
         self.base(locator, "Element is disabled", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def element_should_be_enabled(self, locator):
         self.base(locator, "Element is enabled", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def element_should_be_focused(self, locator):
         self.base(locator, "Element is focused", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def element_should_be_visible(self, locator, message=None):
         self.base(locator, "Element is visible", f" {locator}", message)
 
-    @keyword
+    @selenium_keyword
     def element_should_not_be_visible(self, locator, message=None):
         self.base(locator, "Element is not visible", f" {locator}", message)
 
-    @keyword
+    @selenium_keyword
     def element_text_should_be(self, locator, expected, message=None, ignore_case=False):
         self.base(locator, f'Text is "{expected}"', f"Element: {locator}, Text: {expected}", expected, message, ignore_case)
 
-    @keyword
+    @selenium_keyword
     def element_text_should_not_be(self, locator, not_expected, message=None, ignore_case=False):
         self.base(
             locator,
@@ -376,11 +899,11 @@ class TestProjectLibrary:
             ignore_case,
         )
 
-    @keyword
+    @selenium_keyword
     def get_element_attribute(self, locator, attribute):
         return self.base(locator, "attribute", f"Element: {locator}", attribute)
 
-    @keyword
+    @selenium_keyword
     def element_attribute_value_should_be(self, locator, attribute, expected, message=None):
         self.base(
             locator,
@@ -391,215 +914,465 @@ class TestProjectLibrary:
             message,
         )
 
-    @keyword
+    @selenium_keyword
     def get_horizontal_position(self, locator):
         return self.base(locator, "Horizontal position", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_element_size(self, locator):
         return self.base(locator, "size", f"Element: {locator}")
 
-    @keyword
+    @selenium_keyword
     def cover_element(self, locator):
         self.base(locator, f'Element Covered "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_value(self, locator):
         return self.base(locator, "value", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_text(self, locator):
         return self.base(locator, "Text", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def clear_element_text(self, locator):
         self.base(locator, "Text cleared", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def get_vertical_position(self, locator):
         return self.base(locator, "vertical position", f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def click_button(self, locator, modifier=False):
         self.base(locator, f'Clicked button "{locator}"', f" {locator}", modifier)
 
-    @keyword
+    @selenium_keyword
     def click_image(self, locator, modifier=False):
         self.base(locator, f'Clicked image "{locator}"', f" {locator}", modifier)
 
-    @keyword
+    @selenium_keyword
     def click_link(self, locator, modifier=False):
         self.base(locator, f'Clicked link "{locator}"', f" {locator}", modifier)
 
-    @keyword
+    @selenium_keyword
     def click_element(self, locator, modifier=False, action_chain=False):
         self.base(locator, f'Clicked "{locator}"', f" {locator}", modifier, action_chain)
 
-    @keyword
+    @selenium_keyword
     def click_element_at_coordinates(self, locator, xoffset, yoffset):
         self.base(locator, f'Clicked "{locator}" at X:{xoffset} , Y:{yoffset}', f" {locator}", xoffset, yoffset)
 
-    @keyword
+    @selenium_keyword
     def double_click_element(self, locator):
-        self.base(self, f'Double clicked "{locator}"', f" {locator}")
+        self.base(locator, f'Double clicked "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def set_focus_to_element(self, locator):
         self.base(locator, f'Element "{locator}" was is focused', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def scroll_element_into_view(self, locator):
         self.base(locator, f'Element "{locator}" was scrolled into view', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def drag_and_drop(self, locator, target):
         self.base(locator, f'Element "{locator}" was dragged to "{target}"', f"Origin: {locator}, Target: {target}", target)
 
-    @keyword
+    @selenium_keyword
     def drag_and_drop_by_offset(self, locator, xoffset, yoffset):
         self.base(locator, f'Element "{locator}" was dragged to X:{xoffset} , Y:{yoffset}', f" {locator}", xoffset, yoffset)
 
-    @keyword
+    @selenium_keyword
     def mouse_down(self, locator):
         self.base(locator, f'Mouse down on: "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def mouse_out(self, locator):
         self.base(locator, f'Mouse out on: "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def mouse_over(self, locator):
         self.base(locator, f'Mouse over on: "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def mouse_up(self, locator):
         self.base(locator, f'Mouse up on: "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def open_context_menu(self, locator):
         self.base(locator, f'Context menu opened on: "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def simulate_event(self, locator, event):
         self.base(locator, f'Event: "{event}" was simulated on {locator}', f"Element: {locator}, Event: {event}", event)
 
-    @keyword
+    @selenium_keyword
     def press_key(self, locator, key):
         self.base(locator, f'Key pressed: "{key}"', f"Locator: {locator}, Key: {key}", key)
 
-    @keyword
+    @selenium_keyword
     def press_keys(self, locator=None, *keys):
         self.base(locator, f'Keys pressed: "{keys}"\non element found at "{locator}"', f"{keys}", keys)
 
-    @keyword
+    @selenium_keyword
     def get_all_links(self):
         return self.base("", "links", "")
 
-    @keyword
+    @selenium_keyword
     def mouse_down_on_link(self, locator):
         self.base(locator, f'Mouse was pressed on "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_link(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, 'Page did contain link in "{}"', f" {locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_link(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f'Page did not contain link in "{locator}"', f" {locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def mouse_down_on_image(self, locator):
         self.base(locator, f'Mouse was down on image found at "{locator}"', f" {locator}")
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_image(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f'Page did contain "{locator}"', f" {locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_image(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f'Page did not contain "{locator}"', f" {locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def get_element_count(self, locator):
         return self.base(locator, f'element "{locator}" count', f"Element: {locator}")
 
-    @keyword
+    @selenium_keyword
     def add_location_strategy(self, strategy_name, strategy_keyword, persist=False):
-        self.base("", f"Strategy '{strategy_name} was added'", strategy_name, strategy_keyword, persist)
+        self.base("", f"Strategy '{strategy_name} was added'", strategy_name, strategy_name, strategy_keyword, persist)
+        self.__custom_strategies.add(normalize_strategy(strategy_name))
 
-    @keyword
+    @selenium_keyword
     def remove_location_strategy(self, strategy_name):
         self.base("", f"Strategy '{strategy_name}' was removed", f"Removed {strategy_name}", strategy_name)
+        self.__custom_strategies.discard(normalize_strategy(strategy_name))
+
+    @selenium_keyword
+    def get_texts(self, *locators):
+        """Returns the texts of all elements matching the given locators, fetched with a single browser call"""
+        return self.base(
+            "", "Texts", f"{list(locators)}", *locators, action=functools.partial(self._query_elements, "text")
+        )
+
+    @selenium_keyword
+    def get_values(self, *locators):
+        """Returns the values of all elements matching the given locators, fetched with a single browser call"""
+        return self.base(
+            "", "Values", f"{list(locators)}", *locators, action=functools.partial(self._query_elements, "value")
+        )
+
+    @selenium_keyword
+    def get_element_attributes(self, attribute, *locators):
+        """Returns the given attribute of all elements matching the given locators, fetched with a single browser call"""
+        return self.base(
+            "",
+            f'Attribute "{attribute}"',
+            f"Attribute: {attribute}, Elements: {list(locators)}",
+            *locators,
+            action=functools.partial(self._query_elements, "attribute", attribute=attribute),
+        )
+
+    @selenium_keyword
+    def elements_should_be_visible(self, *locators, message=None):
+        """Verifies that all elements matching the given locators are visible, checked with a single browser call"""
+        self.base(
+            "",
+            f"{len(locators)} elements are visible",
+            f"{list(locators)}",
+            *locators,
+            action=functools.partial(self._elements_should_be_visible, message=message),
+        )
+
+    @selenium_keyword
+    def perform_actions(self, *actions):
+        """Performs a sequence of mouse and keyboard actions as a single browser request and reports a single step
+
+        Actions are given as `action` or `action:argument`:
+        `click`, `double_click`, `context_click`, `press` (click and hold) and `release` on the current mouse position
+        or on the element of an optional locator, `move_to:locator`, `move_by:x,y`, `type:text`, `key:KEY`,
+        `key_down:KEY`, `key_up:KEY` (keys named like in `Press Keys`, e.g. `ENTER` or `CTRL`) and `pause:time`.
+        """
+        self.base(
+            "",
+            "\n".join(str(action) for action in actions),
+            f"{len(actions)} actions",
+            *actions,
+            action=self._perform_actions,
+        )
+
+    def _perform_actions(self, *actions):
+        def find_element(locator):
+            return self.__library.find_element(self._optimize_locator(locator))
+
+        build_action_chain(self.__library.driver, parse_actions(actions), find_element).perform()
+
+    def _query_elements(self, query_type, *locators, attribute=None):
+        queries = [self._element_query(locator) for locator in locators]
+        results = self.__library.driver.execute_script(QUERY_ELEMENTS_SCRIPT, query_type, queries, attribute)
+        self._raise_if_missing([locator for locator, (found, _) in zip(locators, results) if not found])
+        return [value for _, value in results]
+
+    def _element_query(self, locator):
+        # Locators the browser can't resolve by itself are passed to the scripts as WebElements
+        locator = self._optimize_locator(locator)
+        return to_query(locator, self.__custom_strategies) or self.__library.find_element(locator)
+
+    @staticmethod
+    def _raise_if_missing(missing):
+        if missing:
+            from SeleniumLibrary.errors import ElementNotFound
+
+            raise ElementNotFound(f"Elements with locators {missing} not found.")
+
+    def _elements_should_be_visible(self, *locators, message=None):
+        visible = self._query_elements("visible", *locators)
+        hidden = [locator for locator, is_visible in zip(locators, visible) if not is_visible]
+        if hidden:
+            raise AssertionError(message or f"The elements {hidden} should be visible, but they are not.")
 
     # ELEMENTS END #
 
     # ALERTS #
-    @keyword
+    @selenium_keyword
     def input_text_into_alert(self, text, action=ACCEPT, timeout=None):
         self.base("", f"Typed {text} into alert\nAction used: {action}", f"Text: {text}", text, action, timeout)
 
-    @keyword
+    @selenium_keyword
     def alert_should_be_present(self, text="", action=ACCEPT, timeout=None):
         self.base("", f"Action used: {action}", "", text, action, timeout)
 
-    @keyword
+    @selenium_keyword
     def alert_should_not_be_present(self, action=ACCEPT, timeout=0):
         self.base("", f"Action used: {action}", "", action, timeout)
 
-    @keyword
+    @selenium_keyword
     def handle_alert(self, action=ACCEPT, timeout=None):
         return self.base("", f"Alert handled with action: {action}", "", action, timeout)
 
     # ALERTS END #
 
     # COOKIES #
-    @keyword
+    @selenium_keyword
     def delete_all_cookies(self):
         self.base("", "Deleted all cookies", "")
 
-    @keyword
+    @selenium_keyword
     def delete_cookie(self, name):
         self.base("", "Deleted all cookies", f"{name}", name)
 
-    @keyword
+    @selenium_keyword
     def get_cookies(self, as_dict=False):
         return self.base("", "Cookies", "", as_dict)
 
-    @keyword
+    @selenium_keyword
     def get_cookie(self, name):
         return self.base("", "Cookie", f"{name}", name)
 
-    @keyword
+    @selenium_keyword
     def add_cookie(self, name, value, path=None, domain=None, secure=None, expiry=None):
         self.base("", f"Added cookie: {name} with value: {value}", f"{name}", name, value, path, domain, secure, expiry)
 
+    @selenium_keyword
+    def save_session_state(self, name):
+        """Saves the cookies and the local and session storage of the current page, see `Restore Session State`
+
+        `name` is either a name, saved in a directory shared by all test processes of the current user, or the path of
+        a `.json` file. The browser is switched to the top-level document of the page. Returns the path of the file.
+        """
+        return self.base("", f"Saved session state '{name}'", f"{name}", name, action=self._save_session_state)
+
+    @selenium_keyword
+    def restore_session_state(self, name, url=None, max_age=None):
+        """Restores the cookies and the local and session storage saved with `Save Session State`, e.g. to skip a login
+
+        The browser first navigates to the origin the state was saved on, unless it is already on it. All cookies
+        (except HttpOnly ones, which are added one by one) and storage items are then set with a single script, and the
+        browser navigates to `url` if it is given. States older than `max_age` (e.g. `30 minutes`) are not restored.
+        Returns True if the state was restored, False if there is no saved state (or it is too old).
+        """
+        return self.base(
+            "",
+            f"Restored session state '{name}'",
+            f"{name}",
+            name,
+            url,
+            max_age,
+            action=self._restore_session_state,
+        )
+
+    @selenium_keyword
+    def restore_or_create_session_state(self, name, keyword, *args, url=None, max_age=None):
+        """Restores the saved session state `name`, or runs `keyword` with `args` (e.g. a login) and saves the state
+
+        Processes running in parallel (e.g. pabot workers) share the state: while one of them runs the keyword, the
+        others wait for it and then restore the state it saved, so the keyword runs once instead of once per process.
+        See `Restore Session State` for `url` and `max_age`. Returns True if the state was restored, False if it was
+        created by running the keyword.
+        """
+        return self.base(
+            "",
+            f"Restored or created session state '{name}'",
+            f"{name}",
+            name,
+            keyword,
+            url,
+            max_age,
+            *args,
+            action=self._restore_or_create_session_state,
+        )
+
+    def _save_session_state(self, name):
+        driver = self.__library.driver
+        driver.switch_to.default_content()
+        storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+        state = {
+            "origin": storage["origin"],
+            "cookies": driver.get_cookies(),
+            "local": storage["local"],
+            "session": storage["session"],
+        }
+        return self.__session_states.save(name, state)
+
+    def _restore_session_state(self, name, url=None, max_age=None):
+        state = self.__session_states.load(name, self._max_age(max_age))
+        if state is None:
+            return False
+        self._apply_session_state(state, url)
+        return True
+
+    def _restore_or_create_session_state(self, name, keyword, url, max_age, *args):
+        store, max_age = self.__session_states, self._max_age(max_age)
+        state = store.load(name, max_age)
+        if state is None:
+            with store.locked(name):
+                state = store.load(name, max_age)  # Saved by another process while this one waited for the lock
+                if state is None:
+                    BuiltIn().run_keyword(keyword, *args)
+                    self._save_session_state(name)
+                    if url:
+                        self.__library.driver.get(url)
+                    return False
+        self._apply_session_state(state, url)
+        return True
+
+    def _apply_session_state(self, state, url):
+        driver = self.__library.driver
+        driver.switch_to.default_content()
+        if origin(driver.current_url) != state["origin"]:
+            driver.get(state["origin"] + "/")  # Cookies and storage can only be set on a page of their origin
+        cookies, http_only_cookies = split_cookies(state["cookies"])
+        driver.execute_script(RESTORE_STATE_SCRIPT, cookies, state["local"], state["session"])
+        for cookie in http_only_cookies:
+            driver.add_cookie(cookie)
+        if url:
+            driver.get(url)
+
+    @staticmethod
+    def _max_age(max_age):
+        from robot.utils import timestr_to_secs
+        from SeleniumLibrary.utils import is_noney
+
+        return None if is_noney(max_age) else timestr_to_secs(max_age)
+
     # COOKIES END #
 
     # JAVASCRIPT #
-    @keyword
+    @selenium_keyword
     def execute_javascript(self, *code):
-        return self.base("", f"Executed {code}", f"{code}", *code)
+        return self.base("", "Executed JavaScript", "".join(code), *code)
 
-    @keyword
+    @selenium_keyword
     def execute_async_javascript(self, *code):
-        return self.base("", f"Executed {code} Asynchronously", f"{code}", *code)
+        return self.base("", "Executed JavaScript Asynchronously", "".join(code), *code)
+
+    @keyword
+    def register_script(self, name, *code, asynchronous: bool = False):
+        """Registers a JavaScript snippet under `name`, to be run with `Execute Registered Script`
+
+        `code` is joined like the code of `Execute Javascript` and can also be the absolute path of a JavaScript file.
+        The snippet is the body of a function reading its arguments from `arguments`. With `asynchronous=True` it is
+        run like with `Execute Async Javascript` and must call back `arguments[arguments.length - 1]`.
+        Registering a snippet under a name used before replaces it.
+        """
+        self.__scripts.register(name, code, asynchronous)
+
+    @selenium_keyword
+    def execute_registered_script(self, name, *arguments):
+        """Runs the snippet registered as `name` with the given arguments and returns its result
+
+        The snippet is installed into the page as a function the first time it runs there, e.g. after a navigation,
+        and later calls send only its name and arguments. The report carries the name instead of the source.
+        """
+        return self.base(
+            "",
+            f"Executed script '{name}'",
+            f"{name}",
+            name,
+            *arguments,
+            action=self._execute_registered_script,
+        )
+
+    def _execute_registered_script(self, name, *arguments):
+        script = self.__scripts.get(name)
+        driver = self.__library.driver
+        execute = driver.execute_async_script if script.asynchronous else driver.execute_script
+        installed = (driver.session_id, script.version)
+        if installed in self.__installed_scripts:
+            result = execute(ASYNC_CALL_SCRIPT if script.asynchronous else CALL_SCRIPT, name, script.version, *arguments)
+            if not is_missing(result):
+                return result
+        # Not installed in this browser yet, or the page was replaced since: installs and runs it in one command
+        result = execute(script.install_script(), *arguments)
+        self.__installed_scripts.add(installed)
+        return result
 
     # JAVASCRIPT END #
 
     # RUN ON FAILURE #
-    @keyword
+    @selenium_keyword
     def register_keyword_to_run_on_failure(self, keyword):
         return self.base("", "Previous keyword", f"{keyword}", keyword)
 
     # RUN ON FAILURE END #
 
     # TABLE ELEMENT #
-    @keyword
-    def get_table_cell(self, locator, row, column, loglevel="TRACE"):
-        return self.base(locator, "Cell text", f"{locator} at Row: {row}, Col: {column}", row, column, loglevel)
+    @selenium_keyword
+    def get_table_data(self, locator):
+        """Returns the header, body and footer rows of a table, read with a single browser call
+
+        The result is a dictionary with `header`, `body` and `footer` lists of rows, each row being a list of cell
+        texts where cells spanning several rows or columns are repeated in every position they cover.
+        The table is also kept as a snapshot for the table keywords called with `snapshot=True`, which check the
+        snapshot instead of the live table. Snapshots are dropped by keywords that may change the page (navigation,
+        clicks, form submits, key presses, JavaScript and window, frame or browser switches).
+        """
+        return self.base(
+            locator, "Table data", f"{locator}", action=lambda table: self._table_snapshot(table, refresh=True).as_dict()
+        )
 
-    @keyword
-    def table_cell_should_contain(self, locator, row, column, expected, loglevel="TRACE"):
+    @selenium_keyword
+    def get_table_cell(self, locator, row, column, loglevel="TRACE", snapshot: bool = False):
+        return self.base(
+            locator,
+            "Cell text",
+            f"{locator} at Row: {row}, Col: {column}",
+            row,
+            column,
+            loglevel,
+            action=self._table_action("get_cell", snapshot),
+        )
+
+    @selenium_keyword
+    def table_cell_should_contain(self, locator, row, column, expected, loglevel="TRACE", snapshot: bool = False):
         self.base(
             locator,
             f"Cell at row: {row} and column {column} contained {expected}",
@@ -608,277 +1381,542 @@ class TestProjectLibrary:
             column,
             expected,
             loglevel,
+            action=self._table_action("cell_should_contain", snapshot),
         )
 
-    @keyword
-    def table_column_should_contain(self, locator, column, expected, loglevel="TRACE"):
-        self.base(locator, f"Column {column} contained {expected}", f"{locator} Col: {column}", column, expected, loglevel)
+    @selenium_keyword
+    def table_column_should_contain(self, locator, column, expected, loglevel="TRACE", snapshot: bool = False):
+        self.base(
+            locator,
+            f"Column {column} contained {expected}",
+            f"{locator} Col: {column}",
+            column,
+            expected,
+            loglevel,
+            action=self._table_action("column_should_contain", snapshot),
+        )
 
-    @keyword
-    def table_footer_should_contain(self, locator, expected, loglevel="TRACE"):
-        self.base(locator, f"Footer contained {expected}", f"Footer: {locator}, Expected: {expected}", expected, loglevel)
+    @selenium_keyword
+    def table_footer_should_contain(self, locator, expected, loglevel="TRACE", snapshot: bool = False):
+        self.base(
+            locator,
+            f"Footer contained {expected}",
+            f"Footer: {locator}, Expected: {expected}",
+            expected,
+            loglevel,
+            action=self._table_action("footer_should_contain", snapshot),
+        )
 
-    @keyword
-    def table_header_should_contain(self, locator, expected, loglevel="TRACE"):
-        self.base(locator, f"Header contained {expected}", f"Header: {locator}, Expected: {expected}", expected, loglevel)
+    @selenium_keyword
+    def table_header_should_contain(self, locator, expected, loglevel="TRACE", snapshot: bool = False):
+        self.base(
+            locator,
+            f"Header contained {expected}",
+            f"Header: {locator}, Expected: {expected}",
+            expected,
+            loglevel,
+            action=self._table_action("header_should_contain", snapshot),
+        )
 
-    @keyword
-    def table_row_should_contain(self, locator, row, expected, loglevel="TRACE"):
-        self.base(locator, f"Row {row} contained {expected}", f"{locator} Row: {row}", row, expected, loglevel)
+    @selenium_keyword
+    def table_row_should_contain(self, locator, row, expected, loglevel="TRACE", snapshot: bool = False):
+        self.base(
+            locator,
+            f"Row {row} contained {expected}",
+            f"{locator} Row: {row}",
+            row,
+            expected,
+            loglevel,
+            action=self._table_action("row_should_contain", snapshot),
+        )
 
-    @keyword
-    def table_should_contain(self, locator, expected, loglevel="TRACE"):
-        self.base(locator, f"Table contained {expected}", f"Table: {locator}, Expected: {expected}", expected, loglevel)
+    @selenium_keyword
+    def table_should_contain(self, locator, expected, loglevel="TRACE", snapshot: bool = False):
+        self.base(
+            locator,
+            f"Table contained {expected}",
+            f"Table: {locator}, Expected: {expected}",
+            expected,
+            loglevel,
+            action=self._table_action("should_contain", snapshot),
+        )
+
+    def _table_action(self, check, snapshot):
+        if not snapshot:
+            return None  # Checked by the SeleniumLibrary against the live table
+
+        def action(locator, *args):
+            # The loglevel (last argument) is not used, no page source is logged for checks on a snapshot
+            return getattr(self._table_snapshot(locator), check)(*args[:-1])
+
+        return action
+
+    def _table_snapshot(self, locator, refresh=False):
+        # Snapshots are kept until they are refreshed by `Get Table Data` or a keyword changes the page
+        if refresh or locator not in self.__table_snapshots:
+            data = self.__library.driver.execute_script(TABLE_DATA_SCRIPT, self._element_query(locator))
+            if data is None:
+                self._raise_if_missing([locator])
+            self.__table_snapshots[locator] = TableSnapshot(locator, data)
+        return self.__table_snapshots[locator]
 
     # TABLE ELEMENT END #
 
     # WAITING #
-    @keyword
+    @selenium_keyword
     def wait_for_condition(self, condition, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, condition)
         message = self._set_message(timeout)
-        self.base("", f"Condition: '{condition}' was met {message}", f"{condition}", condition, timeout, error)
+        action = self._wait_action("condition", timeout, text=condition)
+        self.base("", f"Condition: '{condition}' was met {message}", f"{condition}", condition, timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_location_is(self, expected, timeout=None, message=None):
-        message = self._set_message(timeout)
-        self.base("", f"Location was '{expected}' {message}", f"{expected}", expected, timeout, message)
+        timeout = self._adaptive_timeout(timeout, expected)
+        timeout_message = self._set_message(timeout)
+        action = self._wait_action("location is", timeout, text=expected)
+        self.base("", f"Location was '{expected}' {timeout_message}", f"{expected}", expected, timeout, message, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_location_is_not(self, location, timeout=None, message=None):
-        message = self._set_message(timeout)
-        self.base("", f"Location was not '{location}' {message}", f"{location}", location, timeout, message)
+        timeout = self._adaptive_timeout(timeout, location)
+        timeout_message = self._set_message(timeout)
+        action = self._wait_action("location is not", timeout, text=location)
+        self.base(
+            "",
+            f"Location was not '{location}' {timeout_message}",
+            f"{location}",
+            location,
+            timeout,
+            message,
+            action=action,
+        )
 
-    @keyword
+    @selenium_keyword
     def wait_until_location_contains(self, expected, timeout=None, message=None):
-        message = self._set_message(timeout)
-        self.base("", f"Location contained '{expected}' {message}", f"{expected}", expected, timeout, message)
+        timeout = self._adaptive_timeout(timeout, expected)
+        timeout_message = self._set_message(timeout)
+        action = self._wait_action("location contains", timeout, text=expected)
+        self.base(
+            "",
+            f"Location contained '{expected}' {timeout_message}",
+            f"{expected}",
+            expected,
+            timeout,
+            message,
+            action=action,
+        )
 
-    @keyword
+    @selenium_keyword
     def wait_until_location_does_not_contain(self, location, timeout=None, message=None):
-        message = self._set_message(timeout)
-        self.base("", f"Location does not contain '{location}' {message}", f"{location}", location, timeout, message)
+        timeout = self._adaptive_timeout(timeout, location)
+        timeout_message = self._set_message(timeout)
+        action = self._wait_action("location does not contain", timeout, text=location)
+        self.base(
+            "",
+            f"Location does not contain '{location}' {timeout_message}",
+            f"{location}",
+            location,
+            timeout,
+            message,
+            action=action,
+        )
 
-    @keyword
+    @selenium_keyword
     def wait_until_page_contains(self, text, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, text)
         message = self._set_message(timeout)
-        self.base("", f"Page contained '{text}' {message}", f" {text}", text, timeout, error)
+        action = self._wait_action("page contains", timeout, text=text)
+        self.base("", f"Page contained '{text}' {message}", f" {text}", text, timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_page_does_not_contain(self, text, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, text)
         message = self._set_message(timeout)
-        self.base("", f"Page does not contain '{text}' {message}", f" {text}", text, timeout, error)
+        action = self._wait_action("page does not contain", timeout, text=text)
+        self.base("", f"Page does not contain '{text}' {message}", f" {text}", text, timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_page_contains_element(self, locator, timeout=None, error=None, limit=None):
+        timeout = self._adaptive_timeout(timeout, locator)
         message = self._set_message(timeout)
-        self.base(locator, f"Page contained '{locator}' {message}", f" {locator}", timeout, error, limit)
+        action = self._wait_action("element present" if limit is None else None, timeout, locator=locator)
+        self.base(locator, f"Page contained '{locator}' {message}", f" {locator}", timeout, error, limit, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_page_does_not_contain_element(self, locator, timeout=None, error=None, limit=None):
+        timeout = self._adaptive_timeout(timeout, locator)
         message = self._set_message(timeout)
-        self.base(locator, f"Page does not contain '{locator}' {message}", f" {locator}", timeout, error, limit)
+        action = self._wait_action("element absent" if limit is None else None, timeout, locator=locator)
+        self.base(locator, f"Page does not contain '{locator}' {message}", f" {locator}", timeout, error, limit, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_element_is_visible(self, locator, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, locator)
         message = self._set_message(timeout)
-        self.base(locator, f"Element '{locator}' was visible {message}", f" {locator}", timeout, error)
+        action = self._wait_action("element visible", timeout, locator=locator)
+        self.base(locator, f"Element '{locator}' was visible {message}", f" {locator}", timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_element_is_not_visible(self, locator, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, locator)
         message = self._set_message(timeout)
-        self.base(locator, f"Element '{locator}' was not visible {message}", f" {locator}", timeout, error)
+        action = self._wait_action("element not visible", timeout, locator=locator)
+        self.base(locator, f"Element '{locator}' was not visible {message}", f" {locator}", timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_element_is_enabled(self, locator, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, locator)
         message = self._set_message(timeout)
-        self.base(locator, f"Element '{locator}' was enabled {message}", f" {locator}", timeout, error)
+        action = self._wait_action("element enabled", timeout, locator=locator)
+        self.base(locator, f"Element '{locator}' was enabled {message}", f" {locator}", timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_element_contains(self, locator, text, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, f"{locator} {text}")
         message = self._set_message(timeout)
-        self.base(locator, f"Element '{locator}' contained {text} {message}", f" {text}", text, timeout, error)
+        action = self._wait_action("element contains", timeout, locator=locator, text=text)
+        self.base(locator, f"Element '{locator}' contained {text} {message}", f" {text}", text, timeout, error, action=action)
 
-    @keyword
+    @selenium_keyword
     def wait_until_element_does_not_contain(self, locator, text, timeout=None, error=None):
+        timeout = self._adaptive_timeout(timeout, f"{locator} {text}")
         message = self._set_message(timeout)
-        self.base(locator, f"Element '{locator}' does not contain {text} {message}", f" {text}", text, timeout, error)
+        action = self._wait_action("element does not contain", timeout, locator=locator, text=text)
+        self.base(
+            locator,
+            f"Element '{locator}' does not contain {text} {message}",
+            f" {text}",
+            text,
+            timeout,
+            error,
+            action=action,
+        )
+
+    def _adaptive_timeout(self, timeout, target):
+        if self.__wait_history is None:
+            return timeout
+        from robot.utils import timestr_to_secs
+
+        key = wait_key(self.__active_keyword.name, target, self._page_url())
+        learned = self.__wait_history.timeout(key)
+        configured = self.__library.timeout if timeout is None else timestr_to_secs(timeout)
+        self.__pending_wait = (key, configured, time.monotonic())
+        if learned is None or learned >= configured:
+            return timeout
+        logger.info(f"Using the adaptive timeout of {learned} seconds instead of {configured} seconds.")
+        return learned
+
+    def _page_url(self):
+        # Read once per page, the keywords that may change the page reset it with the other page state
+        if self.__page_url is None:
+            try:
+                self.__page_url = self.__library.driver.current_url
+            except Exception:
+                return ""
+        return self.__page_url
+
+    def _record_wait(self, passed):
+        key, configured, started = self.__pending_wait
+        self.__pending_wait = None
+        self.__wait_history.record(key, time.monotonic() - started, passed, configured)
+        if self.__active_keyword.name.startswith("wait_until_location"):
+            self.__page_url = None  # The location may have changed while waiting
+
+    def _flush_wait_history(self):
+        if self.__wait_history is not None:
+            self.__wait_history.flush()
 
     def _set_message(self, timeout):
         return "" if timeout is None else f"(timeout: {timeout} seconds)"
 
+    def _wait_action(self, condition, timeout, locator=None, text=None):
+        if self.__wait_engine != WAIT_EVENT or condition is None:
+            return None  # Polled by the SeleniumLibrary
+        query = None
+        if locator:
+            query = to_query(self._optimize_locator(locator), self.__custom_strategies)
+            if query is None:
+                return None  # Only the SeleniumLibrary can resolve the locator
+        return functools.partial(self._event_wait, condition, query, text, timeout)
+
+    def _event_wait(self, condition, query, text, timeout, *args):
+        from robot.utils import timestr_to_secs
+
+        spec = self.__active_keyword
+        timeout = self.__library.timeout if timeout is None else timestr_to_secs(timeout)
+        started = time.monotonic()
+        try:
+            self.__library.driver.execute_async_script(EVENT_WAIT_SCRIPT, condition, query, text, timeout * 1000)
+        except Exception as e:
+            # E.g. the page navigated away or the script timeout of the driver expired
+            logger.debug(f"Event based wait failed, polling for the rest of the timeout: {e}")
+        # The SeleniumLibrary keyword verifies the condition, and keeps polling if the page did not meet it yet
+        args = list(args)
+        args[self._timeout_index(spec.selenium_name)] = max(timeout - (time.monotonic() - started), VERIFY_TIMEOUT)
+        return self.__library.run_keyword(spec.selenium_name, args, {})
+
+    def _timeout_index(self, name):
+        return list(inspect.signature(self.__library.keywords[name]).parameters).index("timeout")
+
     # WAITING END #
 
     # WINDOW #
-    @keyword
+    @selenium_keyword
     def select_window(self, locator="MAIN", timeout=None):
-        return self.base(locator, f"Switched to {locator}", "", timeout)
+        action = self._switch_window if self.__browser_context else None
+        return self.base(locator, f"Switched to {locator}", "", timeout, action=action)
 
-    @keyword
+    @selenium_keyword
     def switch_window(self, locator="MAIN", timeout=None, browser="CURRENT"):
-        return self.base(locator, f"Switched to {locator}", f"{browser}", timeout, browser)
+        action = self._switch_window if self.__browser_context else None
+        return self.base(locator, f"Switched to {locator}", f"{browser}", timeout, browser, action=action)
 
-    @keyword
+    @selenium_keyword
     def close_window(self):
         self.base("", "Window closed", "")
 
-    @keyword
+    @selenium_keyword
     def get_window_handles(self, browser="CURRENT"):
         return self.base("", "Window Handles", "", browser)
 
-    @keyword
+    @selenium_keyword
     def get_window_identifiers(self, browser="CURRENT"):
         return self.base("", "Window Identifiers", "", browser)
 
-    @keyword
+    @selenium_keyword
     def get_window_names(self, browser="CURRENT"):
         return self.base("", "Window Names", "", browser)
 
-    @keyword
+    @selenium_keyword
     def get_window_titles(self, browser="CURRENT"):
         return self.base("", "Window Titles", "", browser)
 
-    @keyword
+    @selenium_keyword
     def get_locations(self, browser="CURRENT"):
         return self.base("", "All Locations", "", browser)
 
-    @keyword
+    @selenium_keyword
     def maximize_browser_window(self):
         self.base("", "Window Maximized", "")
 
-    @keyword
+    @selenium_keyword
     def get_window_size(self, inner=False):
         return self.base("", "Window size", "", inner)
 
-    @keyword
+    @selenium_keyword
     def set_window_size(self, width, height, inner=False):
         self.base("", f"Size set to {width}, {height}", f"Width: {width}, Height: {height}", width, height, inner)
 
-    @keyword
+    @selenium_keyword
     def get_window_position(self):
         return self.base("", "Window position", "")
 
-    @keyword
+    @selenium_keyword
     def set_window_position(self, x, y):
         self.base("", f"Position set to {x}, {y}", f"X: {x}, Y: {y}", x, y)
 
+    def _switch_window(self, locator, timeout=None, browser="CURRENT"):
+        context = self.__browser_context
+        other_browser = not isinstance(browser, str) or browser.upper() != "CURRENT"
+        if not other_browser:
+            handle = context.switch_window(locator)
+            if handle is not None:
+                return handle
+        spec = self.__active_keyword
+        args = [locator, timeout, browser][: 3 if spec.name == "switch_window" else 2]
+        previous, passed = None, False
+        try:
+            previous = self.__library.run_keyword(spec.selenium_name, args, {})
+            passed = True
+            return previous
+        finally:
+            if other_browser:
+                context.forget()
+            else:
+                context.window_switched(locator, previous, passed)
+
     # WINDOW END #
 
     # FRAMES #
-    @keyword
+    @selenium_keyword
     def select_frame(self, locator):
-        self.base(locator, f"Switched from to {locator}", f"{locator}")
+        action = self._select_frame if self.__browser_context else None
+        self.base(locator, f"Switched from to {locator}", f"{locator}", action=action)
 
-    @keyword
+    @selenium_keyword
     def unselect_frame(self):
-        self.base("", "Returned to main frame", "")
+        action = self.__browser_context.unselect_frame if self.__browser_context else None
+        self.base("", "Returned to main frame", "", action=action)
 
-    @keyword
-    def current_frame_should_contain(self, text, loglevel="TRACE"):
-        self.base("", f"Current frame contains {text}", f"{text}", text, loglevel)
+    @selenium_keyword
+    def current_frame_should_contain(self, text, loglevel="TRACE", cache: bool = True):
+        action = self._current_frame_should_contain if cache else None
+        self.base("", f"Current frame contains {text}", f"{text}", text, loglevel, action=action)
 
-    @keyword
+    @selenium_keyword
     def current_frame_should_not_contain(self, text, loglevel="TRACE"):
         self.base("", f"Current frame does not contain {text}", f"{text}", text, loglevel)
 
-    @keyword
+    @selenium_keyword
     def frame_should_contain(self, locator, text, loglevel="TRACE"):
         self.base(locator, f"{locator} contains {text}", f"Frame: {locator}, Text: {text}", text, loglevel)
 
+    def _select_frame(self, locator):
+        context = self.__browser_context
+        if context.select_frame(locator):
+            return
+        self._switch_to_target_frames()
+        passed = False
+        try:
+            self.__library.run_keyword("select_frame", [self._optimize_locator(locator)], {})
+            passed = True
+        finally:
+            context.frame_selected(locator, passed)
+
+    def _switch_to_target_frames(self):
+        # Applies the frame switches that were deferred, e.g. by `Unselect Frame`
+        context = self.__browser_context
+        target = context.pending()
+        if target is None:
+            return
+        try:
+            self.__library.driver.switch_to.default_content()
+            for locator in target:
+                self.__library.run_keyword("select_frame", [self._optimize_locator(locator)], {})
+            context.switched()
+        except Exception:
+            context.lost()
+            raise
+
     # FRAMES END #
 
     # FORM ELEMENT #
-    @keyword
+    @selenium_keyword
     def submit_form(self, locator=None):
         self.base(locator, "Form submitted", f"{locator}")
 
-    @keyword
+    @selenium_keyword
     def checkbox_should_be_selected(self, locator):
         self.base(locator, f"Checked box {locator} is selected", f"{locator}")
 
-    @keyword
+    @selenium_keyword
     def checkbox_should_not_be_selected(self, locator):
         self.base(locator, f"Checked box {locator} is not selected", f"{locator}")
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_checkbox(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page contains checkbox {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_checkbox(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page does not contain checkbox {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def select_checkbox(self, locator):
         self.base(locator, "Checkbox selected", f"{locator}")
 
-    @keyword
+    @selenium_keyword
     def unselect_checkbox(self, locator):
         self.base(locator, "Checkbox unselected", f"{locator}")
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_radio_button(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page contains radio button {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_radio_button(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page does not contain radio button {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def radio_button_should_be_set_to(self, group_name, value):
         self.base("", f"{group_name} was set to {value}", f"{value}", group_name, value)
 
-    @keyword
+    @selenium_keyword
     def radio_button_should_not_be_selected(self, group_name):
         self.base("", f"{group_name} was not selected", f"{group_name}", group_name)
 
-    @keyword
+    @selenium_keyword
     def select_radio_button(self, group_name, value):
         self.base("", f"{group_name} was set to {value}", f"{value}", group_name, value)
 
-    @keyword
+    @selenium_keyword
     def choose_file(self, locator, file_path):
         self.base(locator, f"File {file_path} was uploaded", f"{locator}", file_path)
 
-    @keyword
+    @selenium_keyword
     def input_password(self, locator, password, clear=True):
         self.base(locator, f"Typed {password} to {locator}", f"{password}", password, clear)
 
-    @keyword
+    @selenium_keyword
     def input_text(self, locator, text, clear=True):
         self.base(locator, f"Typed {text} to {locator}", f"{text}", text, clear)
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_textfield(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page contains TextField {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_textfield(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page does not contain TextField {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def textfield_should_contain(self, locator, expected, message=None):
         self.base(locator, f"TextField {locator} contains  {expected}", f"{expected}", expected, message)
 
-    @keyword
+    @selenium_keyword
     def textfield_value_should_be(self, locator, expected, message=None):
         self.base(locator, f"TextField {locator} value is {expected}", f"{expected}", expected, message)
 
-    @keyword
+    @selenium_keyword
     def textarea_should_contain(self, locator, expected, message=None):
         self.base(locator, f"TextArea {locator} contains {expected}", f"{expected}", expected, message)
 
-    @keyword
+    @selenium_keyword
     def textarea_value_should_be(self, locator, expected, message=None):
         self.base(locator, f"TextArea {locator} value is {expected}", f"{expected}", expected, message)
 
-    @keyword
+    @selenium_keyword
     def page_should_contain_button(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page contains button {locator}", f"{locator}", message, loglevel)
 
-    @keyword
+    @selenium_keyword
     def page_should_not_contain_button(self, locator, message=None, loglevel="TRACE"):
         self.base(locator, f"Page does not contain button {locator}", f"{locator}", message, loglevel)
 
+    @selenium_keyword
+    def fill_form(self, fields, clear: bool = True, typing: bool = False):
+        """Fills all form fields of the `fields` dictionary, mapping locators to values, with a single browser call
+
+        Lists are selected by label, or by value if no option has the label, checkboxes are selected for true values
+        and unselected for false values, and radio buttons select the button of their group with the given value.
+        Inputs and text areas get the value as text, other elements, like contenteditable elements, are not supported.
+        With `typing`, text is typed with key presses like `Input Text` instead of being set by a script.
+        """
+        self.base(
+            "",
+            "\n".join(f"{locator}: {value}" for locator, value in fields.items()),
+            f"{len(fields)} fields",
+            fields,
+            clear,
+            typing,
+            action=self._fill_form,
+        )
+
+    def _fill_form(self, fields, clear, typing):
+        from robot.utils import is_truthy
+
+        entries = [[self._element_query(locator), value, is_truthy(value)] for locator, value in fields.items()]
+        results = self.__library.driver.execute_script(FILL_FORM_SCRIPT, entries, clear, typing)
+        self._raise_if_missing([locator for locator, result in zip(fields, results) if result is None])
+        errors = [f"{locator}: {result}" for locator, result in zip(fields, results) if result not in FIELD_KINDS]
+        if errors:
+            raise ValueError("Failed to fill form fields:\n" + "\n".join(errors))
+        if typing:
+            for (locator, value), kind in zip(fields.items(), results):
+                if kind == FIELD_TEXT:
+                    self.__library.run_keyword("input_text", [locator, value, clear], {})
+
     # FORM ELEMENT END #
 
     # BROWSER MANAGEMENT #
@@ -899,101 +1937,123 @@ class TestProjectLibrary:
         )
         logger.console("'Open Browser' is deprecated using TestProject Library, please see official documentation.")
 
-    @keyword
+    @selenium_keyword
     def switch_browser(self, index_or_alias):
         self.base("", f"Switched to {index_or_alias}", f"{index_or_alias}", index_or_alias)
+        context = self.__contexts.get(self.__library._drivers.current_index)
+        if context is not None:
+            self.__reporter, self.__is_generic = context.reporter, context.is_generic
 
-    @keyword
+    @selenium_keyword
     def get_browser_ids(self):
         return self.base("", "Browser Ids", "")
 
-    @keyword
+    @selenium_keyword
     def get_browser_aliases(self):
         return self.base("", "Browser Aliases", "")
 
-    @keyword
+    @selenium_keyword
     def get_session_id(self):
         return self.base("", "Session ID", "")
 
-    @keyword
-    def get_source(self):
-        return self.base("", "Page Source", "")
+    @selenium_keyword
+    def get_source(self, cache: bool = True):
+        return self.base("", "Page Source", "", action=self._get_source if cache else None)
 
-    @keyword
-    def get_title(self):
-        return self.base("", "Page Title", "")
+    @selenium_keyword
+    def get_title(self, cache: bool = True):
+        return self.base("", "Page Title", "", action=self._get_title if cache else None)
 
-    @keyword
+    @selenium_keyword
     def get_location(self):
         return self.base("", "Window URL", "")
 
-    @keyword
+    @selenium_keyword
     def location_should_be(self, url, message=None):
         self.base("", f"URL is: {url}", f"{url}", url, message)
 
-    @keyword
+    @selenium_keyword
     def location_should_contain(self, expected, message=None):
         self.base("", f"URL contains: {expected}", f"{expected}", expected, message)
 
-    @keyword
+    @selenium_keyword
     def log_location(self):
         return self.base("", "Location and logged it", "")
 
-    @keyword
-    def log_source(self, loglevel="INFO"):
-        return self.base("", "Source and logged it", "", loglevel)
+    @selenium_keyword
+    def log_source(self, loglevel="INFO", cache: bool = True):
+        return self.base("", "Source and logged it", "", loglevel, action=self._log_source if cache else None)
 
-    @keyword
+    @selenium_keyword
     def log_title(self):
         return self.base("", "Title and logged it", "")
 
-    @keyword
+    @selenium_keyword
     def title_should_be(self, title, message=None):
         return self.base("", f"Title is {title}", f"{title}", title, message)
 
-    @keyword
+    @selenium_keyword
     def go_back(self):
         self.base("", "Navigated Back", "")
 
-    @keyword
+    @selenium_keyword
     def go_to(self, url):
         self.base("", f"Navigated to {url}", f"{url}", url)
 
-    @keyword
+    @selenium_keyword
     def reload_page(self):
         self.base("", "Reloaded page", "")
 
-    @keyword
+    @selenium_keyword
     def get_selenium_speed(self):
         return self.base("", "Delay between each selenium command", "")
 
-    @keyword
+    @selenium_keyword
     def get_selenium_timeout(self):
         return self.base("", "Timeout between variuos keywords", "")
 
-    @keyword
+    @selenium_keyword
     def get_selenium_implicit_wait(self):
         return self.base("", "Implicit wait value", "")
 
-    @keyword
+    @selenium_keyword
     def set_selenium_speed(self, value):
         return self.base("", f"Selenium Speed set to {value}", f"{value}", value)
 
-    @keyword
+    @selenium_keyword
     def set_selenium_timeout(self, value):
         return self.base("", f"Timeout was set to {value}", f"{value}", value)
 
-    @keyword
+    @selenium_keyword
     def set_selenium_implicit_wait(self, value):
         return self.base("", f"Implicit wait set to {value}", f"{value}", value)
 
-    @keyword
+    @selenium_keyword
     def set_browser_implicit_wait(self, value):
         self.base("", f"Browser implicit wait set to {value}", f"{value}", value)
 
-    @keyword
+    @selenium_keyword
     def close_all_browsers(self):
-        self.base("", "Closed all open browsers", "")
+        self._flush_reports()
+        self._clear_contexts()
+        self._invalidate_page_state()
+        if self.__element_cache is not None:
+            self.__element_cache.clear()
+        if self.__browser_context is not None:
+            self.__browser_context.forget()
+        if self.__session_pool is None:
+            self.base("", "Closed all open browsers", "")
+            return
+        try:
+            drivers = self.__library._drivers
+            for driver in drivers.active_drivers:
+                if not self.__session_pool.release(driver):
+                    driver.quit()
+            drivers.empty_cache()
+            self.base_report(True, "Released all open browsers to the session pool", "Close All Browsers", description="")
+        except Exception as e:
+            self.base_report(False, keyword_name="Close All Browsers", exception=e, description="")
+            raise
 
     @keyword
     def create_webdriver(self, driver_name, alias=None, kwargs={}, **init_kwargs):
@@ -1012,6 +2072,76 @@ class TestProjectLibrary:
         )
         logger.console("'Create WebDriver' is deprecated using TestProject Library, please see offical documentation.")
 
+    def _page_content(self, scope):
+        # Page contents are cached per window, frame, document and DOM version, see PAGE_CONTENT_SCRIPT
+        try:
+            token, content = self.__library.driver.execute_script(PAGE_CONTENT_SCRIPT, scope, self.__page_cache.tokens())
+        except Exception as e:
+            logger.debug(f"Page content is not cached, using the SeleniumLibrary: {e}")
+            return None
+        if content is not None:
+            self.__page_cache.put(token, content)
+        return self.__page_cache.get(token)
+
+    def _text_present(self, scope, text):
+        # Returns None when some frames can't be read and the text was not found in the others
+        content = self._page_content(scope)
+        if content is None:
+            return None
+        if any(str(text) in document_text for document_text in content["texts"]):
+            return True
+        return False if content["complete"] else None
+
+    def _page_should_contain(self, text, loglevel):
+        # Like the SeleniumLibrary, the page is searched from the top document and the driver is left there
+        self.__library.driver.switch_to.default_content()
+        found = self._text_present(SCOPE_PAGE, text)
+        if found is None:
+            return self.__library.run_keyword("page_should_contain", [text, loglevel], {})
+        if not found:
+            self.__library.log_source(loglevel)
+            raise AssertionError(f"Page should have contained text '{text}' but did not.")
+        logger.info(f"Current page contains text '{text}'.")
+
+    def _page_should_not_contain(self, text, loglevel):
+        self.__library.driver.switch_to.default_content()
+        found = self._text_present(SCOPE_PAGE, text)
+        if found is None:
+            return self.__library.run_keyword("page_should_not_contain", [text, loglevel], {})
+        if found:
+            self.__library.log_source(loglevel)
+            raise AssertionError(f"Page should not have contained text '{text}'.")
+        logger.info(f"Current page does not contain text '{text}'.")
+
+    def _current_frame_should_contain(self, text, loglevel):
+        found = self._text_present(SCOPE_FRAME, text)
+        if found is None:
+            return self.__library.run_keyword("current_frame_should_contain", [text, loglevel], {})
+        if not found:
+            self.__library.log_source(loglevel)
+            raise AssertionError(f"Frame should have contained text '{text}' but did not.")
+        logger.info(f"Current frame contains text '{text}'.")
+
+    def _get_source(self):
+        content = self._page_content(SCOPE_FRAME)
+        if content is None:
+            return self.__library.driver.page_source
+        if "source" not in content:
+            content["source"] = self.__library.driver.page_source
+        return content["source"]
+
+    def _get_title(self):
+        content = self._page_content(SCOPE_PAGE)
+        return self.__library.driver.title if content is None else content["title"]
+
+    def _log_source(self, loglevel):
+        from SeleniumLibrary.utils import is_noney
+
+        source = self._get_source()
+        if not is_noney(loglevel):
+            logger.write(source, loglevel.upper())
+        return source
+
     # BROWSER MANAGEMENT END #
 
     # GENERIC #
@@ -1026,25 +2156,70 @@ class TestProjectLibrary:
     # GENERIC END#
 
     # UTIL METHODS #
-    def base(self, *args):
-        func_name = inspect.stack()[1].function
-        locator, message, description = "N/A"
+    @property
+    def __library(self):
+        # SeleniumLibrary is created on first use, so that importing the library (e.g. for libdoc or a dry run) is cheap
+        if self.__selenium_library is None:
+            from SeleniumLibrary import SeleniumLibrary
+
+            self.__selenium_library = SeleniumLibrary()
+        return self.__selenium_library
+
+    @staticmethod
+    def _dispatch(func, spec):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            previous, self.__active_keyword = self.__active_keyword, spec
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self.__active_keyword = previous
+
+        return wrapper
+
+    def base(self, locator, message, description, *args, action=None):
+        spec = self.__active_keyword
+        if spec is None:
+            raise RuntimeError(
+                "The base method can only be called by keywords declared with @selenium_keyword, "
+                "which tell it the SeleniumLibrary keyword to run and how to report it."
+            )
+        timer = self.__timer = self.__metrics.start(spec.report_name) if self.__metrics else NULL_TIMER
+        if spec.takes_locator and isinstance(locator, str):
+            self.__span_listener.set_locator(locator)
+        passed = False
         try:
-            locator = args[0]  # Get the locator of the element
-            message = args[1]  # Get the message for the __reporter
-            description = args[2]  # Get the description for the __reporter
-            # Remove message,description and locator
-            args_as_list = list(args)
-            args = tuple(args_as_list[3:])
-            value = self.base_keyword_action(locator, *args, func_name=func_name)
-            if not value:
-                self.base_report(True, message=message, func_name=func_name, description=description)
-            else:
-                self.base_report(True, message=f"Returned value: {value}", func_name=func_name, description=description)
+            value = self.base_keyword_action(spec, locator, *args, action=action)
+            passed = True
+            timer.mark("keyword")
+            if self.__pending_wait is not None:  # Timed before the step is reported
+                self._record_wait(passed)
+            self.base_report(
+                True, message=message, keyword_name=spec.report_name, description=description, spec=spec, value=value
+            )
+            timer.mark("report")
             return value
         except Exception as e:
-            self.base_report(success=False, exception=e, func_name=func_name, description=description)
+            timer.mark("keyword")
+            if self.__pending_wait is not None:
+                self._record_wait(passed)
+            self.base_report(
+                success=False, exception=e, keyword_name=spec.report_name, description=description, spec=spec
+            )
+            timer.mark("report")
             raise
+        finally:
+            window = None
+            if self.__browser_context is not None:
+                self.__browser_context.track(spec.name, passed)
+                window = self.__browser_context.handle
+            if self.__element_cache is not None:
+                self.__element_cache.track(spec.name, locator, passed, window)
+            if spec.changes_page:
+                self._invalidate_page_state()
+            self.__pending_wait = None
+            self.__timer = NULL_TIMER
+            timer.stop()
 
     def build_values(self, locator, *values):
         result_list = []
@@ -1054,53 +2229,263 @@ class TestProjectLibrary:
         result_list = result_list + list(values)
         return result_list
 
-    def convert(self, word):
+    @staticmethod
+    def convert(word):
         return " ".join(x.capitalize() for x in word.split("_"))
 
-    def base_report(self, success, message="", func_name="", screenshot=False, exception=None, description=None):
+    def base_report(
+        self,
+        success,
+        message="",
+        keyword_name="",
+        screenshot=False,
+        exception=None,
+        description=None,
+        spec=None,
+        value=None,
+    ):
         if self.__reporter is None:
             return
 
-        if not func_name:
-            func_name = inspect.stack()[1].function
-        func_name = self.convert(func_name)
+        screenshot = not self.__is_generic and self.__screenshot_policy.should_capture(
+            success, spec.category if spec else "", self._page_fingerprint
+        )
+        policy = self.__message_policy
+        description = policy.bound(f"{keyword_name}: {description}")
         if success:
-            self.__reporter.step(
-                description=f"{func_name}: {description}", message=message, passed=True, screenshot=True
-            )
+            # Returned values can be megabytes (e.g. page sources), so they are only formatted for steps that are sent
+            if value and sends_reports(self.__reporter):
+                message = f"Returned value: {policy.describe(value)}"
+            else:
+                message = policy.bound(message)
+            self._report_step(description=description, message=message, passed=True, screenshot=screenshot)
         else:
             if not message:
                 message += f"Failure reason:\n'{exception}'"
-            self.__reporter.step(description=f"{func_name}: {description}", message=message, passed=False, screenshot=True)
+            self._report_step(description=description, message=policy.bound(message), passed=False, screenshot=screenshot)
+
+    def _report_step(self, description, message, passed, screenshot):
+        self._track_reporter()
+        step = dict(description=description, message=message, passed=passed)
+        if not screenshot or not sends_reports(self.__reporter):
+            # Reporters with disabled reports drop the step without capturing its screenshot
+            self.__reporter.step(screenshot=False, **step)
+            return
+        # The screenshot is captured here in both reporting modes, so that it is timed apart from sending the step
+        self.__timer.mark("report")
+        pipeline = self.__screenshot_pipeline
+        frame = self._capture_report_screenshot()
+        if pipeline is not None:
+            # Only the capture happens here, the screenshot is processed on the workers of the pipeline
+            frame = pipeline.process(frame)
+
+        def resolve():
+            return frame if pipeline is None else pipeline.resolve(frame, deduplicate=passed)
+
+        if isinstance(self.__reporter, ReportingPipeline):
+            self.__timer.mark("screenshot")
+            reporter = self.__reporter.reporter
+            self.__reporter.call(lambda **step: report_step(reporter, screenshot=resolve(), **step), **step)
+        else:
+            screenshot = resolve()
+            self.__timer.mark("screenshot")
+            report_step(self.__reporter, screenshot=screenshot, **step)
+
+    def _capture_report_screenshot(self):
+        from SeleniumLibrary.errors import NoOpenBrowser
 
-    def base_keyword_action(self, locator, *values, func_name=""):
         try:
-            ret_value = ""
-            if not func_name:  # Get name of calling Keyword
-                func_name = inspect.stack()[1].function
-            if not locator and not values:
-                ret_value = self.__library.run_keyword(func_name, (), {})
-            elif not locator:
-                ret_value = self.__library.run_keyword(func_name, self.build_values(None, *values), {})
-            elif not values:
-                if func_name == "get_webelements":
-                    func_name = "Get WebElements"
-                if func_name == "get_webelement":
-                    func_name = "Get WebElement"
-                ret_value = self.__library.run_keyword(func_name, [locator], {})
-            else:
-                ret_value = self.__library.run_keyword(func_name, self.build_values(locator, *values), {})
-            return ret_value
+            screenshot = capture_screenshot(self.__reporter)
+            return screenshot if screenshot is not None else self.__library.driver.get_screenshot_as_base64()
+        except NoOpenBrowser:
+            return None  # E.g. the step of `Close All Browsers` of a reporter without an Agent
         except Exception as e:
-            raise e
+            logger.warn(f"Failed to capture a screenshot for the report: {e}")
+            return None
+
+    def _page_fingerprint(self):
+        try:
+            return tuple(self.__library.driver.execute_script(PAGE_FINGERPRINT_SCRIPT))
+        except Exception:
+            return None
+
+    def base_keyword_action(self, spec, locator, *values, action=None):
+        if not spec.takes_locator:
+            locator = None
+        if self.__browser_context is not None and spec.name not in CONTEXT_KEYWORDS:
+            return self._run_in_context(spec, locator, *values, action=action)
+        return self._run_action(spec, locator, *values, action=action)
+
+    def _run_in_context(self, spec, locator, *values, action=None):
+        from selenium.common.exceptions import NoSuchFrameException, NoSuchWindowException
+
+        self._switch_to_target_frames()
+        try:
+            return self._run_action(spec, locator, *values, action=action)
+        except (NoSuchFrameException, NoSuchWindowException):
+            # The frame the browser was in may have been replaced (drivers report either error), in which case the
+            # frames are selected again from the top-level document and the keyword is retried once
+            if not self.__browser_context.lost():
+                raise
+        self._switch_to_target_frames()
+        return self._run_action(spec, locator, *values, action=action)
+
+    def _run_action(self, spec, locator, *values, action=None):
+        if action is not None:  # Keywords implemented by this library rather than the SeleniumLibrary
+            return action(*self.build_values(locator, *values))
+        if self.__locator_optimizer is not None and isinstance(locator, str):
+            return self._run_with_optimized_locator(spec, locator, *values)
+        return self._run_keyword(spec, locator, *values)
+
+    def _run_with_optimized_locator(self, spec, locator, *values):
+        from SeleniumLibrary.errors import ElementNotFound
+
+        optimized = self._optimize_locator(locator)
+        try:
+            return self._run_keyword(spec, optimized, *values)
+        except (ElementNotFound, AssertionError) as e:
+            if optimized == locator or optimized not in str(e):
+                raise
+            # Fail with the locator the user wrote rather than the optimized one
+            raise type(e)(str(e).replace(optimized, locator)) from None
+
+    def _optimize_locator(self, locator):
+        if self.__locator_optimizer is None or not isinstance(locator, str):
+            return locator
+        return self.__locator_optimizer.optimize(locator, self.__custom_strategies)
+
+    def _run_keyword(self, spec, locator, *values):
+        if self.__element_cache is not None and spec.name in CACHEABLE_KEYWORDS and isinstance(locator, str):
+            return self._run_with_cached_element(spec, locator, *values)
+        return self.__library.run_keyword(spec.selenium_name, self.build_values(locator, *values), {})
+
+    def _run_with_cached_element(self, spec, locator, *values):
+        from selenium.common.exceptions import StaleElementReferenceException
+
+        def run(element):
+            return self.__library.run_keyword(spec.selenium_name, self.build_values(element, *values), {})
+
+        cache = self.__element_cache
+        try:
+            element = cache.get(locator)
+            try:
+                return run(element or cache.put(locator, self.__library.find_element(locator)))
+            except StaleElementReferenceException:
+                # The element was replaced since it was found, it is found again and the keyword retried once
+                cache.discard_stale(locator)
+                return run(cache.put(locator, self.__library.find_element(locator)))
+        except AssertionError:
+            if spec.category != "assert":
+                raise
+            # Fails again with the SeleniumLibrary message naming the locator instead of the cached element
+            return run(locator)
+
+    def _reporters(self):
+        reporters = [context.reporter for context in self.__contexts.values()]
+        if self.__reporter is not None and self.__reporter not in reporters:
+            reporters.append(self.__reporter)
+        return reporters
+
+    def _track_reporter(self):
+        """Remembers the current reporter as one the running test reported steps to, see `_end_test`"""
+        if self.__reporter is not None and self.__reporter not in self.__test_reporters:
+            self.__test_reporters.append(self.__reporter)
+
+    def _flush_reports(self):
+        for reporter in self._reporters():
+            if isinstance(reporter, ReportingPipeline):
+                reporter.flush()
+                reporter = reporter.reporter
+            if isinstance(reporter, StepRecorder):
+                reporter.flush()
+
+    def _close_reports(self):
+        for reporter in self._reporters():
+            if isinstance(reporter, ReportingPipeline):
+                reporter.close()
+                reporter = reporter.reporter
+            if isinstance(reporter, StepRecorder):
+                reporter.flush()
+
+    def _recorder(self):
+        reporter = self.__reporter
+        if isinstance(reporter, ReportingPipeline):
+            reporter.flush()
+            reporter = reporter.reporter
+        return reporter if isinstance(reporter, StepRecorder) else None
+
+    def _clear_contexts(self):
+        # The current reporter still reports the result of the running test, it is closed by `_end_test`
+        for context in self.__contexts.values():
+            if context.reporter is not self.__reporter and isinstance(context.reporter, ReportingPipeline):
+                context.reporter.close()
+        self.__contexts.clear()
+
+    def _close_unused_pipeline(self):
+        """Stops the worker thread of the current reporting pipeline if no open browser reports with it"""
+        reporter = self.__reporter
+        if isinstance(reporter, ReportingPipeline) and all(c.reporter is not reporter for c in self.__contexts.values()):
+            reporter.close()
+
+    def _check_no_sdk_driver(self, alias):
+        """Fails if a browser created by the TestProject SDK is still open, since the SDK allows one per process"""
+        if self.__selenium_library is None:
+            return
+        drivers = self.__library._drivers
+        aliases = {index: name for name, index in drivers.active_aliases.items()}
+        for index, context in self.__contexts.items():
+            if context.sdk and index in drivers.active_driver_ids:
+                raise RuntimeError(
+                    f"Cannot open the browser '{alias}', the browser '{aliases.get(index, index)}' is still open and "
+                    "the TestProject SDK allows a single browser per process. Close it with 'Close All Browsers' first."
+                )
+
+    def _invalidate_page_state(self):
+        self.__table_snapshots.clear()
+        self.__page_cache.clear()
+        self.__page_url = None
+
+    def _close_session_pool(self):
+        if self.__session_pool is not None:
+            self.__session_pool.close()
+            self.__session_pool = None
 
     # UTIL METHODS END #
 
     # LISTENERS #
-    def _end_test(self, data, result):
-        if self.__reporter is None:
-            return
+    def _start_test(self, data, result):
+        if self.__metrics:
+            self.__metrics.start_test(result.longname)
+        self.__test_reporters = []
 
-        self.__reporter.test(name=result.name, passed=result.passed)
+    def _end_test(self, data, result):
+        if self.__metrics:
+            self.__metrics.end_test()
+
+        # Only the sessions the test reported steps to and the current one get its result, not every open alias
+        self._track_reporter()
+        open_reporters = self._reporters()
+        for reporter in self.__test_reporters:
+            if reporter in open_reporters:
+                reporter.test(name=result.name, passed=result.passed)
+        self.__test_reporters = []
+        self._flush_reports()
+        self._close_unused_pipeline()
+
+    def _end_suite(self, data, result):
+        self._flush_reports()
+        self._flush_wait_history()
+        if self.__metrics and data.parent is None:
+            summary = self.__metrics.summary()
+            self.__metrics.write(summary)
+            logger.info(self.__metrics.html_table(summary), html=True)
+
+    def _close(self):
+        if self.__screenshot_pipeline is not None:
+            self.__screenshot_pipeline.close()
+        self._close_reports()
+        self._flush_wait_history()
+        self._close_session_pool()
+        self.__span_listener.stop()
 
     # LISTENERS END #
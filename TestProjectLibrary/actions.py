@@ -0,0 +1,122 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Callable, List, NamedTuple, Optional
+
+# Actions targeting an optional element, mapped to the ActionChains method performing them
+POINTER_ACTIONS = {
+    "click": "click",
+    "double_click": "double_click",
+    "context_click": "context_click",
+    "press": "click_and_hold",
+    "release": "release",
+}
+# Actions requiring an argument
+ARGUMENT_ACTIONS = ("move_to", "move_by", "type", "key", "key_down", "key_up", "pause")
+ACTIONS = tuple(POINTER_ACTIONS) + ARGUMENT_ACTIONS
+
+# Key aliases accepted by `Press Keys`
+KEY_ALIASES = {"CTRL": "CONTROL", "ESC": "ESCAPE"}
+
+
+class Action(NamedTuple):
+    """A single step of `Perform Actions`
+
+    Attributes:
+        name (str): One of ACTIONS
+        argument (str): The locator, offset, text, key or duration of the action, None if it has none
+    """
+
+    name: str
+    argument: Optional[str]
+
+    def __str__(self):
+        return self.name if self.argument is None else f"{self.name}:{self.argument}"
+
+
+def parse_actions(steps) -> List[Action]:
+    """Parses the steps given to `Perform Actions`
+
+    Args:
+        steps: Strings in the form `action` or `action:argument`, or [action, argument] sequences
+
+    Returns:
+        list: The parsed actions
+    """
+    actions = []
+    for step in steps:
+        if isinstance(step, str):
+            name, separator, argument = step.partition(":")
+            argument = argument if separator else None
+        else:
+            name, argument = (list(step) + [None])[:2]
+        name = str(name).strip().lower().replace(" ", "_")
+        if argument is not None and name != "type":  # Typed text is kept as is
+            argument = str(argument).strip() or None
+        if name not in ACTIONS:
+            raise ValueError(f"Unsupported action '{name}' in '{step}', expected one of {', '.join(ACTIONS)}")
+        if name in ARGUMENT_ACTIONS and not argument:
+            raise ValueError(f"Action '{name}' requires an argument, e.g. '{name}:<value>'")
+        actions.append(Action(name, argument))
+    return actions
+
+
+def parse_key(name: str) -> str:
+    """Returns the Selenium key for a key name like `ENTER` or `CTRL`, or the character itself"""
+    from selenium.webdriver.common.keys import Keys
+
+    key = KEY_ALIASES.get(name.upper(), name.upper())
+    if hasattr(Keys, key):
+        return getattr(Keys, key)
+    if len(name) == 1:
+        return name
+    raise ValueError(f"Unknown key '{name}'")
+
+
+def build_action_chain(driver, actions: List[Action], find_element: Callable):
+    """Builds an ActionChains performing all actions, sent to the browser as a single W3C Actions request
+
+    Args:
+        driver: The WebDriver to perform the actions with
+        actions (list): The actions returned by `parse_actions`
+        find_element (Callable): Returns the WebElement for a locator
+
+    Returns:
+        ActionChains: The chain, ready to be performed
+    """
+    from robot.utils import timestr_to_secs
+    from selenium.webdriver.common.action_chains import ActionChains
+
+    chain = ActionChains(driver)
+    for action in actions:
+        if action.name in POINTER_ACTIONS:
+            element = None if action.argument is None else find_element(action.argument)
+            getattr(chain, POINTER_ACTIONS[action.name])(element)
+        elif action.name == "move_to":
+            chain.move_to_element(find_element(action.argument))
+        elif action.name == "move_by":
+            x, y = (int(value) for value in action.argument.split(","))
+            chain.move_by_offset(x, y)
+        elif action.name == "type":
+            chain.send_keys(action.argument)
+        elif action.name == "key":
+            key = parse_key(action.argument)
+            chain.key_down(key).key_up(key)
+        elif action.name == "key_down":
+            chain.key_down(parse_key(action.argument))
+        elif action.name == "key_up":
+            chain.key_up(parse_key(action.argument))
+        elif action.name == "pause":
+            chain.pause(timestr_to_secs(action.argument))
+    return chain
@@ -0,0 +1,171 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional, Tuple
+
+# Keywords that switch the window or frame themselves, so the pending frame switch is not applied before them
+CONTEXT_KEYWORDS = frozenset(
+    {
+        "select_frame",
+        "unselect_frame",
+        "select_window",
+        "switch_window",
+        "close_window",
+        "switch_browser",
+        "close_all_browsers",
+        "go_to",
+        "go_back",
+        "reload_page",
+        "page_should_contain",
+        "page_should_not_contain",
+        "save_session_state",
+        "restore_session_state",
+        "restore_or_create_session_state",
+    }
+)
+
+# Keywords that leave the driver in the top-level document of the window
+TOP_LEVEL_KEYWORDS = frozenset(
+    {
+        "go_to",
+        "go_back",
+        "reload_page",
+        "page_should_contain",
+        "page_should_not_contain",
+        "frame_should_contain",
+        "save_session_state",
+        "restore_session_state",
+        "restore_or_create_session_state",
+    }
+)
+
+
+class BrowserContext:
+    """The window and frame path of a browser, tracked to skip switches that would not change them
+
+    The frame path selected by the keywords (`target`) can differ from the frame path the driver is switched to
+    (`frames`): `Unselect Frame` only empties the target, and `Select Frame` of the frame the driver is still switched
+    to restores it without a WebDriver command. Any other keyword applies the pending switch first, see `pending`.
+    A frame path or window that is not known is None.
+
+    Args:
+        handle (str): The handle of the current window, which is the main window, or None if it is not known
+    """
+
+    def __init__(self, handle: Optional[str] = None):
+        self.reset(handle)
+
+    def reset(self, handle: Optional[str] = None, frames: Optional[Tuple] = ()):
+        """Starts tracking a new session, in the top-level document of the window with the given handle"""
+        self.handle = self.main = handle
+        self.handles = {handle} - {None}
+        self.frames = self.target = frames
+
+    def forget(self):
+        """Forgets the context, e.g. after switching to another browser"""
+        self.reset(None, None)
+
+    def unselect_frame(self):
+        self.target = ()
+
+    def select_frame(self, locator) -> bool:
+        """Selects a frame of the target path, returns True if the driver is already switched to the new path"""
+        if self.target is None or self.frames != self.target + (locator,):
+            return False
+        self.target = self.frames
+        return True
+
+    def frame_selected(self, locator, passed: bool):
+        """Updates the context after `Select Frame` switched the driver from the target path"""
+        self.frames = self.target = self.target + (locator,) if passed and self.target is not None else None
+
+    def pending(self) -> Optional[Tuple]:
+        """Returns the frame path the driver must be switched to before the next command, None if there is none"""
+        if self.target is None or self.frames == self.target:
+            return None
+        return self.target
+
+    def switched(self):
+        """Records that the driver was switched to the target path"""
+        self.frames = self.target
+
+    def lost(self) -> Optional[Tuple]:
+        """Forgets the frame path of the driver after a command failed because its frame or window was not found
+
+        Returns:
+            tuple: The target frame path, which can be selected again, or None if it is not known
+        """
+        self.frames = None
+        return self.target
+
+    def switch_window(self, locator) -> Optional[str]:
+        """Switches to the current window if the window locator matches it
+
+        Returns:
+            str: The handle of the current window, or None if the locator may match another window
+        """
+        if self.handle is None or not isinstance(locator, str):
+            return None
+        name = locator.strip().upper()
+        if name == "CURRENT":
+            return self.handle
+        if (name == "MAIN" and self.handle == self.main) or locator == self.handle:
+            self.target = ()  # Switching to a window selects its top-level document
+            return self.handle
+        return None
+
+    def window_switched(self, locator, previous: Optional[str], passed: bool):
+        """Updates the context after a window switch
+
+        Args:
+            locator: The window locator
+            previous (str): The handle of the window before the switch, returned by `Switch Window`
+            passed (bool): False if the switch failed
+        """
+        if not passed:
+            self.handle = None
+            self.frames = self.target = None
+            return
+        self.handles.add(previous)
+        self.handles.discard(None)
+        name = locator.strip().upper() if isinstance(locator, str) else None
+        if name == "CURRENT":
+            self.handle = previous
+            return
+        if name == "MAIN":
+            self.handle = self.main
+        else:
+            self.handle = locator if name is not None and locator in self.handles else None
+        self.frames = self.target = ()
+
+    def track(self, keyword: str, passed: bool = True):
+        """Updates the context after a keyword that may close the window or leave the frame"""
+        if keyword == "close_window":
+            self.handles.discard(self.handle)
+            if self.handle == self.main:
+                self.main = None
+            self.handle = None
+            self.frames = self.target = None
+        elif keyword in ("switch_browser", "close_all_browsers"):
+            self.forget()
+        elif keyword in TOP_LEVEL_KEYWORDS:
+            self.frames = self.target = () if passed else None
+
+    def as_dict(self) -> dict:
+        return {
+            "window": self.handle,
+            "main_window": self.main,
+            "frames": None if self.target is None else list(self.target),
+            "switched": self.frames == self.target,
+        }
@@ -14,12 +14,36 @@
 
 import os
 import logging
+from functools import lru_cache
 
 from importlib_metadata import metadata, PackageNotFoundError
 
+# The version module generated in the package when it is built
+VERSION_MODULE = "_version.py"
 
+
+@lru_cache(maxsize=None)
 def get_lib_version() -> str:
-    """Returns the current Library version
+    """Returns the current Library version, resolved once per process
+
+    Returns:
+        str: The current Library version read from the generated version module, package metadata
+        or an environment variable
+    """
+
+    try:
+        from TestProjectLibrary._version import VERSION
+
+        return VERSION
+    except ImportError:
+        # This is OK, the version module is only generated when building the package
+        pass
+
+    return read_lib_version()
+
+
+def read_lib_version() -> str:
+    """Reads the current Library version without using the generated version module
 
     Returns:
         str: The current Library version read from package metadata or an environment variable
@@ -45,3 +69,15 @@ def get_lib_version() -> str:
         logging.debug(f"Version read from environment variable: {version}")
 
     return version
+
+
+def write_version_module(version: str, package_dir: str):
+    """Generates the version module, so that installed packages don't need to read their metadata at runtime
+
+    Args:
+        version (str): The Library version to write
+        package_dir (str): The directory of the built package to write the module to
+    """
+
+    with open(os.path.join(package_dir, VERSION_MODULE), "w") as f:
+        f.write(f'# Generated by setup.py, do not edit\nVERSION = "{version}"\n')
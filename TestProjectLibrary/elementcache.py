@@ -0,0 +1,163 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+# Keywords whose SeleniumLibrary implementation resolves their locator with a plain `find_element(locator)`, so that
+# passing them a cached WebElement instead of the locator does not change their behavior
+CACHEABLE_KEYWORDS = frozenset(
+    {
+        "assign_id_to_element",
+        "choose_file",
+        "clear_element_text",
+        "click_element",
+        "click_element_at_coordinates",
+        "double_click_element",
+        "drag_and_drop",
+        "drag_and_drop_by_offset",
+        "element_attribute_value_should_be",
+        "element_should_be_disabled",
+        "element_should_be_enabled",
+        "element_should_be_focused",
+        "element_should_be_visible",
+        "element_should_contain",
+        "element_should_not_contain",
+        "element_text_should_be",
+        "element_text_should_not_be",
+        "get_element_attribute",
+        "get_element_size",
+        "get_horizontal_position",
+        "get_text",
+        "get_value",
+        "get_vertical_position",
+        "get_webelement",
+        "input_password",
+        "input_text",
+        "mouse_down",
+        "mouse_out",
+        "mouse_over",
+        "mouse_up",
+        "open_context_menu",
+        "press_key",
+        "scroll_element_into_view",
+        "set_focus_to_element",
+        "simulate_event",
+    }
+)
+
+# Keywords after which cached elements may belong to another window or document
+EVICTING_KEYWORDS = frozenset(
+    {
+        "go_to",
+        "save_session_state",
+        "restore_session_state",
+        "restore_or_create_session_state",
+        "go_back",
+        "reload_page",
+        "select_window",
+        "switch_window",
+        "close_window",
+        "switch_browser",
+        "close_all_browsers",
+    }
+)
+
+
+class ElementCache:
+    """WebElements resolved from locators, scoped to the window and frame they were found in
+
+    Frame switches change the scope instead of evicting elements, so elements of the main page are reused after
+    `Unselect Frame`. So do switches to a window whose handle is known, closing a window evicts its elements. Other
+    window switches and navigation evict all elements. Elements are not evicted when the page changes otherwise,
+    callers re-resolve elements that turned out to be stale.
+
+    Args:
+        max_entries (int): Maximum number of cached elements, the least recently used are evicted first
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__window = None
+        self.__frames = ()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, locator: Hashable):
+        key = self.__key(locator)
+        element = self.__entries.get(key)
+        if element is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+        return element
+
+    def put(self, locator: Hashable, element):
+        """Caches the element found for the locator in the current window and frame and returns it"""
+        key = self.__key(locator)
+        self.__entries[key] = element
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+        return element
+
+    def discard_stale(self, locator: Hashable):
+        self.stale += 1
+        self.__entries.pop(self.__key(locator), None)
+
+    def track(self, keyword: str, locator: Optional[Hashable] = None, passed: bool = True, window: Optional[str] = None):
+        """Updates the scope after a keyword that may switch the frame or window
+
+        Args:
+            keyword (str): The python name of the keyword
+            locator: The locator the keyword was called with
+            passed (bool): False if the keyword failed, in which case the frame or window is unknown
+            window (str): The handle of the window the browser is in after the keyword, None if it is not known
+        """
+        if keyword == "select_frame" and passed:
+            self.__frames += (locator,)
+        elif keyword == "unselect_frame" and passed:
+            self.__frames = ()
+        elif keyword in ("select_window", "switch_window") and passed and window is not None:
+            self.__evict_window(None)
+            self.__window, self.__frames = window, ()
+        elif keyword == "close_window" and passed and self.__window is not None:
+            self.__evict_window(self.__window)
+            self.__window, self.__frames = None, ()
+        elif keyword in EVICTING_KEYWORDS or keyword in ("select_frame", "unselect_frame"):
+            self.clear()
+        elif window is not None and self.__window is None:
+            # Elements cached while the window was not known were found in the current one, since they are evicted
+            # when leaving a window that is not known
+            self.__entries = OrderedDict(((key[0], window, key[2]), element) for key, element in self.__entries.items())
+            self.__window = window
+
+    def clear(self):
+        self.__entries.clear()
+        self.__window = None
+        self.__frames = ()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale, "entries": len(self.__entries)}
+
+    def __evict_window(self, window: Optional[str]):
+        """Evicts the elements of the window with the given handle, or of the unknown window for None"""
+        for key in [key for key in self.__entries if key[1] == window]:
+            del self.__entries[key]
+
+    def __key(self, locator: Hashable) -> tuple:
+        return locator, self.__window, self.__frames
@@ -0,0 +1,85 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from TestProjectLibrary.locators import FIND_ELEMENTS_JS
+
+FIELD_TEXT = "text"
+FIELD_SELECT = "select"
+FIELD_CHECKBOX = "checkbox"
+FIELD_RADIO = "radio"
+FIELD_KINDS = (FIELD_TEXT, FIELD_SELECT, FIELD_CHECKBOX, FIELD_RADIO)
+
+# Fills every field of arguments[0], a list of [query, value, checked] entries, and returns the kind of each field
+# (or an error message). Options of selects are selected by label like `Select From List By Label`, or by value if no
+# option has the label, checkboxes are selected or unselected like `Select Checkbox` / `Unselect Checkbox` and radio
+# buttons select the button of their group with the given value like `Select Radio Button`. Inputs and text areas are
+# filled with text unless arguments[2] is true, in which case they are left for the caller to type into. Other
+# elements, like contenteditable elements, are not supported.
+FILL_FORM_SCRIPT = (
+    FIND_ELEMENTS_JS
+    + """
+var fields = arguments[0], clear = arguments[1], skipText = arguments[2];
+var fire = function (el, type) { el.dispatchEvent(new Event(type, {bubbles: true})); };
+var slice = function (list) { return Array.prototype.slice.call(list); };
+var fill = function (el, value, checked) {
+    var tag = el.tagName.toLowerCase(), type = (el.type || '').toLowerCase();
+    if (tag === 'select') {
+        var wanted = (Array.isArray(value) ? value : [value]).map(String), options = slice(el.options);
+        var matching = function (item) {
+            var byLabel = options.filter(function (option) { return option.text.trim() === item; });
+            return byLabel.length ? byLabel : options.filter(function (option) { return option.value === item; });
+        };
+        var selected = [], missing = [];
+        wanted.forEach(function (item) {
+            var found = matching(item);
+            if (found.length) { selected = selected.concat(found); } else { missing.push(item); }
+        });
+        if (missing.length) { return 'no options with labels or values ' + JSON.stringify(missing); }
+        options.forEach(function (option) {
+            if (selected.indexOf(option) !== -1) { option.selected = true; }
+            else if (!el.multiple) { option.selected = false; }
+        });
+        fire(el, 'input');
+        fire(el, 'change');
+        return 'select';
+    }
+    if (type === 'checkbox') {
+        if (el.checked !== checked) { el.click(); }
+        return 'checkbox';
+    }
+    if (type === 'radio') {
+        var button = slice(document.getElementsByName(el.name)).filter(function (radio) {
+            return radio.type === 'radio' && radio.value === String(value);
+        })[0];
+        if (!button) { return 'no radio button with value ' + JSON.stringify(value); }
+        if (!button.checked) { button.click(); }
+        return 'radio';
+    }
+    if (type === 'file') { return 'file inputs are not supported, use Choose File'; }
+    if (tag !== 'input' && tag !== 'textarea') { return 'unsupported field <' + tag + '>'; }
+    if (skipText) { return 'text'; }
+    var prototype = tag === 'textarea' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(prototype, 'value').set;
+    el.focus();
+    setter.call(el, (clear ? '' : el.value) + value);
+    fire(el, 'input');
+    fire(el, 'change');
+    return 'text';
+};
+return fields.map(function (field) {
+    var el = __tpFind(field[0])[0];
+    return el ? fill(el, field[1], field[2]) : null;
+});
+"""
+)
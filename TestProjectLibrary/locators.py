@@ -0,0 +1,285 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import logging
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+# Strategies of the SeleniumLibrary that can be resolved in the browser by FIND_ELEMENTS_JS
+BROWSER_STRATEGIES = {
+    "identifier": "identifier",
+    "default": "identifier",
+    "id": "id",
+    "name": "name",
+    "xpath": "xpath",
+    "link": "link",
+    "partiallink": "partial link",
+    "css": "css",
+    "class": "class",
+    "tag": "tag",
+}
+
+# Strategies known to the SeleniumLibrary, used to tell a strategy prefix from a value containing ':' or '='
+SELENIUM_STRATEGIES = set(BROWSER_STRATEGIES) | {"dom", "jquery", "sizzle", "sclocator"}
+
+# Defines `__tpFind(query)`, which returns the elements matching a query created by `to_query`.
+# A query is either a [strategy, value] pair or a WebElement resolved by the SeleniumLibrary.
+FIND_ELEMENTS_JS = """
+function __tpFind(query) {
+    if (!Array.isArray(query)) { return query ? [query] : []; }
+    var strategy = query[0], value = query[1], all = function (list) { return Array.prototype.slice.call(list); };
+    var byXpath = function (xpath) {
+        var result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+        return nodes;
+    };
+    var links = function (match) {
+        return all(document.getElementsByTagName('a')).filter(function (a) { return match(a.innerText.trim()); });
+    };
+    switch (strategy) {
+        case 'css': return all(document.querySelectorAll(value));
+        case 'xpath': return byXpath(value);
+        case 'id': var element = document.getElementById(value); return element ? [element] : [];
+        case 'name': return all(document.getElementsByName(value));
+        case 'class': return all(document.getElementsByClassName(value));
+        case 'tag': return all(document.getElementsByTagName(value));
+        case 'link': return links(function (text) { return text === value; });
+        case 'partial link': return links(function (text) { return text.indexOf(value) !== -1; });
+        default: return byXpath('//*[@id=' + JSON.stringify(value) + ' or @name=' + JSON.stringify(value) + ']');
+    }
+}
+"""
+
+# Defines `__tpIsVisible(element)`, a cheap approximation of the WebDriver visibility check
+IS_VISIBLE_JS = """
+function __tpIsVisible(el) {
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' &&
+        !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+"""
+
+# Returns the value of every query passed in arguments[1] for the query type in arguments[0]:
+# [true, value] when the element was found and [false, null] when it was not.
+QUERY_ELEMENTS_SCRIPT = (
+    FIND_ELEMENTS_JS
+    + IS_VISIBLE_JS
+    + """
+var type = arguments[0], queries = arguments[1], attribute = arguments[2];
+var read = function (el) {
+    switch (type) {
+        case 'text': return el.innerText;
+        case 'value': return el.value === undefined ? el.getAttribute('value') : el.value;
+        case 'visible': return __tpIsVisible(el);
+        case 'attribute':
+            var property = el[attribute];
+            if (typeof property === 'boolean') { return property ? 'true' : null; }
+            if (property === undefined || property === null || typeof property === 'object' ||
+                typeof property === 'function') { return el.getAttribute(attribute); }
+            return String(property);
+    }
+};
+return queries.map(function (query) {
+    var el = __tpFind(query)[0];
+    return el ? [true, read(el)] : [false, null];
+});
+"""
+)
+
+
+def parse_locator(locator: str, custom_strategies: Iterable[str] = ()) -> Tuple[str, str]:
+    """Splits a SeleniumLibrary locator string into its strategy and value, the same way the SeleniumLibrary does
+
+    Args:
+        locator (str): The locator, e.g. 'css:#name', 'id=login' or '//button'
+        custom_strategies (Iterable[str]): Normalized names of strategies added with `Add Location Strategy`
+
+    Returns:
+        tuple: The normalized strategy name (lowercase, without spaces) and the locator value
+    """
+    if locator.startswith(("//", "(//")):
+        return "xpath", locator
+    separators = [index for index in (locator.find("="), locator.find(":")) if index != -1]
+    if separators:
+        index = min(separators)
+        prefix = normalize_strategy(locator[:index])
+        if prefix in SELENIUM_STRATEGIES or prefix in custom_strategies:
+            return prefix, locator[index + 1:].lstrip()
+    return "default", locator
+
+
+def to_query(locator, custom_strategies: Iterable[str] = ()) -> Optional[list]:
+    """Returns the [strategy, value] query used by FIND_ELEMENTS_JS for a locator
+
+    Args:
+        locator: A SeleniumLibrary locator string
+        custom_strategies (Iterable[str]): Normalized names of strategies added with `Add Location Strategy`
+
+    Returns:
+        list: The query, or None if the locator can only be resolved by the SeleniumLibrary
+    """
+    if not isinstance(locator, str):
+        return None
+    strategy, value = parse_locator(locator, custom_strategies)
+    if strategy not in BROWSER_STRATEGIES:
+        return None
+    return [BROWSER_STRATEGIES[strategy], value]
+
+
+# HTML elements, matched the same way by XPath and CSS. Foreign elements (SVG, MathML) are not, XPath name tests
+# only match elements of the HTML namespace in HTML documents while CSS type selectors match any namespace.
+HTML_TAGS = frozenset(
+    """a abbr address area article aside audio b bdi bdo blockquote body br button canvas caption cite code col
+    colgroup data datalist dd del details dfn dialog div dl dt em embed fieldset figcaption figure footer form h1 h2
+    h3 h4 h5 h6 head header hr html i iframe img input ins kbd label legend li link main map mark menu meta meter
+    nav noscript object ol optgroup option output p param picture pre progress q s samp script section select small
+    source span strong style sub summary sup table tbody td template textarea tfoot th thead time title tr track u
+    ul var video wbr""".split()
+)
+
+# Attributes whose values CSS matches case-insensitively in HTML documents, unlike XPath
+CASE_INSENSITIVE_ATTRIBUTES = frozenset(
+    """accept accept-charset align alink axis bgcolor charset checked clear codetype color compact declare defer dir
+    direction disabled enctype face frame hreflang http-equiv lang language link media method multiple nohref noresize
+    noshade nowrap readonly rel rev rules scope scrolling selected shape target text type valign valuetype
+    vlink""".split()
+)
+
+_LITERAL = r"""'[^']*'|"[^"]*\""""
+_ATTRIBUTE = r"[a-z_][a-z0-9_-]*"
+_STEP = re.compile(r"(//|/)([a-z][a-z0-9]*|\*)((?:\[[^\[\]]*\])*)")
+_CONDITION = re.compile(
+    rf"\s*(?:@(?P<attribute>{_ATTRIBUTE})\s*=\s*(?P<value>{_LITERAL})"
+    rf"|(?P<function>contains|starts-with)\(\s*@(?P<fn_attribute>{_ATTRIBUTE})\s*,\s*(?P<fn_value>{_LITERAL})\s*\))\s*"
+)
+_AND = re.compile(r"and\b")
+_CSS_OPERATORS = {"contains": "*=", "starts-with": "^="}
+
+
+def _css_string(literal: str) -> Optional[str]:
+    value = literal[1:-1]
+    if any(ord(char) < 0x20 for char in value):
+        return None
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _css_predicate(predicate: str) -> Optional[str]:
+    # Converts the conditions of an XPath predicate joined with `and` into CSS attribute selectors
+    selectors, position = [], 0
+    while True:
+        match = _CONDITION.match(predicate, position)
+        if not match:
+            return None
+        if match.group("attribute"):
+            value = _css_string(match.group("value"))
+            operator, attribute = "=", match.group("attribute")
+        else:
+            value = _css_string(match.group("fn_value"))
+            operator, attribute = _CSS_OPERATORS[match.group("function")], match.group("fn_attribute")
+            if value == '""':
+                return None  # An empty substring also matches elements without the attribute in XPath
+        if value is None or attribute in CASE_INSENSITIVE_ATTRIBUTES:
+            return None
+        selectors.append(f"[{attribute}{operator}{value}]")
+        position = match.end()
+        if position == len(predicate):
+            return "".join(selectors)
+        match = _AND.match(predicate, position)
+        if not match:
+            return None
+        position = match.end()
+
+
+@lru_cache(maxsize=1024)
+def xpath_to_css(xpath: str) -> Optional[str]:
+    """Translates a simple XPath into a CSS selector matching the same elements in the same order
+
+    Supported are paths starting with `//`, made of steps with HTML tag names (or `*`) and predicates comparing
+    attributes with `=`, `contains()` or `starts-with()`, joined with `and`, e.g. `//div[@class='list']/button`.
+
+    Args:
+        xpath (str): The XPath expression
+
+    Returns:
+        str: The CSS selector, or None if the XPath can't be translated
+    """
+    xpath = xpath.strip()
+    steps, position = [], 0
+    for match in _STEP.finditer(xpath):
+        if match.start() != position:
+            return None
+        separator, tag, predicates = match.groups()
+        if not steps and separator != "//":
+            return None
+        if tag != "*" and tag not in HTML_TAGS:
+            return None
+        selector = "" if tag == "*" and predicates else tag
+        for predicate in re.findall(r"\[([^\[\]]*)\]", predicates):
+            attributes = _css_predicate(predicate)
+            if attributes is None:
+                return None
+            selector += attributes
+        steps.append(("" if not steps else " " if separator == "//" else " > ") + selector)
+        position = match.end()
+    if not steps or position != len(xpath):
+        return None
+    return "".join(steps)
+
+
+@lru_cache(maxsize=1024)
+def optimize_locator(locator: str, custom_strategies: FrozenSet[str] = frozenset()) -> Optional[str]:
+    """Returns an equivalent CSS locator for a locator using a simple XPath, see `xpath_to_css`
+
+    Args:
+        locator (str): A SeleniumLibrary locator string
+        custom_strategies (frozenset): Normalized names of strategies added with `Add Location Strategy`
+
+    Returns:
+        str: The optimized locator, or None if the locator does not use an XPath or it can't be translated
+    """
+    strategy, value = parse_locator(locator, custom_strategies)
+    if strategy != "xpath":
+        return None
+    css = xpath_to_css(value)
+    return None if css is None else f"css:{css}"
+
+
+class LocatorOptimizer:
+    """Rewrites locators using simple XPaths into equivalent, faster CSS locators
+
+    Args:
+        warn (bool): If True, a warning is logged once for every XPath locator that can't be optimized
+    """
+
+    def __init__(self, warn: bool = False):
+        self.__warn = warn
+        self.__warned = set()
+
+    def optimize(self, locator: str, custom_strategies: Iterable[str] = ()) -> str:
+        """Returns the optimized locator, or the given locator if it can't be optimized"""
+        custom_strategies = frozenset(custom_strategies)
+        optimized = optimize_locator(locator, custom_strategies)
+        if optimized is not None:
+            return optimized
+        if self.__warn and locator not in self.__warned and parse_locator(locator, custom_strategies)[0] == "xpath":
+            self.__warned.add(locator)
+            logging.warning(f"Locator '{locator}' can't be optimized, consider using an id or a CSS locator.")
+        return locator
+
+
+def normalize_strategy(name: str) -> str:
+    """Normalizes a strategy name the way the SeleniumLibrary compares them (caseless and spaceless)"""
+    return name.strip().lower().replace(" ", "")
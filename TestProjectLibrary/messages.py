@@ -0,0 +1,134 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import hashlib
+import logging
+from typing import Iterator, Optional
+
+# The directory side files are written to, inside the output directory of the execution
+SIDE_FILE_DIRECTORY = "report-values"
+
+
+def _chunks(value) -> Iterator[str]:
+    """Yields the text of a value piece by piece, the same text as `str(value)` for strings, lists, tuples and dicts"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        yield "[" if isinstance(value, list) else "("
+        for index, item in enumerate(value):
+            yield f"{', ' if index else ''}{item!r}"
+        yield "]" if isinstance(value, list) else ("," if len(value) == 1 else "") + ")"
+    elif isinstance(value, dict):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            yield f"{', ' if index else ''}{key!r}: {item!r}"
+        yield "}"
+    else:
+        yield str(value)
+
+
+def _output_directory() -> str:
+    from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
+
+    try:
+        return BuiltIn().get_variable_value("${OUTPUT DIR}") or os.getcwd()
+    except RobotNotRunningError:
+        return os.getcwd()
+
+
+class MessagePolicy:
+    """Bounds the size of report messages and descriptions
+
+    A text longer than `max_length` is cut at that length and followed by its full length and a hash, so that reports
+    of equal values can still be matched. The text of a value longer than `side_file_length` is streamed to a file named
+    after its hash instead of being built in memory, and the message refers to that file.
+
+    Args:
+        max_length (int): Maximum number of characters of a message or description, before the length and hash
+        side_file_length (int): Number of characters from which values are written to a side file, None for never
+        directory (str): The directory side files are written to, by default `report-values` in the output directory
+    """
+
+    def __init__(
+        self, max_length: int = 4000, side_file_length: Optional[int] = 100000, directory: Optional[str] = None
+    ):
+        if int(max_length) < 1:
+            raise ValueError("The maximum message length must be a positive number")
+        self.max_length = int(max_length)
+        self.side_file_length = int(side_file_length) if side_file_length else None
+        self.directory = directory
+
+    def bound(self, text) -> str:
+        """Returns the text, cut to `max_length` characters followed by its length and hash if it is longer"""
+        text = "" if text is None else str(text)
+        if len(text) <= self.max_length:
+            return text
+        return self._truncated(text[: self.max_length], len(text), self._hash(text))
+
+    def describe(self, value) -> str:
+        """Returns the bounded text of a value, e.g. a keyword result, writing it to a side file if it is large
+
+        The text is built piece by piece, so that no more than `side_file_length` characters of it are held in memory.
+        """
+        hasher = hashlib.blake2b(digest_size=8)
+        # The text so far until a side file is opened, or only its start if there are no side files
+        buffered, kept, length, side_file = [], 0, 0, None
+        try:
+            for chunk in _chunks(value):
+                hasher.update(chunk.encode("utf-8", "replace"))
+                length += len(chunk)
+                if side_file is not None:
+                    side_file.write(chunk)
+                elif self.side_file_length and length > self.side_file_length:
+                    side_file = self._open_side_file()
+                    side_file.writelines(buffered)
+                    side_file.write(chunk)
+                    buffered = [("".join(buffered) + chunk[: self.max_length])[: self.max_length]]
+                elif self.side_file_length or kept < self.max_length:
+                    buffered.append(chunk if self.side_file_length else chunk[: self.max_length - kept])
+                    kept += len(buffered[-1])
+        finally:
+            if side_file is not None:
+                side_file.close()
+        text = "".join(buffered)
+        if length <= self.max_length:
+            return text
+        digest = hasher.hexdigest()
+        path = self._store_side_file(side_file.name, digest) if side_file is not None else None
+        return self._truncated(text[: self.max_length], length, digest, path)
+
+    def _open_side_file(self):
+        directory = self.directory or os.path.join(_output_directory(), SIDE_FILE_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        return open(os.path.join(directory, f".{os.getpid()}.tmp"), "w", encoding="utf-8", errors="replace")
+
+    @staticmethod
+    def _store_side_file(temporary: str, digest: str) -> Optional[str]:
+        path = os.path.join(os.path.dirname(temporary), f"{digest}.txt")
+        try:
+            os.replace(temporary, path)  # Equal values share a file
+            return path
+        except OSError as e:
+            logging.warning(f"Failed to write the report value file {path}: {e}")
+            return None
+
+    @staticmethod
+    def _truncated(preview: str, length: int, digest: str, path: Optional[str] = None) -> str:
+        location = f", saved to {path}" if path else ""
+        return f"{preview}... [{length} characters, blake2b {digest}{location}]"
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=8).hexdigest()
@@ -0,0 +1,136 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import math
+from collections import defaultdict
+from time import perf_counter
+from typing import Dict, List, Optional
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of an already sorted list of values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values: List[float]) -> dict:
+    """Returns the count, total, percentiles and maximum of a list of durations, in milliseconds"""
+    values = sorted(values)
+    summary = {"count": len(values), "total_ms": round(sum(values) * 1000, 3)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(values, pct) * 1000, 3)
+    summary["max_ms"] = round(values[-1] * 1000, 3) if values else 0.0
+    return summary
+
+
+class KeywordTimer:
+    """Measures the phases of a single keyword execution
+
+    Args:
+        metrics (KeywordMetrics): The metrics the timings are recorded in
+        keyword (str): The name of the measured keyword
+    """
+
+    def __init__(self, metrics, keyword: str):
+        self.__metrics = metrics
+        self.__keyword = keyword
+        self.__phases = {}
+        self.__start = self.__last = perf_counter()
+
+    def mark(self, phase: str):
+        """Attributes the time since the previous mark to the given phase"""
+        now = perf_counter()
+        self.__phases[phase] = self.__phases.get(phase, 0.0) + now - self.__last
+        self.__last = now
+
+    def stop(self):
+        """Records all marked phases, the wrapper overhead and the total duration"""
+        total = perf_counter() - self.__start
+        self.__phases["wrapper"] = max(0.0, total - sum(self.__phases.values()))
+        self.__phases["total"] = total
+        self.__metrics.record(self.__keyword, self.__phases)
+
+
+class _NullTimer:
+    def mark(self, phase: str):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class KeywordMetrics:
+    """Aggregates keyword phase timings per keyword and per test
+
+    Args:
+        output (str): Optional path of the JSON file the summary is written to
+    """
+
+    def __init__(self, output: Optional[str] = None):
+        self.output = output
+        self.__current_test = None
+        self.__keywords: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+        self.__tests: Dict[str, List[float]] = defaultdict(list)
+
+    def start(self, keyword: str) -> KeywordTimer:
+        return KeywordTimer(self, keyword)
+
+    def start_test(self, name: str):
+        self.__current_test = name
+
+    def end_test(self):
+        self.__current_test = None
+
+    def record(self, keyword: str, phases: Dict[str, float]):
+        for phase, duration in phases.items():
+            self.__keywords[keyword][phase].append(duration)
+        if self.__current_test is not None:
+            self.__tests[self.__current_test].append(phases["total"])
+
+    def summary(self) -> dict:
+        """Returns the percentile summary of all recorded timings"""
+        return {
+            "keywords": {
+                keyword: {phase: summarize(values) for phase, values in phases.items()}
+                for keyword, phases in sorted(self.__keywords.items())
+            },
+            "tests": {test: summarize(values) for test, values in self.__tests.items()},
+        }
+
+    def write(self, summary: dict = None):
+        """Writes the summary as JSON to the output file, if one is set"""
+        if self.output:
+            with open(self.output, "w") as f:
+                json.dump(summary or self.summary(), f, indent=2)
+
+    def html_table(self, summary: dict = None) -> str:
+        """Returns the keyword summary as an HTML table for the Robot log"""
+        summary = summary or self.summary()
+        columns = ["count"] + [f"p{pct}_ms" for pct in PERCENTILES] + ["max_ms"]
+        rows = [
+            "<tr><th>Keyword</th><th>Phase</th>" + "".join(f"<th>{c}</th>" for c in columns) + "</tr>"
+        ]
+        for keyword, phases in summary["keywords"].items():
+            for phase, values in phases.items():
+                cells = "".join(f"<td>{values[c]}</td>" for c in columns)
+                rows.append(f"<tr><td>{keyword}</td><td>{phase}</td>{cells}</tr>")
+        return f"<table border='1'>{''.join(rows)}</table>"
@@ -0,0 +1,86 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from typing import List, Optional
+
+# The top document and its frames, searched by `Page Should Contain`
+SCOPE_PAGE = "page"
+# The document of the current window and frame
+SCOPE_FRAME = "frame"
+
+# Returns [token, content] for the documents of the scope in arguments[0]. The token identifies the documents and
+# their DOM version, counted by a MutationObserver installed in every document the first time it is seen, so it
+# changes whenever the window, frame, document or DOM changes. The content is null when the token is one of the
+# already cached tokens in arguments[1], otherwise it holds the text of every document (the XPath string value of
+# its root element), whether all frames were readable and the page title.
+PAGE_CONTENT_SCRIPT = """
+var scope = arguments[0], known = arguments[1];
+var version = function (doc) {
+    if (!doc.__tpDom) {
+        var state = doc.__tpDom = {id: Math.random().toString(36).slice(2), version: 0};
+        new MutationObserver(function () { state.version++; }).observe(
+            doc, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    return doc.__tpDom.id + '.' + doc.__tpDom.version;
+};
+var docs = [document], complete = true;
+if (scope === 'page') {
+    docs = [window.top.document];
+    Array.prototype.slice.call(docs[0].querySelectorAll('frame, iframe')).forEach(function (frame) {
+        var doc = null;
+        try { doc = frame.contentDocument; } catch (e) {}
+        if (doc) { docs.push(doc); } else { complete = false; }
+    });
+}
+var token = scope + ':' + docs.map(version).join('|');
+if (known.indexOf(token) !== -1) { return [token, null]; }
+return [token, {
+    texts: docs.map(function (doc) { return doc.documentElement ? doc.documentElement.textContent : ''; }),
+    complete: complete,
+    title: docs[0].title
+}];
+"""
+
+
+class PageCache:
+    """Page contents read by PAGE_CONTENT_SCRIPT, keyed by their token
+
+    The least recently used contents are dropped once more than `max_entries` are cached.
+
+    Args:
+        max_entries (int): Maximum number of cached page contents
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+
+    def tokens(self) -> List[str]:
+        return list(self.__entries)
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self.__entries.get(token)
+        if entry is not None:
+            self.__entries.move_to_end(token)
+        return entry
+
+    def put(self, token: str, content: dict):
+        self.__entries[token] = content
+        self.__entries.move_to_end(token)
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        self.__entries.clear()
@@ -0,0 +1,211 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+# Clears the web storage of the current page, ignoring pages where storage is not accessible (e.g. about:blank)
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PooledSession:
+    """A driver owned by the session pool
+
+    Args:
+        key (Hashable): The key of the session, describing how the driver was created
+        driver: The driver of the session
+    """
+
+    def __init__(self, key: Hashable, driver):
+        self.key = key
+        self.driver = driver
+        self.created = time.monotonic()
+        self.uses = 0
+
+
+class SessionPool:
+    """Keeps driver sessions alive between tests so that they can be reused instead of recreated
+
+    Sessions are keyed by how their driver was created, a driver is only handed out again for the same key.
+    Released drivers are reset: extra windows are closed, cookies and the web storage of the current page are
+    cleared and the browser navigates to about:blank.
+
+    With `max_sessions`, idle sessions (the oldest first) are quit before a driver is created that would exceed the
+    limit, and no spare session is created without room for it. The TestProject SDK allows a single driver per
+    process, so the library uses a limit of 1.
+
+    Args:
+        max_age (float): Seconds after which a session is no longer reused, None for no limit
+        max_uses (int): Number of times a session is handed out before it is no longer reused, None for no limit
+        prewarm (bool): If True, a spare session is created in the background whenever a session is handed out
+        max_sessions (int): Maximum number of live drivers, idle, handed out or being created, None for no limit
+    """
+
+    def __init__(
+        self,
+        max_age: Optional[float] = None,
+        max_uses: Optional[int] = None,
+        prewarm: bool = False,
+        max_sessions: Optional[int] = None,
+    ):
+        self.__max_age = max_age
+        self.__max_uses = max_uses
+        self.__prewarm = prewarm
+        self.__max_sessions = max_sessions
+        self.__lock = threading.Condition()
+        self.__idle: Dict[Hashable, List[PooledSession]] = {}
+        self.__in_use: Dict[int, PooledSession] = {}
+        self.__warming: Dict[Hashable, int] = {}
+
+    def acquire(self, key: Hashable, factory: Callable):
+        """Returns an idle driver created for the given key, or a new one if there is none
+
+        Args:
+            key (Hashable): The session key
+            factory (Callable): Creates a new driver for the key, called without arguments
+
+        Returns:
+            The driver of the session
+        """
+        session = None
+        expired = []
+        with self.__lock:
+            while session is None:
+                idle = self.__idle.get(key, [])
+                while idle and session is None:
+                    candidate = idle.pop()
+                    if self.__expired(candidate):
+                        expired.append(candidate)
+                    else:
+                        session = candidate
+                if session is None and not self.__warming.get(key):
+                    break
+                if session is None:
+                    # A spare session for this key is being created, waiting is cheaper than creating another one
+                    self.__lock.wait()
+            if session is None:
+                expired.extend(self.__evict(self.__live() + 1))
+            needs_spare = self.__prewarm and not self.__idle.get(key) and not self.__warming.get(key)
+        for candidate in expired:
+            self.__quit(candidate)
+        if session is None:
+            session = PooledSession(key, factory())
+        session.uses += 1
+        with self.__lock:
+            self.__in_use[id(session.driver)] = session
+        if needs_spare:
+            self.warm(key, factory)
+        return session.driver
+
+    def release(self, driver) -> bool:
+        """Resets a driver handed out by the pool and makes it available again
+
+        Args:
+            driver: The driver to release
+
+        Returns:
+            bool: True if the driver belongs to the pool, False otherwise
+        """
+        with self.__lock:
+            session = self.__in_use.pop(id(driver), None)
+        if session is None:
+            return False
+        if self.__expired(session) or not self.__reset(session.driver):
+            self.__quit(session)
+            return True
+        with self.__lock:
+            self.__idle.setdefault(session.key, []).append(session)
+            self.__lock.notify_all()
+        return True
+
+    def warm(self, key: Hashable, factory: Callable) -> bool:
+        """Creates a spare session for the given key in the background, if `max_sessions` leaves room for it
+
+        Returns:
+            bool: True if a spare session is being created
+        """
+        with self.__lock:
+            if self.__max_sessions is not None and self.__live() >= self.__max_sessions:
+                return False
+            self.__warming[key] = self.__warming.get(key, 0) + 1
+        threading.Thread(target=self.__warm, args=(key, factory), name="TestProjectSessionWarmup", daemon=True).start()
+        return True
+
+    def close(self):
+        """Quits all idle and handed out sessions"""
+        with self.__lock:
+            sessions = [s for idle in self.__idle.values() for s in idle] + list(self.__in_use.values())
+            self.__idle.clear()
+            self.__in_use.clear()
+        for session in sessions:
+            self.__quit(session)
+
+    def __warm(self, key: Hashable, factory: Callable):
+        try:
+            session = PooledSession(key, factory())
+        except Exception as e:
+            logging.warning(f"Failed to create a spare session: {e}")
+            session = None
+        with self.__lock:
+            self.__warming[key] -= 1
+            if session is not None:
+                self.__idle.setdefault(key, []).append(session)
+            self.__lock.notify_all()
+
+    def __live(self) -> int:
+        idle = sum(len(sessions) for sessions in self.__idle.values())
+        return idle + len(self.__in_use) + sum(self.__warming.values())
+
+    def __evict(self, needed: int) -> List[PooledSession]:
+        """Removes the oldest idle sessions until `needed` live sessions fit in `max_sessions`, and returns them"""
+        if self.__max_sessions is None or needed <= self.__max_sessions:
+            return []
+        idle = sorted((s for sessions in self.__idle.values() for s in sessions), key=lambda s: s.created)
+        evicted = idle[: needed - self.__max_sessions]
+        for session in evicted:
+            self.__idle[session.key].remove(session)
+        return evicted
+
+    def __expired(self, session: PooledSession) -> bool:
+        if self.__max_uses is not None and session.uses >= self.__max_uses:
+            return True
+        return self.__max_age is not None and time.monotonic() - session.created >= self.__max_age
+
+    @staticmethod
+    def __reset(driver) -> bool:
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            driver.execute_script(CLEAR_STORAGE_SCRIPT)
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to reset a pooled session, it will not be reused: {e}")
+            return False
+
+    @staticmethod
+    def __quit(session: PooledSession):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logging.warning(f"Failed to quit a pooled session: {e}")
@@ -0,0 +1,192 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import itertools
+from collections import Counter, deque
+from time import perf_counter
+from typing import Callable, Deque, Dict, List, Optional
+
+BACKEND_AGENT = "agent"
+BACKEND_RECORDER = "recorder"
+
+# The key of element references in W3C WebDriver responses
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+WINDOW_HANDLE = "recorder-window"
+
+
+def parse_backend(backend: Optional[str]):
+    """Parses the `backend` argument of `Init Testproject Driver`
+
+    Args:
+        backend (str): `agent`, `recorder` or `recorder:<path>` to also write the records to a JSONL file
+
+    Returns:
+        tuple: The backend name and the output path of the recorder, None if it has none
+    """
+    name, _, output = str(backend or BACKEND_AGENT).partition(":")
+    name = name.strip().lower()
+    if name not in (BACKEND_AGENT, BACKEND_RECORDER) or (output and name == BACKEND_AGENT):
+        raise ValueError(f"Unsupported backend '{backend}', expected '{BACKEND_AGENT}', '{BACKEND_RECORDER}' or "
+                         f"'{BACKEND_RECORDER}:<path>'")
+    return name, output.strip() or None
+
+
+class StepRecorder:
+    """A reporter that records steps and tests instead of sending them to the TestProject Agent
+
+    Every record is a dict with its `kind` (`step` or `test`), the arguments it was reported with and
+    the seconds `elapsed` since the recorder was created. The latest `max_records` records are kept in memory and,
+    if `output` is given, all records are written to that file as JSON lines on every `flush`.
+
+    Args:
+        output (str): Optional path of the JSONL file the records are appended to
+        max_records (int): Number of latest records kept in memory
+    """
+
+    # Records waiting to be written, after which they are written without waiting for the next flush
+    MAX_PENDING = 1000
+
+    def __init__(self, output: Optional[str] = None, max_records: int = 10000):
+        self.output = output
+        self.records: Deque[dict] = deque(maxlen=max_records)
+        self.commands = Counter()
+        self.__totals = Counter()
+        self.__pending: List[dict] = []
+        self.__started = perf_counter()
+
+    def step(self, description: str = "", message: str = "", passed: bool = True, screenshot: bool = False, **kwargs):
+        self._record("step", description=description, message=message, passed=passed, screenshot=screenshot, **kwargs)
+
+    def test(self, name: str = None, passed: bool = True, **kwargs):
+        self._record("test", name=name, passed=passed, **kwargs)
+
+    def exclude_test_names(self, names):
+        pass
+
+    def disable_command_reports(self, disabled: bool):
+        pass
+
+    def _record(self, kind: str, **kwargs):
+        kwargs.update(kind=kind, elapsed=round(perf_counter() - self.__started, 6))
+        self.records.append(kwargs)
+        self.__totals[kind] += 1
+        if kind == "step" and not kwargs["passed"]:
+            self.__totals["failed_step"] += 1
+        if self.output:
+            self.__pending.append(kwargs)
+            if len(self.__pending) >= self.MAX_PENDING:
+                self.flush()
+
+    def flush(self):
+        """Appends the records made since the previous flush to the output file, if one is set"""
+        if self.output and self.__pending:
+            records, self.__pending = self.__pending, []
+            with open(self.output, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def summary(self) -> dict:
+        """Returns the number of recorded steps, failed steps, tests and WebDriver commands per command name"""
+        return {
+            "steps": self.__totals["step"],
+            "failed_steps": self.__totals["failed_step"],
+            "tests": self.__totals["test"],
+            "commands": dict(self.commands),
+        }
+
+
+class RecordingExecutor:
+    """A WebDriver command executor answering every command locally with a canned W3C response
+
+    Elements are always found (one per `find_elements` call), scripts return None, elements are displayed and
+    enabled and have no text. Responses can be overridden per command name, with a value or a callable taking the
+    command parameters.
+
+    Args:
+        recorder (StepRecorder): The recorder counting the executed commands
+        responses (dict): Optional responses by command name, e.g. {'getTitle': 'Home'}
+    """
+
+    def __init__(self, recorder: StepRecorder, responses: Optional[Dict[str, object]] = None):
+        from selenium.webdriver.remote import webelement
+
+        self.w3c = True
+        # W3C sessions check the visibility of elements with a script rather than a command
+        self.__is_displayed_script = getattr(webelement, "isDisplayed_js", None)
+        self.__recorder = recorder
+        self.__ids = itertools.count(1)
+        self.__url = "about:blank"
+        self.__responses: Dict[str, Callable] = {
+            "newSession": lambda params: {"sessionId": "recorder", "capabilities": {"browserName": "recorder"}},
+            "get": self.__navigate,
+            "getCurrentUrl": lambda params: self.__url,
+            "getTitle": lambda params: "",
+            "getPageSource": lambda params: "<html><head></head><body></body></html>",
+            "findElement": lambda params: self.__element(),
+            "findChildElement": lambda params: self.__element(),
+            "findElements": lambda params: [self.__element()],
+            "findChildElements": lambda params: [self.__element()],
+            "w3cExecuteScript": self.__execute_script,
+            "getElementText": lambda params: "",
+            "getElementTagName": lambda params: "div",
+            "isElementDisplayed": lambda params: True,
+            "isElementEnabled": lambda params: True,
+            "isElementSelected": lambda params: False,
+            "getElementRect": lambda params: {"x": 0, "y": 0, "width": 0, "height": 0},
+            "w3cGetCurrentWindowHandle": lambda params: WINDOW_HANDLE,
+            "w3cGetWindowHandles": lambda params: [WINDOW_HANDLE],
+            "getWindowRect": lambda params: {"x": 0, "y": 0, "width": 1280, "height": 800},
+            "setWindowRect": lambda params: {"x": 0, "y": 0, "width": 1280, "height": 800},
+            "getCookies": lambda params: [],
+            "screenshot": lambda params: "",
+            "elementScreenshot": lambda params: "",
+        }
+        for command, response in (responses or {}).items():
+            self.__responses[command] = response if callable(response) else (lambda params, value=response: value)
+
+    def execute(self, command: str, params: dict) -> dict:
+        self.__recorder.commands[command] += 1
+        response = self.__responses.get(command)
+        return {"value": response(params) if response else None}
+
+    def __navigate(self, params):
+        self.__url = params.get("url") or "about:blank"
+
+    def __execute_script(self, params):
+        if self.__is_displayed_script and self.__is_displayed_script in params.get("script", ""):
+            return True
+        return None
+
+    def __element(self):
+        return {ELEMENT_KEY: f"recorder-element-{next(self.__ids)}"}
+
+
+def create_recording_driver(recorder: StepRecorder, responses: Optional[Dict[str, object]] = None):
+    """Returns a WebDriver that sends its commands to a RecordingExecutor and reports to the given recorder
+
+    Args:
+        recorder (StepRecorder): The recorder the driver reports to and counts its commands with
+        responses (dict): Optional command responses, see RecordingExecutor
+
+    Returns:
+        WebDriver: The driver, with a `report()` method like the drivers of the TestProject SDK
+    """
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    class RecordingDriver(WebDriver):
+        def report(self):
+            return recorder
+
+    return RecordingDriver(command_executor=RecordingExecutor(recorder, responses), desired_capabilities={})
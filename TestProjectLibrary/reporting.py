@@ -0,0 +1,171 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import logging
+import functools
+import threading
+from typing import Optional
+
+
+def report_step(reporter, description: str, message: str, passed: bool, screenshot: Optional[str] = None, **kwargs):
+    """Reports a step with a screenshot that was captured before, e.g. by the `ScreenshotPipeline`
+
+    The `step` method of the TestProject reporter can only capture a new screenshot, so such steps are sent to the
+    Agent directly. Reporters without an Agent, like the `StepRecorder`, only record whether there was a screenshot.
+
+    Args:
+        reporter: The TestProject reporter to send the step with
+        description (str): The step description
+        message (str): A message that goes with the step
+        passed (bool): True if the step passed
+        screenshot (str): The base64 encoded PNG screenshot, None for a step without a screenshot
+        **kwargs: The element, inputs and outputs of the step, see the TestProject reporter `step` method
+    """
+    executor = _agent_executor(reporter)
+    if executor is None or screenshot is None:
+        reporter.step(
+            description=description,
+            message=message,
+            passed=passed,
+            screenshot=executor is None and screenshot is not None,
+            **kwargs,
+        )
+        return
+    from src.testproject.rest.messages import StepReport
+
+    executor.update_known_test_name()
+    if not executor.disable_reports:
+        executor.agent_client.report_step(
+            StepReport(
+                description,
+                message,
+                passed,
+                screenshot,
+                kwargs.get("element"),
+                kwargs.get("inputs"),
+                kwargs.get("outputs"),
+            )
+        )
+
+
+def _agent_executor(reporter):
+    """Returns the command executor of a reporter that sends steps to the Agent, None for other reporters"""
+    executor = getattr(reporter, "_command_executor", None)
+    return executor if getattr(executor, "agent_client", None) is not None else None
+
+
+def capture_screenshot(reporter) -> Optional[str]:
+    """Captures a screenshot for a step of a reporter that sends steps to the Agent, like its `step` method does
+
+    Returns:
+        str: The base64 encoded PNG screenshot, or None for reporters without an Agent, like the `StepRecorder`
+    """
+    reporter = reporter.reporter if isinstance(reporter, ReportingPipeline) else reporter
+    executor = _agent_executor(reporter)
+    # The executor captures screenshots without reporting a driver command
+    return executor.create_screenshot() if executor is not None else None
+
+
+def sends_reports(reporter) -> bool:
+    """Returns False if the reporter drops the steps, e.g. because the driver was created with disabled reports"""
+    reporter = reporter.reporter if isinstance(reporter, ReportingPipeline) else reporter
+    executor = getattr(reporter, "_command_executor", None)
+    return not getattr(executor, "disable_reports", False)
+
+
+class ReportingPipeline:
+    """Sends step and test reports to a TestProject reporter from a background thread
+
+    Reports are put on a bounded queue and handed to the reporter in order by a worker thread, one at a time.
+    The TestProject SDK queues them again and sends them to the Agent in batches when the Agent supports it.
+    When the queue is full, reporting blocks until the worker catches up. The screenshot of a step is captured on
+    the calling thread, so that it shows the page as it was when the step was reported, and queued with the step.
+    Reports made after `close` are sent on the calling thread.
+
+    Args:
+        reporter: The TestProject reporter to send the reports with
+        max_queue_size (int): Maximum number of reports waiting to be sent
+    """
+
+    def __init__(self, reporter, max_queue_size: int = 1000):
+        self.__reporter = reporter
+        self.__closed = False
+        self.__queue = queue.Queue(maxsize=max_queue_size)
+        self.__worker = threading.Thread(target=self.__run, name="TestProjectReporting", daemon=True)
+        self.__worker.start()
+
+    @property
+    def reporter(self):
+        return self.__reporter
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def step(self, description: str, message: str, passed: bool, screenshot: bool = False, **kwargs):
+        """Reports a step, see the TestProject reporter `step` method for the arguments"""
+        kwargs.update(description=description, message=message, passed=passed)
+        executor = _agent_executor(self.__reporter)
+        if screenshot and executor is not None and not executor.disable_reports:
+            # The executor captures screenshots without reporting a driver command
+            kwargs.update(screenshot=executor.create_screenshot())
+            self.__put(functools.partial(report_step, self.__reporter), kwargs)
+        else:
+            # Reporters without an Agent take no screenshot, and disabled reports need none
+            kwargs.update(screenshot=bool(screenshot))
+            self.__put(self.__reporter.step, kwargs)
+
+    def call(self, report, **kwargs):
+        """Queues a call of `report` with the given arguments, made in order with the other reports"""
+        self.__put(report, kwargs)
+
+    def test(self, **kwargs):
+        """Reports a test, see the TestProject reporter `test` method for the arguments"""
+        self.__put(self.__reporter.test, kwargs)
+
+    def flush(self):
+        """Blocks until all queued reports were sent"""
+        if self.__worker.is_alive():
+            self.__queue.join()
+
+    def close(self):
+        """Sends all queued reports and stops the worker thread"""
+        if not self.__closed:
+            self.__closed = True
+            self.__queue.put(None)
+            self.__worker.join()
+
+    def __put(self, report, kwargs):
+        if self.__closed:
+            self.__send(report, kwargs)
+        else:
+            self.__queue.put((report, kwargs))
+
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    return
+                self.__send(*item)
+            finally:
+                self.__queue.task_done()
+
+    @staticmethod
+    def __send(report, kwargs):
+        try:
+            report(**kwargs)
+        except Exception as e:
+            logging.warning(f"Failed to send report '{kwargs.get('description', kwargs.get('name'))}': {e}")
@@ -0,0 +1,352 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import base64
+import hashlib
+import logging
+import datetime
+import threading
+import importlib.util
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, NamedTuple, Optional
+
+# The file extensions of the image formats of the screenshot pipeline
+IMAGE_FORMATS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+# Installs a MutationObserver once per document and returns a cheap fingerprint of the page:
+# the URL, a random id of the document instance and the number of DOM mutations seen so far.
+PAGE_FINGERPRINT_SCRIPT = """
+if (!window.__tpFingerprint) {
+    window.__tpFingerprint = {id: Math.random().toString(36).slice(2), mutations: 0};
+    new MutationObserver(function (records) {
+        window.__tpFingerprint.mutations += records.length;
+    }).observe(document, {attributes: true, childList: true, characterData: true, subtree: true});
+}
+return [window.location.href, window.__tpFingerprint.id, window.__tpFingerprint.mutations];
+"""
+
+
+class ScreenshotPolicy:
+    """Decides which report steps are sent with a screenshot
+
+    Supported policies:
+        always: Every step has a screenshot (default)
+        never: No step has a screenshot
+        failures: Only failed steps have a screenshot
+        every:N: Every Nth step and all failed steps have a screenshot
+        categories:A,B: Steps of keywords in the given categories (action, get, assert, wait)
+            and all failed steps have a screenshot
+        page_change: Steps after which the page URL or DOM changed and all failed steps have a screenshot
+    """
+
+    ALWAYS = "always"
+    NEVER = "never"
+    FAILURES = "failures"
+    EVERY = "every"
+    CATEGORIES = "categories"
+    PAGE_CHANGE = "page_change"
+    MODES = [ALWAYS, NEVER, FAILURES, EVERY, CATEGORIES, PAGE_CHANGE]
+
+    def __init__(self, mode: str = ALWAYS, every: int = 1, categories: Optional[Iterable[str]] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported screenshot policy '{mode}', supported policies are: {', '.join(self.MODES)}")
+        if int(every) < 1:
+            raise ValueError("Screenshot policy 'every' value must be a positive number")
+        self.mode = mode
+        self.every = int(every)
+        self.categories = frozenset(c.strip().lower() for c in categories or [] if c.strip())
+        self.__steps = 0
+        self.__last_fingerprint = None
+
+    @classmethod
+    def parse(cls, policy: str):
+        """Creates a policy from its textual form, e.g. 'failures', 'every:5' or 'categories:action,wait'
+
+        Args:
+            policy (str): The textual form of the policy
+
+        Returns:
+            ScreenshotPolicy: The parsed policy
+        """
+        if isinstance(policy, ScreenshotPolicy):
+            return policy
+        mode, _, value = str(policy).strip().lower().partition(":")
+        if mode == cls.EVERY:
+            return cls(mode, every=value or 1)
+        if mode == cls.CATEGORIES:
+            return cls(mode, categories=value.split(","))
+        return cls(mode)
+
+    def should_capture(self, passed: bool, category: str = "", fingerprint: Callable = None) -> bool:
+        """Returns True if the current step should be reported with a screenshot
+
+        Args:
+            passed (bool): Whether the step passed
+            category (str): The category of the keyword that produced the step
+            fingerprint (Callable): Returns a fingerprint of the current page, only called by the page_change policy
+
+        Returns:
+            bool: True if a screenshot should be taken
+        """
+        self.__steps += 1
+        if self.mode == self.NEVER:
+            return False
+        if self.mode == self.ALWAYS or not passed:
+            return True
+        if self.mode == self.EVERY:
+            return self.__steps % self.every == 0
+        if self.mode == self.CATEGORIES:
+            return category in self.categories
+        if self.mode == self.PAGE_CHANGE and fingerprint is not None:
+            current = fingerprint()
+            changed = current is None or current != self.__last_fingerprint
+            self.__last_fingerprint = current
+            return changed
+        return False
+
+    def __str__(self):
+        if self.mode == self.EVERY:
+            return f"{self.mode}:{self.every}"
+        if self.mode == self.CATEGORIES:
+            return f"{self.mode}:{','.join(sorted(self.categories))}"
+        return self.mode
+
+
+def timestamped_name(prefix: str = "TestProject", extension: str = ".png") -> str:
+    """Returns a file name holding the current local time, e.g. 'TestProject-2020_10_18_16_58_03_123456.png'"""
+    return f"{prefix}-{datetime.datetime.now().strftime('%Y_%m_%d_%H_%M_%S_%f')}{extension}"
+
+
+def reserve_path(directory: str, filename: str, extension: Optional[str] = None) -> str:
+    """Returns the path a screenshot is written to, creating an empty file there so that no other screenshot takes it
+
+    Like in the SeleniumLibrary, `{index}` in the file name is replaced with the lowest index not taken yet. Reserving
+    the path keeps indexes unique while earlier screenshots are still being written in the background.
+
+    Args:
+        directory (str): The screenshot directory
+        filename (str): The file name, relative to the directory
+        extension (str): Replaces the extension of the file name if given, e.g. '.jpg'
+
+    Returns:
+        str: The reserved path
+    """
+    filename = filename.replace("/", os.sep)
+    if extension:
+        filename = os.path.splitext(filename)[0] + extension
+    os.makedirs(os.path.dirname(os.path.join(directory, filename)) or ".", exist_ok=True)
+    index = 0
+    while True:
+        index += 1
+        formatted = filename.format(index=index) if "{index" in filename else filename
+        path = os.path.join(directory, formatted)
+        try:
+            with open(path, "xb"):
+                return path
+        except FileExistsError:
+            if formatted == filename:  # Overwritten, like by the SeleniumLibrary
+                return path
+
+
+def has_pillow() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+class Frame(NamedTuple):
+    """A processed screenshot
+
+    Attributes:
+        data (bytes): The encoded image, empty if the screenshot failed
+        digest (str): A hash of the captured bytes, equal for identical screenshots
+        key (str): The key screenshots are deduplicated by: a perceptual hash of the image with perceptual
+            deduplication, equal for screenshots that look alike, otherwise the digest
+    """
+
+    data: bytes
+    digest: str
+    key: str
+
+
+class ScreenshotPipeline:
+    """Encodes, downscales and deduplicates screenshots on a pool of worker threads
+
+    The calling thread only captures a screenshot, everything else happens on the workers. Files are written in
+    `image_format`, while screenshots of report steps stay PNG, the format the TestProject Agent expects. Downscaling,
+    the JPEG and WebP formats and perceptual hashes need Pillow.
+
+    A report screenshot identical to the one of the previous step is not sent again, except for failed steps. With
+    `perceptual`, a screenshot that only looks like the previous one (by a 16x16 difference hash) is not sent either,
+    which can leave out small but relevant changes of the page. A file identical to one written before is a hard link
+    to it instead of a copy.
+
+    Args:
+        image_format (str): The format of screenshot files, one of `png`, `jpeg` and `webp`
+        max_width (int): Screenshots wider than this number of pixels are downscaled to it, None keeps their size
+        quality (int): The quality of JPEG and WebP files, from 1 to 100
+        deduplicate (bool): False to keep every screenshot
+        workers (int): Number of worker threads
+        perceptual (bool): True to also leave out report screenshots that look like the previous one
+    """
+
+    # Number of recently written files that later identical screenshots are linked to
+    MAX_FILES = 64
+
+    def __init__(
+        self,
+        image_format: str = "png",
+        max_width: Optional[int] = None,
+        quality: int = 80,
+        deduplicate: bool = True,
+        workers: int = 2,
+        perceptual: bool = False,
+    ):
+        image_format = str(image_format).strip().lower().replace("jpg", "jpeg")
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unsupported screenshot format '{image_format}', supported formats are: {', '.join(IMAGE_FORMATS)}"
+            )
+        if not 1 <= int(quality) <= 100:
+            raise ValueError("Screenshot quality must be a number from 1 to 100")
+        self.__pillow = has_pillow()
+        if (image_format != "png" or max_width or perceptual) and not self.__pillow:
+            raise ValueError(
+                "Converting, downscaling and perceptual deduplication of screenshots require Pillow, install it with "
+                "'pip install Pillow'"
+            )
+        self.image_format = image_format
+        self.extension = IMAGE_FORMATS[image_format]
+        self.max_width = int(max_width) if max_width else None
+        self.quality = int(quality)
+        self.deduplicate = deduplicate
+        self.perceptual = perceptual
+        self.stats = Counter()
+        self.__executor = ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="TestProjectScreenshots")
+        self.__lock = threading.Lock()
+        self.__files: OrderedDict = OrderedDict()
+        self.__last_key = None
+
+    def save(self, screenshot: str, path: str) -> Future:
+        """Writes a base64 encoded PNG screenshot to a reserved path in the background, see `reserve_path`"""
+        return self.__executor.submit(self._save, screenshot, path)
+
+    def process(self, screenshot: str) -> Future:
+        """Processes a base64 encoded PNG screenshot of a report step in the background, see `resolve`"""
+        return self.__executor.submit(self._encode, screenshot, "png")
+
+    def resolve(self, frame: Future, deduplicate: bool = True) -> Optional[str]:
+        """Waits for a report screenshot to be processed
+
+        Must be called in the order the steps are reported, so that a screenshot is compared with the previous one.
+
+        Args:
+            frame (Future): The processed screenshot, returned by `process`
+            deduplicate (bool): False to send the screenshot even if it is a duplicate of the previous one
+
+        Returns:
+            str: The base64 encoded screenshot, or None if it failed or is a duplicate of the previous one
+        """
+        try:
+            frame = frame.result()
+        except Exception as e:
+            logging.warning(f"Failed to process a screenshot: {e}")
+            return None
+        with self.__lock:
+            repeated = self.deduplicate and deduplicate and frame.key == self.__last_key
+            self.__last_key = frame.key
+        if not frame.data or repeated:
+            self._count("duplicates" if frame.data else "failed")
+            return None
+        self._count("sent", bytes=len(frame.data))
+        return base64.b64encode(frame.data).decode("ascii")
+
+    def close(self):
+        """Waits for all screenshots to be written"""
+        self.__executor.shutdown(wait=True)
+
+    def _count(self, name: str, **sizes):
+        with self.__lock:
+            self.stats[name] += 1
+            self.stats.update(sizes)
+
+    def _save(self, screenshot: str, path: str) -> Optional[str]:
+        try:
+            frame = self._encode(screenshot, self.image_format)
+            if not frame.data:
+                raise ValueError("the browser returned no screenshot")
+            with self.__lock:
+                existing = self.__files.get(frame.digest) if self.deduplicate else None
+            if existing and self._link(existing, path):
+                self._count("linked")
+                return path
+            temporary = f"{path}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(frame.data)
+            os.replace(temporary, path)
+            self._count("saved", bytes=len(frame.data))
+            with self.__lock:
+                self.__files[frame.digest] = path
+                while len(self.__files) > self.MAX_FILES:
+                    self.__files.popitem(last=False)
+            return path
+        except Exception as e:
+            logging.warning(f"Failed to save the screenshot {path}: {e}")
+            return None
+
+    @staticmethod
+    def _link(existing: str, path: str) -> bool:
+        try:
+            os.remove(path)
+            os.link(existing, path)
+            return True
+        except OSError:
+            return False
+
+    def _encode(self, screenshot: str, image_format: str) -> Frame:
+        png = base64.b64decode(screenshot or "")
+        digest = hashlib.blake2b(png, digest_size=16).hexdigest()
+        with self.__lock:
+            self.stats["captured_bytes"] += len(png)
+        if not png or not self.__pillow:
+            return Frame(png, digest, digest)
+        from PIL import Image
+
+        with Image.open(io.BytesIO(png)) as image:
+            key = _dhash(image) if self.perceptual else digest
+            if self.max_width and image.width > self.max_width:
+                height = max(1, round(image.height * self.max_width / image.width))
+                image = image.resize((self.max_width, height), Image.LANCZOS)
+            elif image_format == "png":
+                return Frame(png, digest, key)  # Kept as the browser encoded it
+            output = io.BytesIO()
+            if image_format == "png":
+                image.save(output, "PNG", optimize=True)
+            else:
+                image.convert("RGB").save(output, image_format.upper(), quality=self.quality)
+            return Frame(output.getvalue(), digest, key)
+
+
+def _dhash(image, size: int = 16) -> str:
+    """Returns the difference hash of an image: whether each pixel of a small grayscale copy is brighter than the next"""
+    from PIL import Image
+
+    pixels = image.convert("L").resize((size + 1, size), Image.BILINEAR).tobytes()  # One byte per pixel
+    bits = [
+        pixels[row * (size + 1) + column] > pixels[row * (size + 1) + column + 1]
+        for row in range(size)
+        for column in range(size)
+    ]
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):0{size * size // 4}x}"
@@ -0,0 +1,102 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import hashlib
+from typing import Dict, NamedTuple
+
+# Returned by the call scripts when the function is not installed in the page, e.g. after a navigation
+MISSING = "__tpMissing"
+
+# Calls the function installed as arguments[0] with version arguments[1], passing it the remaining arguments
+CALL_SCRIPT = """
+var scripts = window.__tpScripts, name = arguments[0], version = arguments[1];
+if (!scripts || !scripts[name] || scripts[name].version !== version) { return {__tpMissing: true}; }
+return scripts[name].apply(null, Array.prototype.slice.call(arguments, 2));
+"""
+
+# The same for asynchronous functions, which get the callback of `execute_async_script` as their last argument
+ASYNC_CALL_SCRIPT = """
+var scripts = window.__tpScripts, name = arguments[0], version = arguments[1];
+if (!scripts || !scripts[name] || scripts[name].version !== version) {
+    arguments[arguments.length - 1]({__tpMissing: true});
+    return;
+}
+scripts[name].apply(null, Array.prototype.slice.call(arguments, 2));
+"""
+
+
+class Script(NamedTuple):
+    """A JavaScript snippet registered with `Register Script`
+
+    Attributes:
+        name (str): The name the snippet is called by
+        source (str): The snippet, the body of a function reading its arguments from `arguments`
+        asynchronous (bool): True if the snippet calls back `arguments[arguments.length - 1]` when it is done
+        version (str): A hash of the source, so that a page never runs an outdated version of a re-registered snippet
+    """
+
+    name: str
+    source: str
+    asynchronous: bool
+    version: str
+
+    def install_script(self) -> str:
+        """Returns a script that installs the snippet as a function of the page and calls it with its arguments"""
+        return (
+            f"var f = function () {{\n{self.source}\n}};\n"
+            f"f.version = {json.dumps(self.version)};\n"
+            f"(window.__tpScripts = window.__tpScripts || {{}})[{json.dumps(self.name)}] = f;\n"
+            f"{'' if self.asynchronous else 'return '}f.apply(null, arguments);"
+        )
+
+
+def is_missing(result) -> bool:
+    return isinstance(result, dict) and result.get(MISSING) is True
+
+
+class ScriptRegistry:
+    """Named JavaScript snippets, installed into the pages they are called in"""
+
+    def __init__(self):
+        self.__scripts: Dict[str, Script] = {}
+
+    def register(self, name: str, code, asynchronous: bool = False) -> Script:
+        """Registers a snippet under a name, replacing the snippet registered under it before
+
+        Args:
+            name (str): The name of the snippet
+            code: The parts of the snippet, joined like the code of `Execute Javascript`, or the absolute path of a
+                JavaScript file
+            asynchronous (bool): True for snippets executed like with `Execute Async Javascript`
+
+        Returns:
+            Script: The registered snippet
+        """
+        source = "".join(code).strip()
+        if not source:
+            raise ValueError(f"No JavaScript code was given for script '{name}'.")
+        path = source.replace("/", os.sep)
+        if os.path.isabs(path) and os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                source = f.read().strip()
+        version = hashlib.blake2b(f"{asynchronous}:{source}".encode("utf-8"), digest_size=8).hexdigest()
+        self.__scripts[name] = Script(name, source, asynchronous, version)
+        return self.__scripts[name]
+
+    def get(self, name: str) -> Script:
+        if name not in self.__scripts:
+            raise ValueError(f"No script named '{name}' was registered, registered are: {', '.join(self.__scripts)}")
+        return self.__scripts[name]
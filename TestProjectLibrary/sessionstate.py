@@ -0,0 +1,155 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import json
+import stat
+import time
+import getpass
+import tempfile
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from TestProjectLibrary.filelock import locked
+
+# The directory session states saved by name are kept in, shared by all processes of the current user
+DEFAULT_DIRECTORY = os.path.join(
+    tempfile.gettempdir(), f"testproject-session-states-{os.getuid() if hasattr(os, 'getuid') else getpass.getuser()}"
+)
+
+# Returns the origin and the local and session storage items of the current page
+CAPTURE_STORAGE_SCRIPT = """
+var read = function (name) {
+    var items = {};
+    try {
+        var storage = window[name];
+        for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    } catch (e) {}
+    return items;
+};
+return {origin: window.location.origin, local: read('localStorage'), session: read('sessionStorage')};
+"""
+
+# Sets the cookies in arguments[0] (WebDriver cookie dictionaries that are not HttpOnly) and the local and session
+# storage items in arguments[1] and arguments[2] on the current page
+RESTORE_STATE_SCRIPT = """
+var cookies = arguments[0], local = arguments[1], session = arguments[2];
+cookies.forEach(function (c) {
+    var cookie = c.name + '=' + c.value + '; path=' + (c.path || '/');
+    if (c.domain && c.domain.charAt(0) === '.') { cookie += '; domain=' + c.domain; }
+    if (c.expiry) { cookie += '; expires=' + new Date(c.expiry * 1000).toUTCString(); }
+    if (c.secure) { cookie += '; secure'; }
+    if (c.sameSite) { cookie += '; samesite=' + c.sameSite; }
+    document.cookie = cookie;
+});
+var write = function (name, items) {
+    try {
+        var storage = window[name];
+        Object.keys(items).forEach(function (key) { storage.setItem(key, items[key]); });
+    } catch (e) {}
+};
+write('localStorage', local);
+write('sessionStorage', session);
+"""
+
+
+def origin(url: str) -> str:
+    """Returns the scheme, host and port of a URL, e.g. 'https://example.com:8443'"""
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else ""
+
+
+def split_cookies(cookies: List[dict], now: Optional[float] = None) -> Tuple[List[dict], List[dict]]:
+    """Splits the cookies of a session state into those a script can set and the HttpOnly ones, dropping expired ones
+
+    Args:
+        cookies (list): WebDriver cookie dictionaries
+        now (float): The current time in seconds since the epoch, defaults to `time.time()`
+
+    Returns:
+        tuple: The cookies that are not HttpOnly and the HttpOnly cookies
+    """
+    now = time.time() if now is None else now
+    cookies = [cookie for cookie in cookies if not cookie.get("expiry") or cookie["expiry"] > now]
+    return (
+        [cookie for cookie in cookies if not cookie.get("httpOnly")],
+        [cookie for cookie in cookies if cookie.get("httpOnly")],
+    )
+
+
+class SessionStateStore:
+    """Session states (cookies, local and session storage of an origin) saved as compact JSON files
+
+    States are saved by name in a directory shared by all processes of the current user, so that parallel workers can
+    reuse a state saved by another one. A name ending with `.json` is used as the path of the file instead. States hold
+    credentials, so the directory is created accessible to the current user only, and refused if another user owns it
+    or can access it. The files are written accessible to the current user only as well.
+
+    Args:
+        directory (str): The directory states saved by name are kept in
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        name = str(name)
+        if name.lower().endswith(".json"):
+            return os.path.abspath(name)
+        return os.path.join(self._private_directory(), re.sub(r"[^\w.-]", "_", name) + ".json")
+
+    def load(self, name: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """Returns the saved state, or None if there is none or it is older than `max_age` seconds"""
+        path = self.path(name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if max_age is not None and time.time() - state.get("saved", 0) > max_age:
+            return None
+        return state
+
+    def save(self, name: str, state: dict) -> str:
+        """Saves the state atomically, so that other processes never read a partly written file, and returns its path"""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Created with a unique name and mode 0600, which the file keeps when it is renamed
+        descriptor, temporary = tempfile.mkstemp(suffix=".tmp", prefix=f"{os.path.basename(path)}.", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                json.dump(dict(state, saved=time.time()), f, separators=(",", ":"))
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        return path
+
+    def locked(self, name: str):
+        """Returns a context manager holding the lock of the state across processes, e.g. while logging in to save it"""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return locked(path)
+
+    def _private_directory(self) -> str:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        if hasattr(os, "getuid"):
+            info = os.lstat(self.directory)
+            if stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+                raise PermissionError(
+                    f"The session state directory {self.directory} must be a directory of the current user that other "
+                    f"users can't access, e.g. with mode 0700."
+                )
+        return self.directory
@@ -0,0 +1,313 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import queue
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+from TestProjectLibrary.filelock import locked
+
+# Span kinds, one per Robot Framework element
+KIND_SUITE = "suite"
+KIND_TEST = "test"
+KIND_KEYWORD = "keyword"
+
+
+class JsonlExporter:
+    """Appends spans to a JSONL file, rotated like a log file when it grows too large
+
+    Writes are serialized by an exclusive lock of a `.lock` file next to it, so that parallel pabot workers can
+    share the file.
+
+    Args:
+        path (str): The file the spans are appended to
+        max_bytes (int): The size after which the file is renamed to `<path>.1`, 0 to never rotate it
+        backups (int): Number of rotated files kept, `<path>.1` being the newest one
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def export(self, spans: List[dict]):
+        lines = "".join(json.dumps(span, default=str, separators=(",", ":")) + "\n" for span in spans)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with locked(self.path):
+            if self.max_bytes and os.path.exists(self.path):
+                if os.path.getsize(self.path) + len(lines) > self.max_bytes:
+                    self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class OtlpExporter:
+    """Sends spans to an OpenTelemetry collector with the OTLP/HTTP JSON protocol
+
+    Args:
+        endpoint (str): The URL of the collector, e.g. 'http://localhost:4318', to which `/v1/traces` is added if it
+            has no path
+        service_name (str): The `service.name` resource attribute of the spans
+        timeout (float): Seconds to wait for the collector
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "robotframework", timeout: float = 10):
+        from urllib.parse import urlsplit
+
+        self.endpoint = endpoint if urlsplit(endpoint).path.strip("/") else endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[dict]):
+        from urllib.request import Request, urlopen
+
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _attributes({"service.name": self.service_name})},
+                    "scopeSpans": [{"scope": {"name": "TestProjectLibrary"}, "spans": [_otlp(s) for s in spans]}],
+                }
+            ]
+        }
+        request = Request(
+            self.endpoint,
+            data=json.dumps(body, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def _otlp(span: dict) -> dict:
+    attributes = dict(span["attributes"], **{"robot.kind": span["kind"], "robot.status": span["status"]})
+    result = {
+        "traceId": span["trace_id"],
+        "spanId": span["span_id"],
+        "name": span["name"],
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(round(span["start"] * 1000) * 1000000),
+        "endTimeUnixNano": str(round(span["end"] * 1000) * 1000000),
+        "attributes": _attributes(attributes),
+        "status": {"code": 2 if span["status"] == "FAIL" else 1, "message": span.get("message", "")},
+    }
+    if span["parent_id"]:
+        result["parentSpanId"] = span["parent_id"]
+    return result
+
+
+def _attributes(attributes: dict) -> List[dict]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            value = {"boolValue": value}
+        elif isinstance(value, int):
+            value = {"intValue": str(value)}
+        elif isinstance(value, (list, tuple)):
+            value = {"arrayValue": {"values": [{"stringValue": str(item)} for item in value]}}
+        else:
+            value = {"stringValue": str(value)}
+        result.append({"key": key, "value": value})
+    return result
+
+
+def create_exporter(output: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+    """Returns an OtlpExporter for an `http://` or `https://` URL, otherwise a JsonlExporter for a file path"""
+    if str(output).lower().startswith(("http://", "https://")):
+        return OtlpExporter(output)
+    return JsonlExporter(output, max_bytes, backups)
+
+
+class SpanStreamer:
+    """Exports spans from a background thread in batches
+
+    Spans are put on a bounded queue and exported by a worker thread, which drains the queue in batches of up to
+    `batch_size` spans. A batch that fails to export is dropped with a warning, so that an unreachable collector never
+    fails the tests.
+
+    Args:
+        exporter: The exporter the batches are passed to, see JsonlExporter and OtlpExporter
+        batch_size (int): Maximum number of spans per export
+        max_queue_size (int): Maximum number of spans waiting to be exported
+    """
+
+    def __init__(self, exporter, batch_size: int = 256, max_queue_size: int = 10000):
+        self.exporter = exporter
+        self.exported = self.dropped = 0
+        self.__batch_size = batch_size
+        self.__queue = queue.Queue(maxsize=max_queue_size)
+        self.__worker = threading.Thread(target=self.__run, name="TestProjectSpans", daemon=True)
+        self.__worker.start()
+
+    def put(self, span: dict):
+        self.__queue.put(span)
+
+    def flush(self):
+        """Blocks until all queued spans were exported"""
+        if self.__worker.is_alive():
+            self.__queue.join()
+
+    def close(self):
+        """Exports all queued spans and stops the worker thread"""
+        if self.__worker.is_alive():
+            self.__queue.put(None)
+            self.__worker.join()
+
+    def __run(self):
+        while True:
+            batch = [self.__queue.get()]
+            while len(batch) < self.__batch_size:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            try:
+                if spans:
+                    self.exporter.export(spans)
+                    self.exported += len(spans)
+            except Exception as e:
+                self.dropped += len(spans)
+                logging.warning(f"Failed to export {len(spans)} spans: {e}")
+            finally:
+                for _ in batch:
+                    self.__queue.task_done()
+            if len(spans) < len(batch):
+                return
+
+
+class SpanListener:
+    """A listener streaming the suites, tests and keywords of the execution as spans, once enabled with `start`
+
+    Listener version 3 has no keyword events, so this listener uses version 2 and is registered next to the library.
+    Suite and test spans get ids derived from their Robot Framework ids, keyword spans get random ids, and each span
+    refers to the span it ran in with `parent_id`. Every span has its `kind`, `name`, `start` and `end` times (seconds
+    since the epoch), `duration_ms`, `status` and `attributes`: the arguments and, when the library reported it with
+    `set_locator`, the `locator` of a keyword, the tags of a test and the source of a suite.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self):
+        self.__streamer: Optional[SpanStreamer] = None
+        self.__trace_id = None
+        self.__suite_id = None
+        self.__test_id = None
+        # The span id and locator of every running keyword, innermost last
+        self.__stack: List[list] = []
+
+    @property
+    def streamer(self) -> Optional[SpanStreamer]:
+        return self.__streamer
+
+    def start(self, streamer: SpanStreamer, trace_id: Optional[str] = None):
+        """Starts streaming spans to the given streamer, in the trace with the given id or a new one"""
+        self.stop()
+        self.__streamer = streamer
+        self.__trace_id = trace_id or os.urandom(16).hex()
+
+    def stop(self):
+        """Exports the remaining spans and stops streaming"""
+        if self.__streamer is not None:
+            self.__streamer.close()
+            self.__streamer = None
+
+    def start_suite(self, name, attributes):
+        self.__suite_id = attributes["id"]
+        self.__stack.clear()
+
+    def end_suite(self, name, attributes):
+        self.__suite_id = attributes["id"].rsplit("-", 1)[0] if "-" in attributes["id"] else None
+        self.__stack.clear()
+        self._emit(KIND_SUITE, attributes["longname"], attributes, self._id(attributes["id"]), self._parent(attributes),
+                   {"source": attributes.get("source") or "", "tests": attributes.get("totaltests", 0)})
+
+    def start_test(self, name, attributes):
+        self.__test_id = attributes["id"]
+        self.__stack.clear()
+
+    def end_test(self, name, attributes):
+        self.__test_id = None
+        self.__stack.clear()
+        self._emit(KIND_TEST, attributes["longname"], attributes, self._id(attributes["id"]), self._parent(attributes),
+                   {"tags": list(attributes.get("tags", ()))})
+
+    def set_locator(self, locator: str):
+        """Sets the locator of the running keyword, as resolved by the keyword itself"""
+        if self.__streamer is not None and self.__stack:
+            self.__stack[-1][1] = locator
+
+    def start_keyword(self, name, attributes):
+        if self.__streamer is not None:
+            self.__stack.append([os.urandom(8).hex(), None])
+
+    def end_keyword(self, name, attributes):
+        if self.__streamer is None:
+            return
+        span_id, locator = self.__stack.pop() if self.__stack else (os.urandom(8).hex(), None)
+        parent_id = self.__stack[-1][0] if self.__stack else self._id(self.__test_id or self.__suite_id)
+        args = list(attributes.get("args", ()))
+        extra = {"library": attributes.get("libname", ""), "type": attributes.get("type", ""), "args": args}
+        if locator is not None:
+            extra["locator"] = locator
+        self._emit(KIND_KEYWORD, name, attributes, span_id, parent_id, extra)
+
+    def close(self):
+        self.stop()
+
+    def _emit(self, kind: str, name: str, attributes: dict, span_id: str, parent_id: Optional[str], extra: dict):
+        if self.__streamer is None:
+            return
+        from robot.utils import timestamp_to_secs
+
+        start = timestamp_to_secs(attributes["starttime"]) if attributes.get("starttime") else 0.0
+        end = timestamp_to_secs(attributes["endtime"]) if attributes.get("endtime") else start
+        span = {
+            "trace_id": self.__trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "kind": kind,
+            "name": name,
+            "start": start,
+            "end": end,
+            "duration_ms": attributes.get("elapsedtime", round((end - start) * 1000)),
+            "status": attributes.get("status", ""),
+            "attributes": extra,
+        }
+        if attributes.get("message"):
+            span["message"] = attributes["message"]
+        self.__streamer.put(span)
+
+    def _id(self, robot_id: Optional[str]) -> Optional[str]:
+        """Returns the span id of a suite or test, derived from its id (e.g. 's1-s2-t3') and the trace id"""
+        if robot_id is None:
+            return None  # Started before the library was imported
+        return hashlib.blake2b(f"{self.__trace_id}:{robot_id}".encode("utf-8"), digest_size=8).hexdigest()
+
+    def _parent(self, attributes: dict) -> Optional[str]:
+        robot_id = attributes["id"]
+        return self._id(robot_id.rsplit("-", 1)[0]) if "-" in robot_id else None
@@ -0,0 +1,182 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+from TestProjectLibrary.locators import FIND_ELEMENTS_JS
+
+# Reads the table matching the query in arguments[0], or returns null if there is none.
+# `rows` holds every <tr> of the table as [section, position among its sibling rows, sibling row count, cells],
+# where cells are the [text, colspan, rowspan] of its <th> and <td> children. `ordered` lists the indexes of the
+# rows of the <thead>, <tbody> and <tfoot> sections in the order the SeleniumLibrary counts them.
+TABLE_DATA_SCRIPT = (
+    FIND_ELEMENTS_JS
+    + """
+var table = __tpFind(arguments[0])[0];
+if (!table) { return null; }
+var slice = function (list) { return Array.prototype.slice.call(list); };
+var text = function (el) { return (el.innerText || '').trim(); };
+var span = function (value) { var n = parseInt(value, 10); return isNaN(n) || n < 0 ? 1 : n; };
+var trs = slice(table.getElementsByTagName('tr'));
+var rows = trs.map(function (tr) {
+    var siblings = slice(tr.parentNode.children).filter(function (el) { return el.tagName === 'TR'; });
+    var cells = slice(tr.children).filter(function (el) { return el.tagName === 'TH' || el.tagName === 'TD'; });
+    return [tr.parentNode.tagName.toLowerCase(), siblings.indexOf(tr) + 1, siblings.length, cells.map(function (cell) {
+        return [text(cell), span(cell.getAttribute('colspan')), span(cell.getAttribute('rowspan'))];
+    })];
+});
+var ordered = [];
+['THEAD', 'TBODY', 'TFOOT'].forEach(function (section) {
+    trs.forEach(function (tr, index) {
+        if (tr.parentNode.tagName === section && tr.parentNode.parentNode === table) { ordered.push(index); }
+    });
+});
+return {
+    rows: rows,
+    ordered: ordered,
+    headers: slice(table.getElementsByTagName('th')).map(text),
+    footers: slice(table.querySelectorAll('tfoot td')).map(text),
+    text: text(table)
+};
+"""
+)
+
+SECTIONS = {"thead": "header", "tbody": "body", "tfoot": "footer"}
+
+
+def expand_spans(rows: List[list]) -> List[List[str]]:
+    """Expands rows of [text, colspan, rowspan] cells into a grid where spanned cells repeat their text
+
+    Args:
+        rows (list): The cells of every row of a table section
+
+    Returns:
+        list: One list of cell texts per row
+    """
+    grid = []
+    carried = {}  # column -> [rows left, text] of cells spanning down from previous rows
+    for index, cells in enumerate(rows):
+        line = []
+        cells = list(cells)
+        while cells or any(column >= len(line) for column in carried):
+            column = len(line)
+            if column in carried:
+                left, text = carried[column]
+                line.append(text)
+                if left > 1:
+                    carried[column][0] -= 1
+                else:
+                    del carried[column]
+            elif cells:
+                text, colspan, rowspan = cells.pop(0)
+                # A rowspan of 0 spans to the end of the section
+                rowspan = rowspan or len(rows) - index
+                for offset in range(max(colspan, 1)):
+                    if rowspan > 1:
+                        carried[column + offset] = [rowspan - 1, text]
+                    line.append(text)
+            else:
+                line.append("")
+        grid.append(line)
+    return grid
+
+
+def _position(index: int, count: int) -> int:
+    # Converts a 1-based index, negative when counted from the end, into a list index or -1 if out of range
+    position = index - 1 if index > 0 else count + index
+    return position if 0 <= position < count else -1
+
+
+class TableSnapshot:
+    """The contents of a table read with a single browser call, checked the way the SeleniumLibrary checks tables
+
+    Args:
+        locator: The locator the table was found with, used in error messages
+        data (dict): The result of TABLE_DATA_SCRIPT
+    """
+
+    def __init__(self, locator, data: dict):
+        self.locator = locator
+        self.__rows = data["rows"]
+        self.__ordered = [self.__rows[index] for index in data["ordered"]]
+        self.__headers = data["headers"]
+        self.__footers = data["footers"]
+        self.__text = data["text"]
+
+    def as_dict(self) -> dict:
+        """Returns the header, body and footer rows of the table, with spanned cells repeated in every position"""
+        sections = {name: [] for name in SECTIONS.values()}
+        for section, _, _, cells in self.__ordered:
+            sections[SECTIONS[section]].append(cells)
+        return {name: expand_spans(rows) for name, rows in sections.items()}
+
+    def get_cell(self, row, column) -> str:
+        row, column = int(row), int(column)
+        if row == 0 or column == 0:
+            raise ValueError(f"Both row and column must be non-zero, got row {row} and column {column}.")
+        index = _position(row, len(self.__ordered))
+        if index == -1:
+            raise AssertionError(
+                f"Table '{self.locator}' should have had at least {abs(row)} rows but had only {len(self.__ordered)}."
+            )
+        cells = self.__ordered[index][3]
+        index = _position(column, len(cells))
+        if index == -1:
+            raise AssertionError(
+                f"Table '{self.locator}' row {row} should have had at least {abs(column)} columns "
+                f"but had only {len(cells)}."
+            )
+        return cells[index][0]
+
+    def cell_should_contain(self, row, column, expected):
+        content = self.get_cell(row, column)
+        if expected not in content:
+            raise AssertionError(
+                f"Table '{self.locator}' cell on row {row} and column {column} should have contained text "
+                f"'{expected}' but it had '{content}'."
+            )
+
+    def column_should_contain(self, column, expected):
+        column = self.__index(column)
+        for _, _, _, cells in self.__rows:
+            index = _position(column, len(cells))
+            if index != -1 and expected in cells[index][0]:
+                return
+        raise AssertionError(f"Table '{self.locator}' column {column} did not contain text '{expected}'.")
+
+    def row_should_contain(self, row, expected):
+        row = self.__index(row)
+        for _, position, count, cells in self.__rows:
+            if _position(row, count) == position - 1 and any(expected in cell[0] for cell in cells):
+                return
+        raise AssertionError(f"Table '{self.locator}' row {row} did not contain text '{expected}'.")
+
+    def header_should_contain(self, expected):
+        if not any(expected in text for text in self.__headers):
+            raise AssertionError(f"Table '{self.locator}' header did not contain text '{expected}'.")
+
+    def footer_should_contain(self, expected):
+        if not any(expected in text for text in self.__footers):
+            raise AssertionError(f"Table '{self.locator}' footer did not contain text '{expected}'.")
+
+    def should_contain(self, expected):
+        if expected not in self.__text:
+            raise AssertionError(f"Table '{self.locator}' did not contain text '{expected}'.")
+
+    @staticmethod
+    def __index(index) -> int:
+        index = int(index)
+        if index == 0:
+            raise ValueError("Row and column indexes must be non-zero.")
+        return index
@@ -0,0 +1,158 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import hashlib
+import logging
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from TestProjectLibrary.filelock import locked
+from TestProjectLibrary.metrics import percentile
+
+# Path segments holding identifiers, e.g. '12345', 'a3f9c2d1e8b7' or 'order-42', which differ between test runs
+_VARIABLE_SEGMENT = re.compile(r".*\d.*")
+
+
+def url_pattern(url: str) -> str:
+    """Returns the pattern a URL is grouped by: its host and path, with query, fragment and path segments holding
+    digits left out, e.g. 'shop.example.com/orders/*/items' for 'https://shop.example.com/orders/123/items?page=2'
+    """
+    parts = urlsplit(url or "")
+    segments = ["*" if _VARIABLE_SEGMENT.fullmatch(segment) else segment for segment in parts.path.split("/")]
+    return parts.netloc + "/".join(segments)
+
+
+def wait_key(keyword: str, target: str, url: str) -> str:
+    """Returns the key the durations of a wait are stored under
+
+    Args:
+        keyword (str): The python name of the wait keyword
+        target (str): The locator, text or condition waited for
+        url (str): The URL of the page the wait ran on, see `url_pattern`
+
+    Returns:
+        str: A short hash of the keyword, the target and the URL pattern
+    """
+    value = "\0".join((keyword, str(target), url_pattern(url)))
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class WaitHistory:
+    """Durations of waits, persisted in a file shared by all processes, and the timeouts learned from them
+
+    A failed wait is recorded with the timeout it was configured with rather than the time it took, since it may have
+    failed only because its learned timeout was too short, and no timeout is learned for it for the rest of the
+    process. The file holds one `<key> <milliseconds>` line per wait. New durations are appended in batches by `flush`, under
+    an exclusive lock of a `.lock` file next to it, so that concurrent pabot workers never interleave or lose lines.
+    Once a key holds more than twice the retained durations, the file is compacted to the latest `max_samples` per key.
+
+    Args:
+        path (str): The history file, created on the first flush
+        pct (float): The percentile of the observed durations the timeout is derived from
+        margin (float): The factor the percentile is multiplied with
+        min_samples (int): Number of durations needed before a timeout is learned
+        min_timeout (float): The shortest learned timeout, in seconds
+        max_samples (int): Number of latest durations kept per key
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pct: float = 99,
+        margin: float = 2.0,
+        min_samples: int = 5,
+        min_timeout: float = 1.0,
+        max_samples: int = 100,
+    ):
+        self.path = path
+        self.__pct = pct
+        self.__margin = margin
+        self.__min_samples = min_samples
+        self.__min_timeout = min_timeout
+        self.__max_samples = max_samples
+        self.__samples: Optional[Dict[str, Deque[int]]] = None
+        self.__pending: List[str] = []
+        self.__failed: Set[str] = set()
+
+    def samples(self, key: str) -> List[int]:
+        """Returns the durations recorded for a key, in milliseconds"""
+        if self.__samples is None:
+            self.__samples = self._read()
+        return list(self.__samples.get(key, ()))
+
+    def timeout(self, key: str) -> Optional[float]:
+        """Returns the timeout learned for a key in seconds, or None if too few durations were recorded or the wait
+        failed before in this process"""
+        samples = sorted(self.samples(key))
+        if len(samples) < self.__min_samples or key in self.__failed:
+            return None
+        return max(self.__min_timeout, round(percentile(samples, self.__pct) * self.__margin / 1000, 1))
+
+    def record(self, key: str, duration: float, passed: bool = True, configured: Optional[float] = None):
+        """Records the duration of a wait in seconds, written to the file on the next flush
+
+        Args:
+            key (str): The key of the wait, see `wait_key`
+            duration (float): The seconds the wait took
+            passed (bool): False if the wait failed, e.g. timed out
+            configured (float): The timeout in seconds the wait was configured with, recorded for failed waits that
+                took less
+        """
+        if not passed:
+            self.__failed.add(key)
+            duration = max(duration, configured or 0)
+        milliseconds = max(0, round(duration * 1000))
+        self.samples(key)
+        self.__samples.setdefault(key, deque(maxlen=self.__max_samples)).append(milliseconds)
+        self.__pending.append(f"{key} {milliseconds}\n")
+
+    def flush(self):
+        """Appends the recorded durations to the file and compacts it when it grew too large"""
+        if not self.__pending:
+            return
+        lines, self.__pending = "".join(self.__pending), []
+        try:
+            with locked(self.path):
+                with open(self.path, "a", encoding="ascii") as f:
+                    f.write(lines)
+                records = self._read(compacting=True)
+                if any(len(samples) > 2 * self.__max_samples for samples in records.values()):
+                    self._compact(records)
+        except OSError as e:
+            logging.warning(f"Failed to write the wait history to {self.path}: {e}")
+
+    def _read(self, compacting: bool = False) -> Dict[str, Deque[int]]:
+        maxlen = None if compacting else self.__max_samples
+        records = defaultdict(lambda: deque(maxlen=maxlen))
+        try:
+            with open(self.path, encoding="ascii", errors="ignore") as f:
+                for line in f:
+                    key, _, milliseconds = line.partition(" ")
+                    if milliseconds.strip().isdigit():  # Skips lines cut short by a writer that was killed
+                        records[key].append(int(milliseconds))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"Failed to read the wait history from {self.path}: {e}")
+        return records
+
+    def _compact(self, records: Dict[str, Deque[int]]):
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="ascii") as f:
+            for key, samples in records.items():
+                f.writelines(f"{key} {milliseconds}\n" for milliseconds in list(samples)[-self.__max_samples:])
+        os.replace(temporary, self.path)
@@ -0,0 +1,76 @@
+# Copyright 2020 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from TestProjectLibrary.locators import FIND_ELEMENTS_JS, IS_VISIBLE_JS
+
+WAIT_POLLING = "polling"
+WAIT_EVENT = "event"
+WAIT_ENGINES = (WAIT_POLLING, WAIT_EVENT)
+
+# Minimum timeout of the SeleniumLibrary check that follows an event wait, long enough for it to check once
+VERIFY_TIMEOUT = 0.2
+
+# Waits in the page until the condition in arguments[0] holds for the element query in arguments[1] and the text in
+# arguments[2], and calls back with true, or with false after arguments[3] milliseconds or if the check fails.
+# The condition is checked whenever the DOM mutates, the URL changes and, for changes that are not mutations
+# (e.g. finished CSS transitions), on a short in-page interval that costs no WebDriver commands.
+EVENT_WAIT_SCRIPT = (
+    FIND_ELEMENTS_JS
+    + IS_VISIBLE_JS
+    + """
+var condition = arguments[0], query = arguments[1], text = arguments[2], timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+var element = function () { return query ? __tpFind(query)[0] : null; };
+var contains = function (value) { return value.indexOf(text) !== -1; };
+var checks = {
+    'page contains': function () { return contains(document.documentElement.textContent); },
+    'page does not contain': function () { return !contains(document.documentElement.textContent); },
+    'element present': function () { return !!element(); },
+    'element absent': function () { return !element(); },
+    'element visible': function () { var el = element(); return !!el && __tpIsVisible(el); },
+    'element not visible': function () { var el = element(); return !el || !__tpIsVisible(el); },
+    'element enabled': function () { var el = element(); return !!el && !el.disabled && !el.hasAttribute('readonly'); },
+    'element contains': function () { var el = element(); return !!el && contains(el.innerText); },
+    'element does not contain': function () { var el = element(); return !!el && !contains(el.innerText); },
+    'location is': function () { return window.location.href === text; },
+    'location is not': function () { return window.location.href !== text; },
+    'location contains': function () { return contains(window.location.href); },
+    'location does not contain': function () { return !contains(window.location.href); },
+    'condition': function () { return !!new Function(text)(); }
+};
+var check = checks[condition], finished = false, observer = null, interval = null, timer = null;
+var finish = function (met) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearInterval(interval);
+    clearTimeout(timer);
+    window.removeEventListener('hashchange', test);
+    window.removeEventListener('popstate', test);
+    done(met);
+};
+var test = function () {
+    try { if (check()) { finish(true); } } catch (e) { finish(false); }
+};
+test();
+if (!finished) {
+    observer = new MutationObserver(test);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    window.addEventListener('hashchange', test);
+    window.addEventListener('popstate', test);
+    interval = setInterval(test, 100);
+    timer = setTimeout(function () { finish(false); }, timeout);
+}
+"""
+)
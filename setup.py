@@ -1,13 +1,28 @@
+import os
+
 import setuptools
+from setuptools.command.build_py import build_py
 
 from TestProjectLibrary import definitions
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+version = definitions.read_lib_version()
+
+
+class BuildPyWithVersion(build_py):
+    """Generates the version module in the built package, leaving the source tree untouched"""
+
+    def run(self):
+        super().run()
+        if not self.dry_run:
+            definitions.write_version_module(version, os.path.join(self.build_lib, "TestProjectLibrary"))
+
+
 setuptools.setup(
     name="testproject-robot-library",
-    version=definitions.get_lib_version(),
+    version=version,
     author="TestProject",
     author_email="contact@testproject.io",
     description="TestProject.io Library for the Robot Framrwork",
@@ -15,6 +30,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://testproject.io/selenium-appium-powered-sdk/",
     packages=setuptools.find_packages(),
+    cmdclass={"build_py": BuildPyWithVersion},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
@@ -0,0 +1,97 @@
+import sys
+
+import pytest
+from selenium.webdriver.common.keys import Keys
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.actions import ACTIONS, Action, parse_actions, parse_key
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+@pytest.mark.parametrize(
+    "step, expected",
+    [
+        ("click", Action("click", None)),
+        ("click:css:#save", Action("click", "css:#save")),  # Only the first colon separates the argument
+        ("Double Click", Action("double_click", None)),
+        ("move_by: 10,-5 ", Action("move_by", "10,-5")),
+        ("type: two  words ", Action("type", " two  words ")),  # Typed text is kept as is
+        ("press:", Action("press", None)),  # An empty locator targets the current mouse position
+        (["key", "ENTER"], Action("key", "ENTER")),
+        (("release",), Action("release", None)),
+        (["pause", 0.5], Action("pause", "0.5")),
+    ],
+)
+def test_parse_actions(step, expected):
+    assert parse_actions([step]) == [expected]
+
+
+def test_parse_actions_keeps_the_order():
+    steps = ["move_to:id:menu", "press", "move_by:0,40", "release"]
+    assert [action.name for action in parse_actions(steps)] == ["move_to", "press", "move_by", "release"]
+    assert [str(action) for action in parse_actions(steps)] == steps
+
+
+@pytest.mark.parametrize("step", ["hover:id:menu", "scroll", ["drag", "id:menu"]])
+def test_parse_actions_rejects_unsupported_actions(step):
+    with pytest.raises(ValueError, match="Unsupported action") as error:
+        parse_actions(["click", step])
+    assert ", ".join(ACTIONS) in str(error.value)
+
+
+@pytest.mark.parametrize("step", ["move_to", "move_by:", "type:", "key: ", ["pause", None]])
+def test_parse_actions_requires_arguments(step):
+    with pytest.raises(ValueError, match="requires an argument"):
+        parse_actions([step])
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [("ENTER", Keys.ENTER), ("ctrl", Keys.CONTROL), ("Esc", Keys.ESCAPE), ("a", "a"), ("A", "A")],
+)
+def test_parse_key(name, expected):
+    assert parse_key(name) == expected
+
+
+def test_parse_key_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="Unknown key 'ENTR'"):
+        parse_key("ENTR")
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    yield lib
+    lib.close_all_browsers()
+
+
+def test_perform_actions_sends_a_single_request(lib):
+    executor = lib._TestProjectLibrary__library.driver.command_executor
+    requests = []
+    execute = executor.execute
+
+    def record(command, params):
+        if command == "actions":
+            requests.append(params["actions"])
+        return execute(command, params)
+
+    executor.execute = record
+    lib.perform_actions("move_to:id:menu", "press", "move_by:0,40", "release", "key:ENTER")
+    assert len(requests) == 1
+    assert {source["type"] for source in requests[0]} == {"pointer", "key"}
+    step = lib._recorder().records[-1]
+    assert step["description"] == "Perform Actions: 5 actions" and step["passed"]
+
+
+def test_perform_actions_checks_all_steps_before_sending(lib):
+    executor = lib._TestProjectLibrary__library.driver.command_executor
+    commands = []
+    execute = executor.execute
+    executor.execute = lambda command, params: commands.append(command) or execute(command, params)
+    with pytest.raises(ValueError, match="Unsupported action 'hover'"):
+        lib.perform_actions("click", "hover:id:menu")
+    assert "actions" not in commands
@@ -0,0 +1,73 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def open_browser(lib, alias):
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder", alias=alias)
+    return lib._recorder()
+
+
+def steps(recorder):
+    return [r["message"] for r in recorder.records if r["kind"] == "step"]
+
+
+def reported_tests(recorder):
+    return [r["name"] for r in recorder.records if r["kind"] == "test"]
+
+
+def end_test(lib, name):
+    lib._end_test(None, SimpleNamespace(name=name, passed=True))
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    yield lib
+    lib.close_all_browsers()
+
+
+def test_switch_browser_switches_the_reporter(lib):
+    admin = open_browser(lib, "admin")
+    customer = open_browser(lib, "customer")
+    assert admin is not customer
+    lib.go_to("https://example.com/customer")
+    lib.switch_browser("admin")
+    assert lib._recorder() is admin
+    lib.go_to("https://example.com/admin")
+    assert "Navigated to https://example.com/admin" in steps(admin)
+    assert "Navigated to https://example.com/customer" not in steps(admin)
+    assert "Navigated to https://example.com/customer" in steps(customer)
+    assert "Navigated to https://example.com/admin" not in steps(customer)
+
+
+def test_test_results_go_to_the_browsers_the_test_used(lib):
+    admin = open_browser(lib, "admin")
+    customer = open_browser(lib, "customer")
+    lib._start_test(None, SimpleNamespace(longname="Suite.First"))
+    lib.switch_browser("customer")
+    end_test(lib, "First")
+    lib._start_test(None, SimpleNamespace(longname="Suite.Second"))
+    lib.switch_browser("admin")
+    lib.go_to("https://example.com")
+    lib.switch_browser("customer")
+    end_test(lib, "Second")
+    assert reported_tests(admin) == ["Second"]
+    assert reported_tests(customer) == ["First", "Second"]
+
+
+def test_second_sdk_browser_is_rejected(lib):
+    open_browser(lib, "admin")
+    contexts = lib._TestProjectLibrary__contexts
+    contexts[1] = contexts[1]._replace(sdk=True)  # As if the browser was created by the TestProject SDK
+    with pytest.raises(RuntimeError, match="'customer'.*'admin' is still open"):
+        lib.init_testproject_driver("chrome", url="about:blank", alias="customer")
+    lib.close_all_browsers()
+    assert open_browser(lib, "customer") is not None
@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.context import CONTEXT_KEYWORDS, TOP_LEVEL_KEYWORDS, BrowserContext
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def test_unselect_frame_is_deferred():
+    context = BrowserContext("main")
+    context.frame_selected("css:#outer", True)
+    context.unselect_frame()
+    assert context.pending() == ()
+    assert context.select_frame("css:#outer")  # Back to the frame the driver is still in
+    assert context.pending() is None
+
+
+def test_frame_should_contain_applies_the_pending_switch():
+    # It finds its frame in the selected frame, so a pending switch must be applied before it leaves to the top level
+    assert "frame_should_contain" in TOP_LEVEL_KEYWORDS
+    assert "frame_should_contain" not in CONTEXT_KEYWORDS
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.enable_context_tracking()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    yield lib
+    lib.close_all_browsers()
+
+
+def record_commands(lib):
+    executor = lib._TestProjectLibrary__library.driver.command_executor
+    commands = []
+    execute = executor.execute
+
+    def record(command, params):
+        if command in ("switchToFrame", "findElements"):
+            commands.append((command, params.get("id") or params.get("value")))
+        return execute(command, params)
+
+    executor.execute = record
+    return commands
+
+
+def test_frame_should_contain_leaves_the_unselected_frame_first(lib):
+    commands = record_commands(lib)
+    lib.select_frame("css:#outer")
+    del commands[:]
+    lib.unselect_frame()
+    assert commands == []  # Deferred to the next keyword
+    lib.frame_should_contain("css:#inner", "")
+    assert commands[:2] == [("switchToFrame", None), ("findElements", "#inner")]
+    assert lib.get_browser_context()["frames"] == []
@@ -0,0 +1,18 @@
+from TestProjectLibrary import definitions
+
+
+def test_version_module_is_written_to_the_built_package(tmp_path):
+    definitions.write_version_module("1.2.3", str(tmp_path))
+    namespace = {}
+    exec((tmp_path / definitions.VERSION_MODULE).read_text(), namespace)
+    assert namespace["VERSION"] == "1.2.3"
+
+
+def not_installed(name):
+    raise definitions.PackageNotFoundError(name)
+
+
+def test_version_is_read_from_the_environment_without_package_metadata(monkeypatch):
+    monkeypatch.setattr(definitions, "metadata", not_installed)
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "4.5.6")
+    assert definitions.read_lib_version() == "4.5.6"
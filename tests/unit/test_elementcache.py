@@ -0,0 +1,108 @@
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.elementcache import ElementCache
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def test_hits_misses_and_stale_elements():
+    cache = ElementCache()
+    assert cache.get("id:name") is None
+    assert cache.put("id:name", "element") == "element"
+    assert cache.get("id:name") == "element"
+    cache.discard_stale("id:name")
+    assert cache.get("id:name") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "stale": 1, "entries": 0}
+
+
+def test_least_recently_used_elements_are_evicted():
+    cache = ElementCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_elements_are_scoped_to_their_frame():
+    cache = ElementCache()
+    cache.put("id:name", "page")
+    cache.track("select_frame", "id:editor")
+    assert cache.get("id:name") is None
+    cache.put("id:name", "frame")
+    cache.track("unselect_frame")
+    assert cache.get("id:name") == "page"
+    cache.track("select_frame", "id:editor")
+    assert cache.get("id:name") == "frame"
+    cache.track("select_frame", "id:missing", passed=False)  # The frame is not known anymore
+    assert cache.stats()["entries"] == 0
+
+
+def test_elements_are_scoped_to_their_window():
+    cache = ElementCache()
+    cache.track("switch_window", "MAIN", window="main")
+    cache.put("id:name", "main element")
+    cache.track("switch_window", "popup", window="popup")
+    assert cache.get("id:name") is None
+    cache.put("id:name", "popup element")
+    cache.track("switch_window", "MAIN", window="main")
+    assert cache.get("id:name") == "main element"
+    cache.track("switch_window", "popup", window="popup")
+    cache.track("close_window")
+    cache.track("switch_window", "MAIN", window="main")
+    assert cache.get("id:name") == "main element"
+    assert cache.stats()["entries"] == 1  # The element of the closed window was evicted
+
+
+def test_elements_found_before_the_window_was_known():
+    cache = ElementCache()
+    cache.put("id:name", "main element")
+    cache.track("click_element", "id:name", window="main")  # Known from here on, the element was found in it
+    cache.track("switch_window", "popup", window="popup")
+    cache.track("switch_window", "MAIN", window="main")
+    assert cache.get("id:name") == "main element"
+    cache.track("switch_window", "popup")  # Not known
+    cache.put("id:name", "popup element")
+    cache.track("switch_window", "MAIN", window="main")
+    assert cache.stats()["entries"] == 0  # The popup element was evicted since its window was not known
+
+
+def test_switching_to_an_unknown_window_evicts_all_elements():
+    cache = ElementCache()
+    cache.track("switch_window", "MAIN", window="main")
+    cache.put("id:name", "main element")
+    cache.track("switch_window", "title:Help")
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("keyword", ["go_to", "reload_page", "switch_browser", "close_all_browsers", "close_window"])
+def test_navigation_evicts_all_elements(keyword):
+    cache = ElementCache()
+    cache.put("id:name", "element")
+    cache.track(keyword)
+    assert cache.get("id:name") is None
+
+
+def test_library_reuses_cached_elements(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    lib.enable_context_tracking()
+    lib.enable_element_cache()
+    recorder = lib._recorder()
+    lib.click_element("id:save")
+    finds = recorder.commands["findElements"]
+    lib.click_element("id:save")
+    lib.switch_window("MAIN")  # The current window, known to the context tracking
+    lib.click_element("id:save")
+    assert recorder.commands["findElements"] == finds
+    assert lib.get_element_cache_stats() == {"hits": 2, "misses": 1, "stale": 0, "entries": 1}
+    lib.go_to("https://example.com")
+    lib.click_element("id:save")
+    assert recorder.commands["findElements"] > finds
+    lib.close_all_browsers()
@@ -0,0 +1,167 @@
+import json
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.forms import FILL_FORM_SCRIPT
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+# Elements with the parts of the DOM the script uses. Like in browsers, the value setter of a prototype throws
+# for elements of other types. FIELDS describes the elements, the fields are filled with ARGUMENTS.
+PAGE = """
+globalThis.Event = function (type) { this.type = type; };
+var element = function (kind) {
+    var El = function (spec) {
+        Object.assign(this, spec);
+        this.events = [];
+        this._value = spec.value || '';
+    };
+    El.prototype.dispatchEvent = function (event) { this.events.push(event.type); };
+    El.prototype.focus = function () {};
+    El.prototype.click = function () { this.checked = !this.checked; };
+    Object.defineProperty(El.prototype, 'value', {
+        get: function () { return this._value; },
+        set: function (value) {
+            if (!(this instanceof El)) { throw new TypeError('Illegal invocation'); }
+            this._value = value;
+        },
+    });
+    globalThis[kind] = El;
+    return El;
+};
+var Input = element('HTMLInputElement'), TextArea = element('HTMLTextAreaElement'), Other = element('HTMLElement');
+var create = function (spec) {
+    var El = spec.tagName === 'INPUT' ? Input : spec.tagName === 'TEXTAREA' ? TextArea : Other;
+    return new El(spec);
+};
+var elements = FIELDS.map(create);
+globalThis.document = {getElementsByName: function (name) {
+    return elements.filter(function (el) { return el.name === name; });
+}};
+var args = ARGUMENTS;
+args[0] = args[0].map(function (field, i) { return [elements[i]].concat(field); });
+var results = new Function(SCRIPT).apply(null, args);
+console.log(JSON.stringify({results: results, elements: elements.map(function (el) {
+    return {value: el.value, checked: el.checked, events: el.events, options: (el.options || []).map(function (o) {
+        return o.selected;
+    })};
+})}));
+"""
+
+
+def fill(elements, values, clear=True, typing=False):
+    fields = [[value, bool(value)] for value in values]
+    page = (
+        PAGE.replace("FIELDS", json.dumps(elements))
+        .replace("ARGUMENTS", json.dumps([fields, clear, typing]))
+        .replace("SCRIPT", json.dumps(FILL_FORM_SCRIPT))
+    )
+    completed = subprocess.run(["node", "-e", page], capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout)
+    return result["results"], result["elements"]
+
+
+def select(*options, multiple=False):
+    return {
+        "tagName": "SELECT",
+        "multiple": multiple,
+        "options": [{"text": f" {text} ", "value": value, "selected": False} for text, value in options],
+    }
+
+
+needs_node = pytest.mark.skipif(shutil.which("node") is None, reason="Runs the script with node")
+
+
+@needs_node
+def test_text_fields():
+    results, elements = fill(
+        [{"tagName": "INPUT", "type": "email", "value": "old"}, {"tagName": "TEXTAREA", "value": "Dear"}],
+        ["ann@test.io", " Ann"],
+        clear=False,
+    )
+    assert results == ["text", "text"]
+    assert [element["value"] for element in elements] == ["oldann@test.io", "Dear Ann"]
+    assert elements[0]["events"] == ["input", "change"]
+
+
+@needs_node
+def test_text_fields_are_left_for_typing():
+    results, elements = fill([{"tagName": "INPUT", "type": "text"}], ["Ann"], typing=True)
+    assert results == ["text"] and elements[0]["value"] == ""
+
+
+@needs_node
+def test_select_by_label_or_value():
+    countries = select(("Australia", "au"), ("Austria", "at"), ("at", "other"))
+    results, elements = fill([countries, countries, countries], ["Australia", "at", "au"])
+    assert results == ["select"] * 3
+    assert elements[0]["options"] == [True, False, False]
+    assert elements[1]["options"] == [False, False, True]  # The label is preferred over the value of another option
+    assert elements[2]["options"] == [True, False, False]
+
+
+@needs_node
+def test_multiple_select():
+    results, elements = fill([select(("Red", "r"), ("Green", "g"), ("Blue", "b"), multiple=True)], [["Red", "b"]])
+    assert results == ["select"] and elements[0]["options"] == [True, False, True]
+
+
+@needs_node
+def test_missing_options():
+    results, elements = fill([select(("Red", "r"))], [["Red", "Pink"]])
+    assert results == ['no options with labels or values ["Pink"]']
+    assert elements[0]["options"] == [False]
+
+
+@needs_node
+def test_checkboxes_and_radio_buttons():
+    results, elements = fill(
+        [
+            {"tagName": "INPUT", "type": "checkbox", "checked": False},
+            {"tagName": "INPUT", "type": "radio", "name": "size", "value": "S", "checked": False},
+            {"tagName": "INPUT", "type": "radio", "name": "size", "value": "L", "checked": False},
+        ],
+        ["true", "L", ""],
+    )
+    assert results[:2] == ["checkbox", "radio"]
+    assert [element["checked"] for element in elements] == [True, False, True]
+
+
+@needs_node
+@pytest.mark.parametrize("typing", [False, True])
+def test_unsupported_fields(typing):
+    results, elements = fill(
+        [{"tagName": "DIV", "contentEditable": "true"}, {"tagName": "INPUT", "type": "file"}], ["Ann", "a.txt"],
+        typing=typing,
+    )
+    assert results == ["unsupported field <div>", "file inputs are not supported, use Choose File"]
+    assert elements[0]["events"] == []
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    yield lib
+    lib.close_all_browsers()
+
+
+def test_fill_form_fails_for_unsupported_fields(lib, monkeypatch):
+    executor = lib._TestProjectLibrary__library.driver.command_executor
+    execute = executor.execute
+
+    def execute_command(command, params):
+        if command == "w3cExecuteScript" and params["script"] == FILL_FORM_SCRIPT:
+            return {"value": ["text", "unsupported field <div>"]}
+        return execute(command, params)
+
+    monkeypatch.setattr(executor, "execute", execute_command)
+    with pytest.raises(ValueError, match="Failed to fill form fields:\ncss:#notes: unsupported field <div>"):
+        lib.fill_form({"css:#name": "Ann", "css:#notes": "Hello"})
@@ -0,0 +1,44 @@
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def test_only_selenium_keywords_are_dispatched():
+    cls = library.TestProjectLibrary
+    declared = {name for name, func in vars(cls).items() if getattr(func, "selenium_keyword", False)}
+    assert set(cls.KEYWORDS) == declared
+    assert "click_element" in declared
+    assert "init_testproject_driver" not in declared and "enable_element_cache" not in declared
+
+
+def test_keyword_specs():
+    keywords = library.TestProjectLibrary.KEYWORDS
+    assert keywords["get_webelement"] == library.KeywordSpec(
+        "get_webelement", "Get WebElement", "Get Webelement", True, "get", False
+    )
+    assert keywords["click_element"].changes_page and keywords["click_element"].category == "action"
+    assert keywords["wait_until_element_is_visible"].category == "wait"
+    assert keywords["page_should_contain"].category == "assert" and not keywords["page_should_contain"].takes_locator
+
+
+def test_selenium_keyword_sets_the_robot_name():
+    @library.selenium_keyword
+    def plain(self):
+        pass
+
+    @library.selenium_keyword(name="Get WebElement")
+    def named(self):
+        pass
+
+    assert plain.selenium_keyword and plain.robot_name is None
+    assert named.selenium_keyword and named.robot_name == "Get WebElement"
+
+
+def test_base_outside_a_selenium_keyword():
+    with pytest.raises(RuntimeError, match="selenium_keyword"):
+        library.TestProjectLibrary().base("", "message", "description")
@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+
+from TestProjectLibrary.locators import LocatorOptimizer, optimize_locator, parse_locator, to_query, xpath_to_css
+
+
+@pytest.mark.parametrize(
+    "locator, expected",
+    [
+        ("//button", ("xpath", "//button")),
+        ("(//button)[2]", ("xpath", "(//button)[2]")),
+        ("css:#name", ("css", "#name")),
+        ("id=login", ("id", "login")),
+        ("Partial Link: Sign in", ("partiallink", "Sign in")),
+        ("login", ("default", "login")),
+        ("a:b", ("default", "a:b")),  # Not a strategy
+        ("css=a[href='x:y']", ("css", "a[href='x:y']")),
+    ],
+)
+def test_parse_locator(locator, expected):
+    assert parse_locator(locator) == expected
+
+
+def test_parse_locator_with_custom_strategy():
+    assert parse_locator("testid:save") == ("default", "testid:save")
+    assert parse_locator("testid:save", {"testid"}) == ("testid", "save")
+
+
+def test_to_query():
+    assert to_query("css:#name") == ["css", "#name"]
+    assert to_query("partial link:Sign") == ["partial link", "Sign"]
+    assert to_query("login") == ["identifier", "login"]
+    assert to_query("jquery:#name") is None
+    assert to_query("testid:save", {"testid"}) is None
+    assert to_query(object()) is None
+
+
+@pytest.mark.parametrize(
+    "xpath, css",
+    [
+        ("//input[@id='name']", "input[id=\"name\"]"),
+        ("//div[@class='list']/button", "div[class=\"list\"] > button"),
+        ("//form//input[@type2='x' and @name=\"user\"]", "form input[type2=\"x\"][name=\"user\"]"),
+        ("//*[contains(@class, 'item')]", "[class*=\"item\"]"),
+        ("//a[starts-with(@href,'https:')]", "a[href^=\"https:\"]"),
+        ("//*", "*"),
+    ],
+)
+def test_xpath_to_css(xpath, css):
+    assert xpath_to_css(xpath) == css
+
+
+@pytest.mark.parametrize(
+    "xpath",
+    [
+        "/html/body",  # Absolute paths
+        "//div[1]",  # Positions
+        "//div[text()='x']",
+        "//svg",  # Not an HTML element
+        "//input[@type='text']",  # Matched case-insensitively by CSS
+        "//div[contains(@class, '')]",  # Also matches elements without the attribute
+        "//div/..",
+        "//div[@id='a' or @id='b']",
+    ],
+)
+def test_xpath_that_is_not_translated(xpath):
+    assert xpath_to_css(xpath) is None
+
+
+def test_optimize_locator():
+    assert optimize_locator("xpath://input[@id='name']") == 'css:input[id="name"]'
+    assert optimize_locator("//input[@id='name']") == 'css:input[id="name"]'
+    assert optimize_locator("css:#name") is None
+    assert optimize_locator("//div[1]") is None
+
+
+def test_locator_optimizer_warns_once_per_xpath(caplog):
+    optimizer = LocatorOptimizer(warn=True)
+    with caplog.at_level(logging.WARNING):
+        assert optimizer.optimize("//div[@id='x']") == 'css:div[id="x"]'
+        assert optimizer.optimize("//div[1]") == "//div[1]"
+        assert optimizer.optimize("//div[1]") == "//div[1]"
+        assert optimizer.optimize("id:name") == "id:name"
+    assert [record.getMessage() for record in caplog.records] == [
+        "Locator '//div[1]' can't be optimized, consider using an id or a CSS locator."
+    ]
+
+
+def test_locator_optimizer_without_warnings(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert LocatorOptimizer().optimize("//div[1]") == "//div[1]"
+    assert caplog.records == []
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from TestProjectLibrary.messages import MessagePolicy, _chunks
+
+
+@pytest.mark.parametrize("value", ["text", ["a", 1, None], ("a",), (), {"a": [1, 2], 3: "b"}, 4.5, None])
+def test_chunks_are_the_text_of_the_value(value):
+    assert "".join(_chunks(value)) == str(value)
+
+
+def test_bound():
+    policy = MessagePolicy(max_length=10)
+    assert policy.bound("short") == "short"
+    assert policy.bound(None) == ""
+    assert policy.bound("x" * 10) == "x" * 10
+    bounded = policy.bound("x" * 25)
+    assert bounded == f"{'x' * 10}... [25 characters, blake2b {policy._hash('x' * 25)}]"
+
+
+def test_invalid_max_length():
+    with pytest.raises(ValueError):
+        MessagePolicy(max_length=0)
+
+
+def test_describe_below_the_side_file_length(tmp_path):
+    policy = MessagePolicy(max_length=10, side_file_length=100, directory=str(tmp_path))
+    assert policy.describe(["a", "b"]) == "['a', 'b']"
+    value = ["item"] * 10
+    assert policy.describe(value) == policy.bound(str(value))
+    assert os.listdir(tmp_path) == []
+
+
+def test_describe_writes_large_values_to_side_files(tmp_path):
+    policy = MessagePolicy(max_length=10, side_file_length=100, directory=str(tmp_path))
+    value = ["item"] * 50
+    text, digest = str(value), policy._hash(str(value))
+    described = policy.describe(value)
+    path = os.path.join(str(tmp_path), f"{digest}.txt")
+    assert described == f"{text[:10]}... [{len(text)} characters, blake2b {digest}, saved to {path}]"
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == text
+    # Equal values share their file
+    assert policy.describe(list(value)) == described
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_describe_without_side_files(tmp_path):
+    policy = MessagePolicy(max_length=10, side_file_length=None, directory=str(tmp_path))
+    value = "y" * 1000
+    assert policy.describe(value) == policy.bound(value)
+    assert os.listdir(tmp_path) == []
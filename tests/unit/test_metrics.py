@@ -0,0 +1,102 @@
+import json
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary import metrics
+from TestProjectLibrary.metrics import KeywordMetrics, percentile, summarize
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([0.5], 99) == 0.5
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_in_milliseconds():
+    assert summarize([0.003, 0.001, 0.002]) == {
+        "count": 3,
+        "total_ms": 6.0,
+        "p50_ms": 2.0,
+        "p95_ms": 3.0,
+        "p99_ms": 3.0,
+        "max_ms": 3.0,
+    }
+    assert summarize([])["max_ms"] == 0.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(metrics, "perf_counter", lambda: now[0])
+    return now
+
+
+def test_timer_records_phases_and_wrapper_overhead(clock):
+    keyword_metrics = KeywordMetrics()
+    keyword_metrics.start_test("Suite.Test")
+    timer = keyword_metrics.start("Click Element")
+    clock[0] = 0.010
+    timer.mark("keyword")
+    clock[0] = 0.012
+    timer.mark("report")
+    clock[0] = 0.015
+    timer.mark("screenshot")
+    clock[0] = 0.016
+    timer.mark("report")
+    clock[0] = 0.020
+    timer.stop()
+    phases = keyword_metrics.summary()["keywords"]["Click Element"]
+    assert {phase: values["total_ms"] for phase, values in phases.items()} == {
+        "keyword": 10.0,
+        "report": 3.0,
+        "screenshot": 3.0,
+        "wrapper": 4.0,
+        "total": 20.0,
+    }
+    assert keyword_metrics.summary()["tests"]["Suite.Test"]["total_ms"] == 20.0
+
+
+def test_keywords_outside_tests_are_not_counted_per_test(clock):
+    keyword_metrics = KeywordMetrics()
+    keyword_metrics.start("Go To").stop()
+    assert keyword_metrics.summary()["tests"] == {}
+    assert keyword_metrics.summary()["keywords"]["Go To"]["total"]["count"] == 1
+
+
+def test_html_table_and_json_output(tmp_path, clock):
+    output = tmp_path / "metrics.json"
+    keyword_metrics = KeywordMetrics(str(output))
+    timer = keyword_metrics.start("Get Text")
+    clock[0] = 0.001
+    timer.mark("keyword")
+    timer.stop()
+    table = keyword_metrics.html_table()
+    assert table.startswith("<table border='1'><tr><th>Keyword</th><th>Phase</th><th>count</th><th>p50_ms</th>")
+    assert "<tr><td>Get Text</td><td>keyword</td><td>1</td><td>1.0</td><td>1.0</td><td>1.0</td><td>1.0</td></tr>" in table
+    keyword_metrics.write()
+    assert json.loads(output.read_text())["keywords"]["Get Text"]["keyword"]["count"] == 1
+
+
+@pytest.mark.parametrize("async_reports", [False, True])
+def test_library_times_the_screenshot_apart_from_the_report(monkeypatch, async_reports):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder", async_reports=async_reports)
+    lib.enable_keyword_metrics()
+    lib.set_screenshot_policy("always")
+    lib.click_element("css:#save")
+    lib.set_screenshot_policy("never")
+    lib.click_element("css:#save")
+    summary = lib.get_keyword_metrics()["keywords"]["Click Element"]
+    lib.close_all_browsers()
+    assert set(summary) == {"keyword", "report", "screenshot", "wrapper", "total"}
+    assert summary["report"]["count"] == 2 and summary["screenshot"]["count"] == 1
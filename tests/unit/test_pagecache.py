@@ -0,0 +1,109 @@
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.pagecache import PAGE_CONTENT_SCRIPT, PageCache
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def test_least_recently_used_contents_are_dropped():
+    cache = PageCache(max_entries=2)
+    cache.put("a", {"title": "A"})
+    cache.put("b", {"title": "B"})
+    assert cache.get("a") == {"title": "A"}  # Now used more recently than b
+    cache.put("c", {"title": "C"})
+    assert cache.tokens() == ["a", "c"]
+    assert cache.get("b") is None
+    cache.clear()
+    assert cache.tokens() == []
+
+
+class FakePage:
+    """Answers PAGE_CONTENT_SCRIPT like a page whose DOM version only changes with `mutate`"""
+
+    def __init__(self, texts, complete=True):
+        self.texts, self.complete = texts, complete
+        self.version = 0
+        self.reads = 0
+
+    def mutate(self, texts):
+        self.texts = texts
+        self.version += 1
+
+    def run(self, scope, known):
+        token = f"{scope}:doc.{self.version}"
+        if token in known:
+            return [token, None]
+        self.reads += 1
+        return [token, {"texts": self.texts, "complete": self.complete, "title": "Home"}]
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    yield lib
+    lib.close_all_browsers()
+
+
+def serve(lib, monkeypatch, page):
+    selenium = lib._TestProjectLibrary__library
+    executor = selenium.driver.command_executor
+    execute = executor.execute
+    fallbacks = []
+
+    def execute_command(command, params):
+        if command == "w3cExecuteScript" and params["script"] == PAGE_CONTENT_SCRIPT:
+            return {"value": page.run(*params["args"])}
+        return execute(command, params)
+
+    run_keyword = selenium.run_keyword
+
+    def run(name, args, kwargs):
+        fallbacks.append(name)
+        return run_keyword(name, args, kwargs)
+
+    monkeypatch.setattr(executor, "execute", execute_command)
+    monkeypatch.setattr(selenium, "run_keyword", run)
+    return fallbacks
+
+
+def test_page_content_is_read_once_per_dom_version(lib, monkeypatch):
+    page = FakePage(["Welcome Ann"])
+    fallbacks = serve(lib, monkeypatch, page)
+    lib.page_should_contain("Welcome")
+    lib.page_should_not_contain("Goodbye")
+    assert page.reads == 1
+    page.mutate(["Goodbye Ann"])
+    with pytest.raises(AssertionError, match="Page should have contained text 'Welcome' but did not."):
+        lib.page_should_contain("Welcome")
+    assert page.reads == 2
+    assert "page_should_contain" not in fallbacks
+
+
+def test_text_in_any_frame(lib, monkeypatch):
+    serve(lib, monkeypatch, FakePage(["Top", "Inside the frame"]))
+    lib.page_should_contain("Inside")
+    with pytest.raises(AssertionError, match="Page should not have contained text 'Inside'."):
+        lib.page_should_not_contain("Inside")
+
+
+def test_unreadable_frames_fall_back_to_the_seleniumlibrary(lib, monkeypatch):
+    fallbacks = serve(lib, monkeypatch, FakePage(["Top"], complete=False))
+    lib.page_should_contain("Top")  # Found in a readable document
+    assert "page_should_contain" not in fallbacks
+    lib.page_should_contain("Elsewhere")  # The recorder finds every element
+    assert "page_should_contain" in fallbacks
+
+
+def test_navigation_clears_the_cache(lib, monkeypatch):
+    page = FakePage(["Welcome"])
+    serve(lib, monkeypatch, page)
+    lib.page_should_contain("Welcome")
+    lib.go_to("https://example.com")
+    lib.page_should_contain("Welcome")
+    assert page.reads == 2
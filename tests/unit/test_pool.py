@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+
+import pytest
+
+from TestProjectLibrary.pool import SessionPool
+
+
+class FakeDriver:
+    def __init__(self, factory, key):
+        self.factory = factory
+        self.key = key
+        self.window_handles = ["main", "popup"]
+        self.commands = []
+        self.quit_called = False
+        self.switch_to = SimpleNamespace(window=lambda handle: self.commands.append(("window", handle)))
+
+    def close(self):
+        self.commands.append(("close",))
+        self.window_handles = self.window_handles[:-1]
+
+    def delete_all_cookies(self):
+        self.commands.append(("delete_all_cookies",))
+
+    def execute_script(self, script):
+        self.commands.append(("execute_script",))
+
+    def get(self, url):
+        self.commands.append(("get", url))
+
+    def quit(self):
+        self.quit_called = True
+        self.factory.live.remove(self)
+
+
+class SingletonFactory:
+    """Creates drivers like the TestProject SDK, which refuses a second live driver per process"""
+
+    def __init__(self, max_live=1):
+        self.max_live = max_live
+        self.live = []
+        self.created = 0
+
+    def __call__(self, key="chrome"):
+        if len(self.live) >= self.max_live:
+            raise RuntimeError("A driver session already exists")
+        self.created += 1
+        driver = FakeDriver(self, key)
+        self.live.append(driver)
+        return driver
+
+    def creates(self, key):
+        return lambda: self(key)
+
+
+def test_released_driver_is_reset_and_reused():
+    factory = SingletonFactory()
+    pool = SessionPool(max_sessions=1)
+    driver = pool.acquire("chrome", factory.creates("chrome"))
+    assert pool.release(driver)
+    assert driver.commands == [
+        ("window", "popup"),
+        ("close",),
+        ("window", "main"),
+        ("delete_all_cookies",),
+        ("execute_script",),
+        ("get", "about:blank"),
+    ]
+    assert pool.acquire("chrome", factory.creates("chrome")) is driver
+    assert factory.created == 1
+
+
+def test_release_of_unknown_driver():
+    assert not SessionPool().release(object())
+
+
+def test_idle_session_is_quit_before_creating_another_key():
+    factory = SingletonFactory()
+    pool = SessionPool(max_sessions=1)
+    chrome = pool.acquire("chrome", factory.creates("chrome"))
+    pool.release(chrome)
+    firefox = pool.acquire("firefox", factory.creates("firefox"))
+    assert chrome.quit_called and not firefox.quit_called
+    assert factory.live == [firefox]
+    pool.release(firefox)
+    assert pool.acquire("chrome", factory.creates("chrome")).key == "chrome"
+    assert factory.created == 3
+
+
+def test_expired_sessions_are_quit():
+    factory = SingletonFactory()
+    pool = SessionPool(max_uses=2, max_sessions=1)
+    driver = pool.acquire("chrome", factory.creates("chrome"))
+    pool.release(driver)
+    assert pool.acquire("chrome", factory.creates("chrome")) is driver
+    pool.release(driver)  # Handed out twice, it is not kept
+    assert driver.quit_called
+    assert pool.acquire("chrome", factory.creates("chrome")) is not driver
+
+
+def test_warm_respects_max_sessions():
+    factory = SingletonFactory()
+    pool = SessionPool(max_sessions=1)
+    pool.acquire("chrome", factory.creates("chrome"))
+    assert not pool.warm("chrome", factory.creates("chrome"))
+    assert factory.created == 1
+
+
+def test_prewarmed_spare_session_is_handed_out():
+    factory = SingletonFactory(max_live=2)
+    pool = SessionPool(prewarm=True, max_sessions=2)
+    first = pool.acquire("chrome", factory.creates("chrome"))
+    second = pool.acquire("chrome", factory.creates("chrome"))  # The spare one, or waits for it to be created
+    assert second is not first and factory.created == 2
+    pool.close()
+    assert factory.live == []
+
+
+def test_close_quits_idle_and_handed_out_sessions():
+    factory = SingletonFactory(max_live=2)
+    pool = SessionPool()
+    idle = pool.acquire("chrome", factory.creates("chrome"))
+    in_use = pool.acquire("chrome", factory.creates("chrome"))
+    pool.release(idle)
+    pool.close()
+    assert idle.quit_called and in_use.quit_called
+
+
+def test_failed_reset_quits_the_session():
+    factory = SingletonFactory()
+    pool = SessionPool(max_sessions=1)
+    driver = pool.acquire("chrome", factory.creates("chrome"))
+
+    def fail(url):
+        raise RuntimeError("browser crashed")
+
+    driver.get = fail
+    assert pool.release(driver)
+    assert driver.quit_called
+
+
+def test_singleton_factory_refuses_a_second_driver():
+    factory = SingletonFactory()
+    factory("chrome")
+    with pytest.raises(RuntimeError):
+        factory("firefox")
@@ -0,0 +1,181 @@
+import sys
+import threading
+from types import SimpleNamespace
+
+# Imported first like when a driver is created, the SDK messages can't be imported on their own
+from src.testproject.sdk.drivers import webdriver  # noqa: F401
+from TestProjectLibrary import TestProjectLibrary as Library
+from TestProjectLibrary.reporting import ReportingPipeline, report_step, sends_reports
+from src.testproject.rest.messages import StepReport
+
+# The package exports the library class under the name of its module
+library_module = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+class FakeAgent:
+    def __init__(self, log):
+        self.log = log
+        self.release = threading.Event()
+        self.release.set()
+
+    def report_step(self, step):
+        self.release.wait(5)
+        payload = step.to_json()
+        self.log.append(("step", payload["description"], payload.get("screenshot")))
+
+
+class FakeExecutor:
+    def __init__(self, log, disable_reports=False):
+        self.agent_client = FakeAgent(log)
+        self.disable_reports = disable_reports
+        self.screenshots = 0
+        self.capture_threads = []
+
+    def update_known_test_name(self):
+        pass
+
+    def create_screenshot(self):
+        self.screenshots += 1
+        self.capture_threads.append(threading.current_thread())
+        return f"screenshot-{self.screenshots}"
+
+
+class FakeReporter:
+    """Sends steps like the TestProject reporter, which captures the screenshot itself unless reports are disabled"""
+
+    def __init__(self, disable_reports=False):
+        self.log = []
+        self._command_executor = FakeExecutor(self.log, disable_reports)
+
+    def step(self, description, message, passed, screenshot=False, **kwargs):
+        if self._command_executor.disable_reports:
+            return
+        screenshot = self._command_executor.create_screenshot() if screenshot else None
+        self._command_executor.agent_client.report_step(StepReport(description, message, passed, screenshot))
+
+    def test(self, name=None, passed=True, message=None):
+        self.log.append(("test", name, passed))
+
+
+def test_reports_keep_their_order():
+    reporter = FakeReporter()
+    pipeline = ReportingPipeline(reporter)
+    pipeline.step("one", "", True)
+    pipeline.step("two", "", True, screenshot=True)
+    pipeline.step("three", "", False)
+    pipeline.test(name="Test", passed=False)
+    pipeline.step("four", "", True, screenshot=True)
+    pipeline.close()
+    assert reporter.log == [
+        ("step", "one", None),
+        ("step", "two", "screenshot-1"),
+        ("step", "three", None),
+        ("test", "Test", False),
+        ("step", "four", "screenshot-2"),
+    ]
+
+
+def test_screenshots_are_captured_on_the_calling_thread_without_waiting_for_the_queue():
+    reporter = FakeReporter()
+    agent = reporter._command_executor.agent_client
+    agent.release.clear()  # The Agent is slow
+    pipeline = ReportingPipeline(reporter)
+    pipeline.step("one", "", True)
+    pipeline.step("two", "", True, screenshot=True)
+    assert reporter._command_executor.capture_threads == [threading.current_thread()]
+    assert reporter.log == []
+    agent.release.set()
+    pipeline.flush()
+    assert [entry[1] for entry in reporter.log] == ["one", "two"]
+    pipeline.close()
+
+
+def test_disabled_reports_capture_no_screenshot():
+    reporter = FakeReporter(disable_reports=True)
+    pipeline = ReportingPipeline(reporter)
+    assert not sends_reports(pipeline)
+    pipeline.step("one", "", True, screenshot=True)
+    pipeline.close()
+    assert reporter._command_executor.screenshots == 0
+    assert reporter.log == []
+
+
+def test_reports_after_close_are_sent_on_the_calling_thread():
+    reporter = FakeReporter()
+    pipeline = ReportingPipeline(reporter)
+    pipeline.step("one", "", True)
+    pipeline.close()
+    pipeline.close()
+    pipeline.test(name="Test", passed=True)
+    assert pipeline.closed
+    assert reporter.log == [("step", "one", None), ("test", "Test", True)]
+
+
+def reporting_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "TestProjectReporting"]
+
+
+def test_library_closes_pipelines_no_browser_uses(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    threads = len(reporting_threads())
+    library = Library()
+    result = SimpleNamespace(name="Test", passed=True, longname="Suite.Test")
+    library._start_test(None, result)
+    library.init_testproject_driver("chrome", url="about:blank", backend="recorder", async_reports=True)
+    first = library._TestProjectLibrary__reporter
+    library.close_all_browsers()
+    library.init_testproject_driver("chrome", url="about:blank", backend="recorder", async_reports=True)
+    second = library._TestProjectLibrary__reporter
+    assert first.closed and not second.closed
+    assert len(reporting_threads()) == threads + 1
+    library._end_test(None, result)
+    assert not second.closed  # Still used by the open browser
+    library.close_all_browsers()
+    library._end_test(None, result)
+    assert second.closed
+    assert [r["name"] for r in second.reporter.records if r["kind"] == "test"] == ["Test", "Test"]
+    assert len(reporting_threads()) == threads
+
+
+def test_library_captures_no_screenshot_for_disabled_reports(monkeypatch):
+    library = Library()
+    library.enable_screenshot_pipeline()
+    reporter = FakeReporter(disable_reports=True)
+    library._TestProjectLibrary__reporter = reporter
+    captured = []
+    monkeypatch.setattr(library, "_capture_report_screenshot", lambda: captured.append(True))
+    library._report_step("Click Element: css:#name", "", True, screenshot=True)
+    library._TestProjectLibrary__screenshot_pipeline.close()
+    assert captured == [] and reporter.log == []
+
+
+def test_report_step_with_captured_screenshot():
+    reporter = FakeReporter()
+    report_step(reporter, "one", "", True, screenshot="captured")
+    report_step(reporter, "two", "", True)
+    assert reporter.log == [("step", "one", "captured"), ("step", "two", None)]
+    assert reporter._command_executor.screenshots == 0
+
+
+def test_library_flushes_reports_at_the_end_of_tests_and_suites():
+    library = Library()
+    reporter = FakeReporter()
+    agent = reporter._command_executor.agent_client
+    pipeline = ReportingPipeline(reporter)
+    library._TestProjectLibrary__reporter = pipeline
+    library._TestProjectLibrary__contexts[1] = library_module.DriverContext(pipeline, False)  # An open browser
+    result = SimpleNamespace(name="Test", passed=True, longname="Suite.Test")
+
+    library._start_test(None, result)
+    agent.release.clear()
+    library.base_report(True, message="Clicked", keyword_name="Click Element", description="css:#name")
+    threading.Timer(0.2, agent.release.set).start()
+    library._end_test(None, result)
+    assert reporter.log == [("step", "Click Element: css:#name", "screenshot-1"), ("test", "Test", True)]
+
+    agent.release.clear()
+    library.base_report(True, message="Clicked", keyword_name="Click Element", description="css:#name")
+    threading.Timer(0.2, agent.release.set).start()
+    library._end_suite(SimpleNamespace(parent=None), result)
+    assert len(reporter.log) == 3
+    pipeline.close()
@@ -0,0 +1,116 @@
+import base64
+import io
+import os
+
+import pytest
+
+from TestProjectLibrary.screenshots import ScreenshotPipeline, ScreenshotPolicy, has_pillow, reserve_path
+
+pillow = pytest.mark.skipif(not has_pillow(), reason="Pillow is not installed")
+
+
+def png(changed_pixel=None, compress_level=6):
+    from PIL import Image
+
+    image = Image.new("RGB", (64, 64), "white")
+    image.paste((0, 0, 0), (0, 0, 32, 64))
+    if changed_pixel:
+        image.putpixel(changed_pixel, (255, 0, 0))
+    output = io.BytesIO()
+    image.save(output, "PNG", compress_level=compress_level)
+    return base64.b64encode(output.getvalue()).decode("ascii")
+
+
+def send(pipeline, screenshot, passed=True):
+    return pipeline.resolve(pipeline.process(screenshot), deduplicate=passed)
+
+
+@pillow
+def test_only_identical_report_screenshots_are_duplicates():
+    pipeline = ScreenshotPipeline()
+    assert send(pipeline, png()) is not None
+    assert send(pipeline, png()) is None
+    # A small change of the page is evidence and is sent
+    assert send(pipeline, png(changed_pixel=(40, 40))) is not None
+    # Failed steps always get their screenshot
+    assert send(pipeline, png(changed_pixel=(40, 40)), passed=False) is not None
+    pipeline.close()
+    assert pipeline.stats["sent"] == 3 and pipeline.stats["duplicates"] == 1
+
+
+@pillow
+def test_perceptual_deduplication_is_opt_in():
+    exact, perceptual = ScreenshotPipeline(), ScreenshotPipeline(perceptual=True)
+    # The same page, encoded differently by the browser
+    assert png() != png(compress_level=1)
+    for pipeline in (exact, perceptual):
+        assert send(pipeline, png()) is not None
+    assert send(exact, png(compress_level=1)) is not None
+    assert send(perceptual, png(compress_level=1)) is None
+    exact.close()
+    perceptual.close()
+
+
+def test_no_deduplication():
+    screenshot = base64.b64encode(b"not really a png").decode("ascii")
+    pipeline = ScreenshotPipeline(deduplicate=False)
+    if has_pillow():
+        screenshot = png()
+    assert send(pipeline, screenshot) is not None
+    assert send(pipeline, screenshot) is not None
+    pipeline.close()
+
+
+@pillow
+def test_identical_files_are_linked(tmp_path):
+    pipeline = ScreenshotPipeline()
+    first = pipeline.save(png(), reserve_path(str(tmp_path), "shot-{index}.png")).result()
+    second = pipeline.save(png(), reserve_path(str(tmp_path), "shot-{index}.png")).result()
+    pipeline.close()
+    assert os.path.basename(first) == "shot-1.png" and os.path.basename(second) == "shot-2.png"
+    assert os.path.samefile(first, second)
+    assert pipeline.stats["saved"] == 1 and pipeline.stats["linked"] == 1
+
+
+def test_reserve_path_formats_index(tmp_path):
+    assert reserve_path(str(tmp_path), "a-{index}.png") == str(tmp_path / "a-1.png")
+    assert reserve_path(str(tmp_path), "a-{index}.png") == str(tmp_path / "a-2.png")
+    assert reserve_path(str(tmp_path), "sub/b.png", ".jpg") == str(tmp_path / "sub" / "b.jpg")
+
+
+@pytest.mark.parametrize("text", ["always", "never", "failures", "every:3", "categories:action,wait", "page_change"])
+def test_policy_round_trip(text):
+    assert str(ScreenshotPolicy.parse(text)) == text
+
+
+def test_policy_parse_normalizes():
+    assert str(ScreenshotPolicy.parse(" EVERY:2 ")) == "every:2"
+    assert str(ScreenshotPolicy.parse("every")) == "every:1"
+    assert ScreenshotPolicy.parse("categories: wait , action,").categories == {"wait", "action"}
+    policy = ScreenshotPolicy.parse("failures")
+    assert ScreenshotPolicy.parse(policy) is policy
+
+
+@pytest.mark.parametrize("text", ["sometimes", "every:0", "every:-1", "every:x"])
+def test_policy_parse_rejects_invalid_policies(text):
+    with pytest.raises(ValueError):
+        ScreenshotPolicy.parse(text)
+
+
+def captures(policy, steps):
+    return [policy.should_capture(*step) for step in steps]
+
+
+def test_policy_decisions():
+    assert captures(ScreenshotPolicy.parse("never"), [(True,), (False,)]) == [False, False]
+    assert captures(ScreenshotPolicy.parse("failures"), [(True,), (False,)]) == [False, True]
+    every = ScreenshotPolicy.parse("every:2")
+    assert captures(every, [(True,), (True,), (True,), (False,), (True,)]) == [False, True, False, True, False]
+    categories = ScreenshotPolicy.parse("categories:action")
+    assert captures(categories, [(True, "action"), (True, "get"), (False, "get")]) == [True, False, True]
+
+
+def test_page_change_policy():
+    fingerprints = iter([("a", 1), ("a", 1), ("a", 2), None])
+    policy = ScreenshotPolicy.parse("page_change")
+    assert captures(policy, [(True, "", lambda: next(fingerprints))] * 4) == [True, False, True, True]
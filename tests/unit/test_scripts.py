@@ -0,0 +1,175 @@
+import json
+import re
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.scripts import ASYNC_CALL_SCRIPT, CALL_SCRIPT, MISSING, ScriptRegistry, is_missing
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+def test_register_joins_the_code():
+    script = ScriptRegistry().register("sum", ["return arguments[0] ", "+ arguments[1];"])
+    assert script.source == "return arguments[0] + arguments[1];"
+    assert not script.asynchronous
+
+
+def test_register_reads_javascript_files(tmp_path):
+    path = tmp_path / "sum.js"
+    path.write_text("return arguments[0] + arguments[1];\n", encoding="utf-8")
+    assert ScriptRegistry().register("sum", [str(path)]).source == "return arguments[0] + arguments[1];"
+
+
+def test_versions_follow_the_source():
+    registry = ScriptRegistry()
+    first = registry.register("sum", ["return 1;"])
+    assert registry.register("other", ["return 1;"]).version == first.version
+    assert registry.register("sum", ["return 1;"], asynchronous=True).version != first.version
+    second = registry.register("sum", ["return 2;"])
+    assert second.version != first.version
+    assert registry.get("sum") == second  # Replaced
+
+
+def test_register_and_get_errors():
+    registry = ScriptRegistry()
+    with pytest.raises(ValueError, match="No JavaScript code was given for script 'empty'."):
+        registry.register("empty", [" "])
+    registry.register("sum", ["return 1;"])
+    with pytest.raises(ValueError, match="No script named 'total' was registered, registered are: sum"):
+        registry.get("total")
+
+
+def test_is_missing():
+    assert is_missing({MISSING: True})
+    assert not is_missing({MISSING: False})
+    assert not is_missing(None)
+    assert not is_missing([MISSING])
+
+
+# Runs the calls in order in an emulated page, a call without script replaces the page like a navigation
+PAGE = """
+var results = [];
+globalThis.window = {};
+CALLS.forEach(function (call) {
+    if (call.script === null) { globalThis.window = {}; results.push(null); return; }
+    var args = call.args.slice(), result;
+    if (call.asynchronous) { args.push(function (value) { result = value; }); }
+    var value = new Function(call.script).apply(null, args);
+    results.push(call.asynchronous ? result : value);
+});
+console.log(JSON.stringify(results));
+"""
+
+
+def run_in_page(*calls):
+    calls = [{"script": script, "args": list(args), "asynchronous": asynchronous} for script, args, asynchronous in calls]
+    page = PAGE.replace("CALLS", json.dumps(calls))
+    completed = subprocess.run(["node", "-e", page], capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout)
+
+
+needs_node = pytest.mark.skipif(shutil.which("node") is None, reason="Runs the scripts with node")
+
+
+@needs_node
+def test_call_script_runs_installed_scripts():
+    registry = ScriptRegistry()
+    script = registry.register("sum", ["return arguments[0] + arguments[1];"])
+    results = run_in_page(
+        (CALL_SCRIPT, ["sum", script.version, 1, 2], False),  # Not installed yet
+        (script.install_script(), [1, 2], False),
+        (CALL_SCRIPT, ["sum", script.version, 3, 4], False),
+        (CALL_SCRIPT, ["sum", "outdated", 3, 4], False),
+        (None, [], False),
+        (CALL_SCRIPT, ["sum", script.version, 3, 4], False),  # Not installed in the new page
+    )
+    assert results == [{MISSING: True}, 3, 7, {MISSING: True}, None, {MISSING: True}]
+
+
+@needs_node
+def test_async_call_script_calls_back():
+    registry = ScriptRegistry()
+    script = registry.register("twice", ["arguments[arguments.length - 1](arguments[0] * 2);"], asynchronous=True)
+    results = run_in_page(
+        (ASYNC_CALL_SCRIPT, ["twice", script.version, 2], True),
+        (script.install_script(), [2], True),
+        (ASYNC_CALL_SCRIPT, ["twice", script.version, 5], True),
+    )
+    assert results == [{MISSING: True}, 4, 10]
+
+
+class FakePage:
+    """Answers the registered script calls like a page keeping the installed scripts until `navigate`"""
+
+    def __init__(self):
+        self.installed = {}
+        self.installs = 0
+
+    def navigate(self):
+        self.installed.clear()
+
+    def run(self, script, args):
+        if script == CALL_SCRIPT:
+            name, version, *args = args
+            if self.installed.get(name) != version:
+                return {MISSING: True}
+        else:
+            self.installs += 1
+            version, name = re.search(r'f.version = "(\w+)";\n.*\["(\w+)"\] = f;', script).groups()
+            self.installed[name] = version
+        return sum(args)
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    yield lib
+    lib.close_all_browsers()
+
+
+def serve(lib, monkeypatch, page):
+    executor = lib._TestProjectLibrary__library.driver.command_executor
+    execute = executor.execute
+    scripts = []
+
+    def execute_command(command, params):
+        if command == "w3cExecuteScript":
+            scripts.append(params["script"])
+            return {"value": page.run(params["script"], params["args"])}
+        return execute(command, params)
+
+    monkeypatch.setattr(executor, "execute", execute_command)
+    return scripts
+
+
+def test_registered_scripts_are_installed_once_per_page(lib, monkeypatch):
+    page = FakePage()
+    scripts = serve(lib, monkeypatch, page)
+    lib.register_script("sum", "return arguments[0] + arguments[1];")
+    assert lib.execute_registered_script("sum", 1, 2) == 3
+    assert lib.execute_registered_script("sum", 3, 4) == 7
+    assert page.installs == 1
+    assert scripts[1] == CALL_SCRIPT  # Only the name and arguments are sent
+    page.navigate()
+    assert lib.execute_registered_script("sum", 5, 6) == 11
+    assert page.installs == 2
+    assert scripts[2:] == [CALL_SCRIPT, scripts[0]]  # Missing in the new page, installed again
+    assert lib._recorder().records[-1]["description"] == "Execute Registered Script: sum"
+
+
+def test_re_registered_scripts_are_installed_again(lib, monkeypatch):
+    page = FakePage()
+    serve(lib, monkeypatch, page)
+    lib.register_script("sum", "return arguments[0] + arguments[1];")
+    lib.execute_registered_script("sum", 1, 2)
+    lib.register_script("sum", "return arguments[0] + arguments[1] + 0;")
+    lib.execute_registered_script("sum", 1, 2)
+    assert page.installs == 2
@@ -0,0 +1,70 @@
+import os
+import stat
+
+import pytest
+
+from TestProjectLibrary.sessionstate import SessionStateStore, origin, split_cookies
+
+STATE = {"origin": "https://example.com", "cookies": [{"name": "sid", "value": "1"}], "local": {"a": "1"}, "session": {}}
+
+
+def test_round_trip(tmp_path):
+    store = SessionStateStore(str(tmp_path / "states"))
+    path = store.save("admin user", STATE)
+    assert os.path.basename(path) == "admin_user.json"
+    state = store.load("admin user")
+    assert state["cookies"] == STATE["cookies"] and state["local"] == STATE["local"] and state["saved"] > 0
+    assert os.listdir(tmp_path / "states") == ["admin_user.json"]
+
+
+def test_missing_and_expired_states(tmp_path):
+    store = SessionStateStore(str(tmp_path))
+    assert store.load("missing") is None
+    store.save("admin", STATE)
+    assert store.load("admin", max_age=60) is not None
+    assert store.load("admin", max_age=-1) is None
+
+
+def test_json_path(tmp_path):
+    store = SessionStateStore(str(tmp_path / "states"))
+    path = store.save(str(tmp_path / "other" / "admin.json"), STATE)
+    assert path == str(tmp_path / "other" / "admin.json")
+    assert store.load(path)["origin"] == STATE["origin"]
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_private_permissions(tmp_path):
+    store = SessionStateStore(str(tmp_path / "states"))
+    path = store.save("admin", STATE)
+    assert stat.S_IMODE(os.stat(tmp_path / "states").st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_refuses_shared_directories(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError):
+        SessionStateStore(str(shared)).save("admin", STATE)
+    private = tmp_path / "private"
+    private.mkdir(mode=0o700)
+    os.symlink(private, tmp_path / "link")
+    with pytest.raises(PermissionError):
+        SessionStateStore(str(tmp_path / "link")).load("admin")
+
+
+def test_split_cookies():
+    cookies = [
+        {"name": "a", "value": "1"},
+        {"name": "b", "value": "2", "httpOnly": True},
+        {"name": "c", "value": "3", "expiry": 100},
+    ]
+    scripted, http_only = split_cookies(cookies, now=200)
+    assert [c["name"] for c in scripted] == ["a"]
+    assert [c["name"] for c in http_only] == ["b"]
+
+
+def test_origin():
+    assert origin("https://example.com:8443/web/login?next=1") == "https://example.com:8443"
+    assert origin("about:blank") == ""
@@ -0,0 +1,112 @@
+import json
+
+from TestProjectLibrary.spans import JsonlExporter, SpanListener, SpanStreamer, _otlp, create_exporter, OtlpExporter
+
+
+class ListExporter:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def export(self, spans):
+        if self.fail:
+            raise OSError("unreachable")
+        self.batches.append(spans)
+
+
+def read_spans(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_export_and_rotation(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonlExporter(str(path), max_bytes=100, backups=2)
+    for index in range(4):
+        exporter.export([{"index": index, "padding": "x" * 40}])
+    assert [span["index"] for span in read_spans(path)] == [3]
+    assert [span["index"] for span in read_spans(f"{path}.1")] == [2]
+    assert [span["index"] for span in read_spans(f"{path}.2")] == [1]
+    assert not (tmp_path / "spans.jsonl.3").exists()
+
+
+def test_create_exporter(tmp_path):
+    assert isinstance(create_exporter(str(tmp_path / "spans.jsonl")), JsonlExporter)
+    exporter = create_exporter("http://localhost:4318")
+    assert isinstance(exporter, OtlpExporter) and exporter.endpoint == "http://localhost:4318/v1/traces"
+
+
+def test_streamer_batches_and_drops_failed_batches():
+    exporter = ListExporter()
+    streamer = SpanStreamer(exporter, batch_size=2)
+    for index in range(5):
+        streamer.put({"index": index})
+    streamer.close()
+    assert [span["index"] for batch in exporter.batches for span in batch] == [0, 1, 2, 3, 4]
+    assert all(len(batch) <= 2 for batch in exporter.batches)
+    assert streamer.exported == 5
+
+    failing = SpanStreamer(ListExporter(fail=True))
+    failing.put({"index": 0})
+    failing.close()
+    assert failing.dropped == 1
+
+
+def attributes(robot_id=None, **kwargs):
+    result = {"starttime": "20201124 10:00:00.000", "endtime": "20201124 10:00:01.500", "status": "PASS"}
+    if robot_id:
+        result.update(id=robot_id, longname=robot_id)
+    result.update(kwargs)
+    return result
+
+
+def test_listener_spans_and_parents():
+    exporter = ListExporter()
+    listener = SpanListener()
+    listener.start_keyword("Ignored", attributes())  # Before streaming starts
+    listener.end_keyword("Ignored", attributes())
+    listener.start(SpanStreamer(exporter), trace_id="0" * 32)
+    listener.start_suite("Suite", attributes("s1"))
+    listener.start_test("Test", attributes("s1-t1"))
+    listener.start_keyword("Outer", attributes())
+    listener.start_keyword("TestProjectLibrary.Click Element", attributes())
+    listener.set_locator("css:#name")
+    listener.end_keyword("TestProjectLibrary.Click Element", attributes(args=["${locator}"], libname="TestProjectLibrary"))
+    listener.end_keyword("Outer", attributes(args=["a"]))
+    listener.end_test("Test", attributes("s1-t1", tags=["smoke"], status="FAIL", message="Boom"))
+    listener.end_suite("Suite", attributes("s1", source="suite.robot", totaltests=1))
+    listener.close()
+
+    spans = {span["name"]: span for batch in exporter.batches for span in batch}
+    assert list(spans) == ["TestProjectLibrary.Click Element", "Outer", "s1-t1", "s1"]
+    click, outer, test, suite = spans.values()
+    assert click["attributes"]["locator"] == "css:#name"
+    assert click["attributes"]["args"] == ["${locator}"]
+    assert "locator" not in outer["attributes"]
+    assert click["parent_id"] == outer["span_id"]
+    assert outer["parent_id"] == test["span_id"]
+    assert test["parent_id"] == suite["span_id"] and suite["parent_id"] is None
+    assert test["attributes"]["tags"] == ["smoke"] and test["message"] == "Boom"
+    assert click["duration_ms"] == 1500 and {span["trace_id"] for span in spans.values()} == {"0" * 32}
+
+
+def test_otlp_span():
+    span = {
+        "trace_id": "a" * 32,
+        "span_id": "b" * 16,
+        "parent_id": None,
+        "kind": "test",
+        "name": "Test",
+        "start": 1.0,
+        "end": 2.5,
+        "status": "FAIL",
+        "message": "Boom",
+        "attributes": {"tags": ["smoke"], "retries": 2, "critical": True},
+    }
+    result = _otlp(span)
+    assert "parentSpanId" not in result
+    assert result["startTimeUnixNano"] == "1000000000" and result["endTimeUnixNano"] == "2500000000"
+    assert result["status"] == {"code": 2, "message": "Boom"}
+    values = {attribute["key"]: attribute["value"] for attribute in result["attributes"]}
+    assert values["retries"] == {"intValue": "2"} and values["critical"] == {"boolValue": True}
+    assert values["robot.kind"] == {"stringValue": "test"}
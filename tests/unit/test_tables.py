@@ -0,0 +1,97 @@
+import pytest
+
+from TestProjectLibrary.tables import TableSnapshot, expand_spans
+
+
+def cell(text, colspan=1, rowspan=1):
+    return [text, colspan, rowspan]
+
+
+# Like TABLE_DATA_SCRIPT returns it, for a table with its <tfoot> before its <tbody>
+DATA = {
+    "rows": [
+        ["thead", 1, 1, [cell("Name"), cell("Age")]],
+        ["tfoot", 1, 1, [cell("Total"), cell("111")]],
+        ["tbody", 1, 3, [cell("Ann"), cell("30")]],
+        ["tbody", 2, 3, [cell("Bob", rowspan=2), cell("40")]],
+        ["tbody", 3, 3, [cell("41")]],
+    ],
+    "ordered": [0, 2, 3, 4, 1],
+    "headers": ["Name", "Age"],
+    "footers": ["Total", "111"],
+    "text": "Name Age Total 111 Ann 30 Bob 40 41",
+}
+
+
+@pytest.fixture
+def table():
+    return TableSnapshot("id:people", DATA)
+
+
+def test_expand_spans():
+    rows = [
+        [cell("A", colspan=2), cell("B", rowspan=2)],
+        [cell("C"), cell("D")],
+        [cell("E", rowspan=0), cell("F")],
+        [cell("G")],
+    ]
+    assert expand_spans(rows) == [["A", "A", "B"], ["C", "D", "B"], ["E", "F"], ["E", "G"]]
+
+
+def test_as_dict(table):
+    assert table.as_dict() == {
+        "header": [["Name", "Age"]],
+        "body": [["Ann", "30"], ["Bob", "40"], ["Bob", "41"]],
+        "footer": [["Total", "111"]],
+    }
+
+
+def test_get_cell_counts_rows_like_the_seleniumlibrary(table):
+    assert table.get_cell(1, 1) == "Name"
+    assert table.get_cell(2, 2) == "30"
+    assert table.get_cell(-1, 1) == "Total"  # The footer is the last row
+    assert table.get_cell(4, -1) == "41"
+
+
+def test_get_cell_errors(table):
+    with pytest.raises(ValueError, match="non-zero"):
+        table.get_cell(0, 1)
+    with pytest.raises(AssertionError, match="should have had at least 6 rows but had only 5"):
+        table.get_cell(6, 1)
+    with pytest.raises(AssertionError, match="row 4 should have had at least 2 columns but had only 1"):
+        table.get_cell(4, 2)
+
+
+def test_cell_should_contain(table):
+    table.cell_should_contain(3, 1, "Bo")
+    with pytest.raises(AssertionError, match="row 3 and column 1 should have contained text 'Ann' but it had 'Bob'"):
+        table.cell_should_contain(3, 1, "Ann")
+
+
+def test_column_should_contain_counts_the_cells_of_each_row(table):
+    table.column_should_contain(2, "111")
+    table.column_should_contain(1, "41")  # Like the SeleniumLibrary, spanned cells are not counted
+    with pytest.raises(AssertionError, match="column 1 did not contain text '30'"):
+        table.column_should_contain(1, "30")
+
+
+def test_row_should_contain_counts_rows_within_their_section(table):
+    table.row_should_contain(1, "Name")
+    table.row_should_contain(1, "Ann")
+    table.row_should_contain(-1, "41")
+    with pytest.raises(AssertionError, match="row 2 did not contain text 'Ann'"):
+        table.row_should_contain(2, "Ann")
+    with pytest.raises(ValueError):
+        table.row_should_contain(0, "Ann")
+
+
+def test_header_footer_and_table_should_contain(table):
+    table.header_should_contain("Ag")
+    table.footer_should_contain("Total")
+    table.should_contain("Bob 40")
+    with pytest.raises(AssertionError, match="header did not contain text 'Ann'"):
+        table.header_should_contain("Ann")
+    with pytest.raises(AssertionError, match="footer did not contain text 'Name'"):
+        table.footer_should_contain("Name")
+    with pytest.raises(AssertionError, match="'id:people' did not contain text 'Carl'"):
+        table.should_contain("Carl")
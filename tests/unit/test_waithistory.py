@@ -0,0 +1,96 @@
+from TestProjectLibrary.waithistory import WaitHistory, url_pattern, wait_key
+
+
+def history(tmp_path, **kwargs):
+    return WaitHistory(str(tmp_path / "wait_history.txt"), **kwargs)
+
+
+def test_no_timeout_before_min_samples(tmp_path):
+    waits = history(tmp_path, min_samples=3)
+    waits.record("key", 0.5)
+    waits.record("key", 0.5)
+    assert waits.timeout("key") is None
+    waits.record("key", 0.5)
+    assert waits.timeout("key") == 1.0
+
+
+def test_timeout_is_percentile_times_margin_clamped_to_min_timeout(tmp_path):
+    waits = history(tmp_path, pct=50, margin=3, min_samples=1, min_timeout=1)
+    for duration in (0.1, 0.1, 0.2):
+        waits.record("fast", duration)
+    for duration in (1, 2, 3):
+        waits.record("slow", duration)
+    assert waits.timeout("fast") == 1  # 0.3 seconds, clamped to min_timeout
+    assert waits.timeout("slow") == 6
+
+
+def test_failed_wait_falls_back_to_configured_timeout(tmp_path):
+    waits = history(tmp_path, min_samples=2)
+    waits.record("key", 0.2)
+    waits.record("key", 0.2)
+    assert waits.timeout("key") == 1.0
+    waits.record("key", 1.0, passed=False, configured=10)
+    assert waits.samples("key") == [200, 200, 10000]
+    assert waits.timeout("key") is None
+    # Other processes learn the longer duration from the file
+    waits.flush()
+    assert history(tmp_path, min_samples=2).timeout("key") == 20
+
+
+def test_persisted_across_instances(tmp_path):
+    waits = history(tmp_path)
+    waits.record("a", 0.25)
+    waits.record("b", 1.5)
+    assert history(tmp_path).samples("a") == []
+    waits.flush()
+    assert history(tmp_path).samples("a") == [250]
+    assert history(tmp_path).samples("b") == [1500]
+
+
+def test_compacted_to_max_samples(tmp_path):
+    waits = history(tmp_path, max_samples=3)
+    for milliseconds in range(10):
+        waits.record("key", milliseconds / 1000)
+    waits.flush()
+    with open(waits.path) as f:
+        assert f.read().split() == ["key", "7", "key", "8", "key", "9"]
+
+
+def test_ignores_lines_cut_short(tmp_path):
+    path = tmp_path / "wait_history.txt"
+    path.write_text("a 100\na 2\nb \nc 3")
+    waits = WaitHistory(str(path))
+    assert waits.samples("a") == [100, 2]
+    assert waits.samples("b") == []
+    assert waits.samples("c") == [3]
+
+
+def test_keys_ignore_variable_url_parts():
+    assert url_pattern("https://shop.example.com/orders/123/items?page=2") == "shop.example.com/orders/*/items"
+    key = wait_key("wait_until_page_contains", "Done", "https://example.com/orders/1")
+    assert key == wait_key("wait_until_page_contains", "Done", "https://example.com/orders/2#top")
+    assert key != wait_key("wait_until_page_contains", "Done", "https://example.com/users/2")
+
+
+def test_compacted_when_a_single_key_grows(tmp_path):
+    waits = history(tmp_path, max_samples=3)
+    for key in "abcdefgh":
+        waits.record(key, 0.1)
+    waits.flush()
+    for milliseconds in range(6):
+        waits.record("a", milliseconds / 1000)
+    waits.flush()  # 7 durations of 'a', more than twice the retained ones even though most keys have a single one
+    with open(waits.path) as f:
+        lines = f.read().splitlines()
+    assert [line for line in lines if line.startswith("a ")] == ["a 3", "a 4", "a 5"]
+    assert len(lines) == 10
+
+
+def test_not_compacted_below_twice_the_retained_durations(tmp_path):
+    waits = history(tmp_path, max_samples=3)
+    for key in "ab":
+        for milliseconds in range(6):
+            waits.record(key, milliseconds / 1000)
+    waits.flush()
+    with open(waits.path) as f:
+        assert len(f.read().splitlines()) == 12
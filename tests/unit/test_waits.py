@@ -0,0 +1,111 @@
+import sys
+
+import pytest
+
+import TestProjectLibrary  # noqa: F401
+from TestProjectLibrary.waits import VERIFY_TIMEOUT
+
+# The package exports the library class under the name of its module
+library = sys.modules["TestProjectLibrary.TestProjectLibrary"]
+
+
+@pytest.fixture
+def lib(monkeypatch):
+    monkeypatch.setenv("TP_ROBOT_LIB_VERSION", "0")  # Set by the build, read when a driver is initialized
+    lib = library.TestProjectLibrary()
+    lib.init_testproject_driver("chrome", url="about:blank", backend="recorder")
+    lib.set_wait_engine("event")
+    yield lib
+    lib.close_all_browsers()
+
+
+def selenium(lib):
+    return lib._TestProjectLibrary__library
+
+
+def record(lib, monkeypatch, fail_script=False):
+    """Records the event wait scripts and the SeleniumLibrary keywords run by the library"""
+    calls = []
+    executor = selenium(lib).driver.command_executor
+    execute, run_keyword = executor.execute, selenium(lib).run_keyword
+
+    def execute_command(command, params):
+        if command == "w3cExecuteScriptAsync":
+            calls.append(("script", params["args"]))
+            if fail_script:
+                raise RuntimeError("script timeout")
+        return execute(command, params)
+
+    def run(name, args, kwargs):
+        calls.append((name, args))
+        return run_keyword(name, args, kwargs)
+
+    monkeypatch.setattr(executor, "execute", execute_command)
+    monkeypatch.setattr(selenium(lib), "run_keyword", run)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "name, index",
+    [
+        ("wait_until_element_is_visible", 1),
+        ("wait_until_element_contains", 2),
+        ("wait_until_page_contains", 1),
+        ("wait_for_condition", 1),
+    ],
+)
+def test_timeout_index(lib, name, index):
+    assert lib._timeout_index(name) == index
+
+
+def test_event_wait_verifies_with_the_remaining_timeout(lib, monkeypatch):
+    calls = record(lib, monkeypatch)
+    lib.wait_until_element_is_enabled("css:#status", timeout=5)
+    (script, args), (name, keyword_args) = calls
+    assert script == "script" and args == ["element enabled", ["css", "#status"], None, 5000]
+    assert name == "wait_until_element_is_enabled" and keyword_args[0] == "css:#status"
+    assert 4 < keyword_args[1] <= 5
+
+
+def test_event_wait_falls_back_to_polling_when_the_script_fails(lib, monkeypatch):
+    calls = record(lib, monkeypatch, fail_script=True)
+    lib.wait_until_page_contains("Welcome", timeout=0.1)
+    assert [call[0] for call in calls] == ["script", "wait_until_page_contains"]
+    assert calls[1][1][1] == VERIFY_TIMEOUT  # Still checked once after the timeout of the event wait
+
+
+def test_locators_the_browser_cant_resolve_are_polled(lib, monkeypatch):
+    calls = record(lib, monkeypatch)
+    with pytest.raises(AssertionError):  # The page has no jQuery
+        lib.wait_until_element_is_visible("jquery:#status", timeout=0.1)
+    assert [call[0] for call in calls] == ["wait_until_element_is_visible"]
+
+
+def test_polling_engine(lib, monkeypatch):
+    assert lib.set_wait_engine("polling") == "event"
+    calls = record(lib, monkeypatch)
+    lib.wait_until_page_contains("Welcome", timeout=1)
+    assert [call[0] for call in calls] == ["wait_until_page_contains"]
+
+
+def test_unknown_wait_engine(lib):
+    with pytest.raises(ValueError, match="Unsupported wait engine 'fast'"):
+        lib.set_wait_engine("Fast")
+
+
+def test_adaptive_waits_read_the_url_once_per_page(lib, monkeypatch, tmp_path):
+    lib.enable_adaptive_waits(str(tmp_path / "wait_history.txt"))
+    executor = selenium(lib).driver.command_executor
+    commands = []
+    execute = executor.execute
+    monkeypatch.setattr(executor, "execute", lambda command, params: commands.append(command) or execute(command, params))
+    lib.wait_until_element_is_enabled("css:#status", timeout=1)
+    lib.wait_until_element_is_enabled("css:#status", timeout=1)
+    assert commands.count("getCurrentUrl") == 1
+    lib.go_to("https://example.com/orders/1")
+    lib.wait_until_element_is_enabled("css:#status", timeout=1)
+    assert commands.count("getCurrentUrl") == 2
+    lib.wait_until_location_contains("orders", timeout=1)
+    assert commands.count("getCurrentUrl") == 3  # Checked by the wait itself
+    lib.wait_until_element_is_enabled("css:#status", timeout=1)
+    assert commands.count("getCurrentUrl") == 4  # Read again, the location may have changed while waiting